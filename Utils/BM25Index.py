@@ -0,0 +1,155 @@
+import os
+import re
+import math
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    # Word characters only, so course codes like "CS101" and room numbers stay single terms.
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    # Okapi BM25 inverted index over chunk text, kept in step with the vector store by VectorDB. Postings are compact
+    # (chunk index, term frequency) arrays searched with NumPy; removed chunks are tombstoned and compacted on save.
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.clear()
+
+    def clear(self):
+        self.ids: List[str] = []
+        self.index_of: Dict[str, int] = {}
+        self.lengths = array('I')
+        self.alive = bytearray()
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.total_length = 0
+        self._length_norm: Optional[np.ndarray] = None
+
+    def __len__(self):
+        return len(self.index_of)
+
+    def add(self, documents: Iterable[Document]) -> None:
+        # Re-adding an ID replaces the chunk's old postings.
+        for doc in documents:
+            if doc.id in self.index_of:
+                self.remove([doc.id])
+            index = len(self.ids)
+            counts = Counter(tokenize(doc.page_content))
+            length = sum(counts.values())
+            self.ids.append(doc.id)
+            self.index_of[doc.id] = index
+            self.lengths.append(length)
+            self.alive.append(1)
+            self.total_length += length
+            for term, count in counts.items():
+                entry = self.postings.get(term)
+                if entry is None:
+                    entry = self.postings[term] = (array('I'), array('I'))
+                entry[0].append(index)
+                entry[1].append(count)
+        self._length_norm = None
+
+    def remove(self, ids: Iterable[str]) -> None:
+        for chunk_id in ids:
+            index = self.index_of.pop(chunk_id, None)
+            if index is not None:
+                self.alive[index] = 0
+                self.total_length -= self.lengths[index]
+        self._length_norm = None
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        # Returns up to k (chunk ID, score) pairs, best first; chunks sharing no term with the query are left out.
+        count = len(self.index_of)
+        if not count or k <= 0:
+            return []
+        alive = np.frombuffer(self.alive, dtype=np.bool_)
+        if self._length_norm is None:
+            average_length = max(self.total_length / count, 1.0)
+            lengths = np.frombuffer(self.lengths, dtype=np.uint32).astype(np.float32)
+            self._length_norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            docs = np.frombuffer(entry[0], dtype=np.uint32)
+            live = alive[docs]
+            docs = docs[live]
+            if not len(docs):
+                continue
+            frequencies = np.frombuffer(entry[1], dtype=np.uint32)[live].astype(np.float32)
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * frequencies * (self.k1 + 1) / (frequencies + self._length_norm[docs])
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(self.ids[index], float(scores[index])) for index in candidates]
+
+    def _to_arrays(self) -> Dict[str, np.ndarray]:
+        # Live chunks only, renumbered. Terms and IDs are stored as newline-joined UTF-8 rather than fixed-width
+        # NumPy strings, which would pad every entry to the longest one.
+        alive = np.frombuffer(self.alive, dtype=np.bool_).copy()
+        new_index = (np.cumsum(alive) - 1).astype(np.uint32)
+        terms, offsets, postings, frequencies = [], [0], [], []
+        for term, (docs, counts) in self.postings.items():
+            docs = np.array(docs, dtype=np.uint32)
+            keep = alive[docs]
+            if not keep.any():
+                continue
+            terms.append(term)
+            postings.append(new_index[docs[keep]])
+            frequencies.append(np.array(counts, dtype=np.uint32)[keep])
+            offsets.append(offsets[-1] + int(keep.sum()))
+        live_ids = [chunk_id for chunk_id, is_alive in zip(self.ids, alive) if is_alive]
+        return {
+            'ids': np.frombuffer("\n".join(live_ids).encode('utf-8'), dtype=np.uint8),
+            'lengths': np.array(self.lengths, dtype=np.uint32)[alive],
+            'terms': np.frombuffer("\n".join(terms).encode('utf-8'), dtype=np.uint8),
+            'offsets': np.array(offsets, dtype=np.int64),
+            'postings': np.concatenate(postings) if postings else np.zeros(0, dtype=np.uint32),
+            'frequencies': np.concatenate(frequencies) if frequencies else np.zeros(0, dtype=np.uint32),
+            'params': np.array([self.k1, self.b]),
+        }
+
+    def _from_arrays(self, arrays) -> None:
+        self.clear()
+        self.k1, self.b = (float(value) for value in arrays['params'])
+        ids = arrays['ids'].tobytes().decode('utf-8')
+        self.ids = ids.split("\n") if ids else []
+        self.index_of = {chunk_id: index for index, chunk_id in enumerate(self.ids)}
+        self.lengths = array('I', arrays['lengths'].astype(np.uint32).tobytes())
+        self.alive = bytearray(b'\x01' * len(self.ids))
+        self.total_length = int(arrays['lengths'].sum())
+        terms = arrays['terms'].tobytes().decode('utf-8')
+        offsets, postings, frequencies = arrays['offsets'], arrays['postings'], arrays['frequencies']
+        for position, term in enumerate(terms.split("\n") if terms else []):
+            start, end = offsets[position], offsets[position + 1]
+            self.postings[term] = (array('I', postings[start:end].tobytes()), array('I', frequencies[start:end].tobytes()))
+
+    def save(self, path: str) -> None:
+        arrays = self._to_arrays()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, path)
+        if len(self.index_of) != len(self.ids):
+            self._from_arrays(arrays)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['BM25Index']:
+        if not os.path.exists(path):
+            return None
+        index = cls()
+        with np.load(path, allow_pickle=False) as arrays:
+            index._from_arrays(arrays)
+        return index
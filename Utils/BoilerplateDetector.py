@@ -0,0 +1,62 @@
+import re
+import hashlib
+from urllib.parse import urlparse
+
+_SPACES = re.compile(r"\s+")
+
+
+class BoilerplateDetector:
+    # Learns the site template online: every distinct text block (paragraph, list item, leaf div) is counted once per
+    # page and per domain, and a block found on min_pages pages is stripped from that page and every later one.
+    # Menus, banners and sidebars in plain divs are caught this way where tag-based removal misses them. The first
+    # min_pages - 1 pages keep their copies; ChunkDeduplicator drops those as duplicates at indexing time.
+    # Which pages those are depends on the order pages arrive in, so the output is only reproducible for a fixed
+    # crawl order; WebScraper leaves the detector off unless strip_boilerplate is set.
+    def __init__(self, min_pages=3, min_block_chars=3):
+        self.min_pages = min_pages
+        self.min_block_chars = min_block_chars
+        self.block_pages = {}
+        self.stats = {'pages': 0, 'blocks': 0, 'blocks_removed': 0, 'chars_removed': 0, 'sections_removed': 0}
+
+    @staticmethod
+    def block_key(domain, text):
+        normalized = _SPACES.sub(' ', text.lower()).strip()
+        return hashlib.blake2b(f"{domain}\0{normalized}".encode('utf-8'), digest_size=8).digest()
+
+    def strip(self, page_url, structured_text, blocks):
+        # blocks holds the text blocks of each section, as returned by HtmlExtractor.extract in page_meta['blocks'].
+        domain = urlparse(page_url).netloc
+        self.stats['pages'] += 1
+        keys = [[self.block_key(domain, block) if len(block) >= self.min_block_chars else None for block in section]
+                for section in blocks]
+        for key in {key for section in keys for key in section if key is not None}:
+            self.block_pages[key] = self.block_pages.get(key, 0) + 1
+
+        sections = []
+        for section, section_blocks, section_keys in zip(structured_text['sections'], blocks, keys):
+            kept = []
+            for block, key in zip(section_blocks, section_keys):
+                self.stats['blocks'] += 1
+                if key is not None and self.block_pages[key] >= self.min_pages:
+                    self.stats['blocks_removed'] += 1
+                    self.stats['chars_removed'] += len(block)
+                else:
+                    kept.append(block)
+            if len(kept) == len(section_blocks):
+                sections.append(section)
+            elif kept:
+                sections.append({**section, 'text': ' '.join(kept).strip()})
+            else:
+                self.stats['sections_removed'] += 1
+        return {**structured_text, 'sections': sections}
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['template_blocks'] = sum(1 for pages in self.block_pages.values() if pages >= self.min_pages)
+        return stats
+
+    def report(self):
+        stats = self.get_stats()
+        print(f"Boilerplate removal: {stats['blocks_removed']} of {stats['blocks']} text blocks stripped from "
+              f"{stats['pages']} pages ({stats['chars_removed']} characters, {stats['sections_removed']} sections), "
+              f"{stats['template_blocks']} site-wide blocks learned.")
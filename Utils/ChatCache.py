@@ -0,0 +1,114 @@
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+CACHE_TIERS = ('reformulation', 'retrieval', 'answer')
+_SPACES = re.compile(r"\s+")
+
+
+class TTLCache:
+    # LRU cache whose entries also expire ttl_seconds after they were stored. Thread-safe, since the chat app's
+    # sessions share one cache.
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                self.stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+class ChatCache:
+    # Three tiers for RAG.chat: reformulated questions (keyed on the question and the chat history), retrieved chunks
+    # (keyed on the standalone question and the retriever settings) and answers (keyed on the question and the exact
+    # history and context of the prompt). Questions are compared after lowercasing and dropping punctuation.
+    # index_version returns the current index version, e.g. VectorDB.index_version; when it changes, the retrieval
+    # and answer tiers are cleared, while reformulations do not depend on the index and are kept.
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600,
+                 index_version: Optional[Callable[[], Optional[str]]] = None):
+        self.tiers = {tier: TTLCache(max_entries, ttl_seconds) for tier in CACHE_TIERS}
+        self.index_version = index_version
+        self._version = index_version() if index_version else None
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        # Only case and spacing are ignored; punctuation and symbols stay, so "C++" and "C" or "C#" stay distinct.
+        return _SPACES.sub(" ", query.casefold()).strip()
+
+    @staticmethod
+    def fingerprint(*parts: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def check_index_version(self) -> None:
+        if self.index_version is None:
+            return
+        version = self.index_version()
+        if version != self._version:
+            self._version = version
+            self.tiers['retrieval'].clear()
+            self.tiers['answer'].clear()
+            self.invalidations += 1
+            print("Index was rebuilt; cleared cached retrieval results and answers.")
+
+    def get(self, tier: str, key: str) -> Optional[Any]:
+        return self.tiers[tier].get(key)
+
+    def put(self, tier: str, key: str, value: Any) -> None:
+        self.tiers[tier].put(key, value)
+
+    def clear(self) -> None:
+        for cache in self.tiers.values():
+            cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {tier: cache.get_stats() for tier, cache in self.tiers.items()}
+        stats['invalidations'] = self.invalidations
+        return stats
+
+    def report(self) -> None:
+        stats = self.get_stats()
+        print("Chat cache: " + ", ".join(f"{tier} {stats[tier]['hit_rate']:.0%} of {stats[tier]['hits'] + stats[tier]['misses']}"
+                                         for tier in CACHE_TIERS) + f" hits, {self.invalidations} index invalidations.")
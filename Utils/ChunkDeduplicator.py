@@ -0,0 +1,121 @@
+import re
+import hashlib
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+from langchain_core.documents import Document
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+_MERSENNE_PRIME = (1 << 31) - 1
+# Chroma only stores scalar metadata, so a merged chunk's source URLs are joined with a character URLs cannot contain.
+SOURCES_DELIMITER = "\n"
+
+
+def split_sources(metadata: dict) -> List[str]:
+    # Every page a chunk was found on: the 'sources' list of a merged chunk, otherwise its single 'source'.
+    if metadata.get('sources'):
+        return metadata['sources'].split(SOURCES_DELIMITER)
+    return [metadata['source']] if metadata.get('source') else []
+
+
+class ChunkDeduplicator:
+    # Drops chunks whose text was already seen, exactly (ignoring case, punctuation and whitespace) or nearly (MinHash
+    # over word shingles, candidates found by LSH banding and kept only above the Jaccard threshold). The first copy
+    # is the one indexed; the URLs of the dropped copies are collected so its metadata can list every source page.
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16, shingle_size: int = 5,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self.reset()
+
+    def reset(self):
+        self._exact: Dict[str, str] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._metadata: Dict[str, dict] = {}
+        self._extra_sources: Dict[str, List[str]] = {}
+        self.stats = {'chunks': 0, 'kept': 0, 'exact_duplicates': 0, 'near_duplicates': 0}
+
+    def _signature(self, words: List[str]) -> np.ndarray:
+        size = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        hashes = np.fromiter((int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+                              for shingle in shingles), dtype=np.uint64, count=len(shingles))
+        permuted = (self._a[:, np.newaxis] * hashes[np.newaxis, :] + self._b[:, np.newaxis]) % _MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _merge(self, kept_id: str, doc: Document) -> None:
+        source = doc.metadata.get('source')
+        sources = self._extra_sources.setdefault(kept_id, [])
+        if source and source != self._metadata[kept_id].get('source') and source not in sources:
+            sources.append(source)
+
+    def keep(self, doc: Document) -> bool:
+        # True if doc should be indexed, False if it duplicates a chunk kept earlier.
+        self.stats['chunks'] += 1
+        words = _WORD_PATTERN.findall(doc.page_content.lower())
+        exact_key = hashlib.sha256(" ".join(words).encode('utf-8')).hexdigest()
+        kept_id = self._exact.get(exact_key)
+        if kept_id is not None:
+            self.stats['exact_duplicates'] += 1
+            self._merge(kept_id, doc)
+            return False
+
+        signature = None
+        if words:
+            signature = self._signature(words)
+            candidates = set()
+            for band, bucket in enumerate(self._buckets):
+                candidates.update(bucket.get(signature[band * self.rows:(band + 1) * self.rows].tobytes(), ()))
+            for candidate in candidates:
+                # The share of equal MinHash values estimates the Jaccard similarity of the two shingle sets.
+                if np.count_nonzero(self._signatures[candidate] == signature) >= self.threshold * self.num_perm:
+                    self.stats['near_duplicates'] += 1
+                    self._merge(candidate, doc)
+                    return False
+
+        self.stats['kept'] += 1
+        self._exact[exact_key] = doc.id
+        self._metadata[doc.id] = doc.metadata
+        if signature is not None:
+            self._signatures[doc.id] = signature
+            for band, bucket in enumerate(self._buckets):
+                bucket.setdefault(signature[band * self.rows:(band + 1) * self.rows].tobytes(), []).append(doc.id)
+        return True
+
+    def filter(self, documents: Iterable[Document]) -> Iterator[Document]:
+        for doc in documents:
+            if self.keep(doc):
+                yield doc
+
+    def merged_metadata(self) -> Dict[str, dict]:
+        # Metadata for kept chunks that absorbed copies from other pages; split_sources() reads the URLs back.
+        merged = {}
+        for kept_id, extra_sources in self._extra_sources.items():
+            if not extra_sources:
+                continue
+            metadata = dict(self._metadata[kept_id])
+            metadata['sources'] = SOURCES_DELIMITER.join([metadata.get('source', 'Unknown')] + extra_sources)
+            metadata['duplicate_sources'] = len(extra_sources)
+            merged[kept_id] = metadata
+        return merged
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats['embeddings_saved'] = stats['exact_duplicates'] + stats['near_duplicates']
+        stats['saved_ratio'] = stats['embeddings_saved'] / stats['chunks'] if stats['chunks'] else 0.0
+        return stats
+
+    def report(self):
+        stats = self.get_stats()
+        print(f"Chunk deduplication: {stats['kept']} of {stats['chunks']} chunks kept, {stats['exact_duplicates']} exact "
+              f"and {stats['near_duplicates']} near duplicates dropped ({stats['embeddings_saved']} embeddings saved, "
+              f"{stats['saved_ratio']:.0%}).")
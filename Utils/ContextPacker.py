@@ -0,0 +1,89 @@
+import re
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.documents import Document
+from .ContextSelection import merge_overlapping_chunks
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text with Gemini and GPT tokenizers; no API call needed.
+    return math.ceil(len(text) / 4)
+
+
+class ContextPacker:
+    # Fits retrieved chunks and chat history into a prompt token budget. The newest history messages are kept up to
+    # max_history_tokens; chunks then fill what is left of max_tokens in relevance order, and the chunk that no longer
+    # fits whole is cut after its last sentence that does. token_counter can be an exact one, e.g. llm.get_num_tokens.
+    def __init__(self, max_tokens: int = 3000, max_history_tokens: int = 800, min_chunk_tokens: int = 40,
+                 token_counter: Optional[Callable[[str], int]] = None):
+        self.max_tokens = max_tokens
+        self.max_history_tokens = max_history_tokens
+        self.min_chunk_tokens = min_chunk_tokens
+        self.count_tokens = token_counter or estimate_tokens
+
+    def trim_to_sentences(self, text: str, max_tokens: int) -> str:
+        # The longest run of leading sentences within max_tokens; empty if even the first one is too long.
+        kept, used = [], 0
+        for sentence in _SENTENCE_END.split(text):
+            tokens = self.count_tokens(sentence) + (1 if kept else 0)
+            if used + tokens > max_tokens:
+                break
+            kept.append(sentence)
+            used += tokens
+        return " ".join(kept)
+
+    def pack_history(self, messages: Sequence[str], max_tokens: int) -> List[str]:
+        # Newest messages first until the budget runs out; a newest message that is too long alone is trimmed.
+        kept, used = [], 0
+        for message in reversed(messages):
+            tokens = self.count_tokens(message)
+            if used + tokens > max_tokens:
+                if not kept:
+                    trimmed = self.trim_to_sentences(message, max_tokens)
+                    if trimmed:
+                        kept.append(trimmed)
+                break
+            kept.append(message)
+            used += tokens
+        return kept[::-1]
+
+    def pack(self, docs: List[Document], history: Sequence[str] = (), reserved_tokens: int = 0,
+             scores: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+        # docs come best first unless scores are given. reserved_tokens covers the prompt template and question.
+        # Returns the context and history strings with a token usage record for the request.
+        if scores is not None:
+            docs = [doc for _, doc in sorted(zip(scores, docs), key=lambda pair: pair[0], reverse=True)]
+        history_messages = self.pack_history(history, max(min(self.max_history_tokens, self.max_tokens - reserved_tokens), 0))
+        history_str = "\n".join(history_messages)
+        history_tokens = self.count_tokens(history_str) if history_str else 0
+
+        merged = merge_overlapping_chunks(docs)
+        budget = self.max_tokens - reserved_tokens - history_tokens
+        parts, context_tokens, trimmed = [], 0, 0
+        for doc in merged:
+            remaining = budget - context_tokens - (1 if parts else 0)
+            tokens = self.count_tokens(doc.page_content)
+            if tokens <= remaining:
+                text = doc.page_content
+            elif remaining >= self.min_chunk_tokens:
+                text = self.trim_to_sentences(doc.page_content, remaining)
+                if not text:
+                    break
+                tokens = self.count_tokens(text)
+                trimmed += 1
+            else:
+                break
+            parts.append(text)
+            context_tokens += tokens + (1 if len(parts) > 1 else 0)
+            if trimmed:
+                break
+
+        usage = {'budget': self.max_tokens, 'reserved_tokens': reserved_tokens, 'history_tokens': history_tokens,
+                 'context_tokens': context_tokens, 'prompt_tokens': reserved_tokens + history_tokens + context_tokens,
+                 'chunks': len(docs), 'chunks_merged': len(docs) - len(merged), 'chunks_used': len(parts),
+                 'chunks_trimmed': trimmed, 'chunks_dropped': len(merged) - len(parts),
+                 'history_messages': len(history_messages), 'history_messages_dropped': len(history) - len(history_messages)}
+        return {'context': "\n\n".join(parts), 'history': history_str, 'usage': usage}
@@ -0,0 +1,82 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+from .Splitter import CHUNK_OVERLAP
+
+MIN_MERGE_OVERLAP = 20
+
+
+def maximal_marginal_relevance(relevance: Sequence[float], embeddings, k: int, lambda_mult: float = 0.5) -> List[int]:
+    # Indices of k candidates picked greedily by lambda_mult * relevance - (1 - lambda_mult) * (highest cosine
+    # similarity to an already picked candidate). The candidate similarity matrix is computed once, so each pick is
+    # a vector update rather than a loop over the picked set.
+    relevance = np.asarray(relevance, dtype=np.float32)
+    k = min(k, len(relevance))
+    if k <= 0:
+        return []
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    similarity = vectors @ vectors.T
+    redundancy = np.zeros(len(relevance), dtype=np.float32)
+    available = np.ones(len(relevance), dtype=bool)
+    picked = []
+    for _ in range(k):
+        scores = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * redundancy, -np.inf)
+        index = int(np.argmax(scores))
+        picked.append(index)
+        available[index] = False
+        redundancy = np.maximum(redundancy, similarity[index])
+    return picked
+
+
+def _overlap_length(first: str, second: str, min_overlap: int, max_overlap: int) -> int:
+    # Length of the longest suffix of first that is also a prefix of second, or 0 if shorter than min_overlap.
+    if len(first) < min_overlap or len(second) < min_overlap:
+        return 0
+    head = second[:min_overlap]
+    tail_start = max(len(first) - max_overlap, 0)
+    position = first.find(head, tail_start)
+    while position != -1:
+        if second.startswith(first[position:]):
+            return len(first) - position
+        position = first.find(head, position + 1)
+    return 0
+
+
+def merge_overlapping_chunks(docs: List[Document], min_overlap: int = MIN_MERGE_OVERLAP,
+                             max_overlap: Optional[int] = None) -> List[Document]:
+    # Chunks of one page that overlap (the splitter repeats up to CHUNK_OVERLAP characters between neighbours) or
+    # contain one another are joined into one, and repeated texts are dropped, so the prompt carries each passage
+    # once. A merged chunk takes the place of its best-ranked part.
+    max_overlap = max_overlap or 2 * CHUNK_OVERLAP
+    texts = [doc.page_content for doc in docs]
+    sources = [doc.metadata.get('source') for doc in docs]
+    alive = [True] * len(docs)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(docs)):
+            for j in range(len(docs)):
+                if i == j or not alive[i] or not alive[j]:
+                    continue
+                if texts[i] == texts[j] or (sources[i] is not None and sources[i] == sources[j] and texts[j] in texts[i]):
+                    merged = texts[i]
+                elif sources[i] is not None and sources[i] == sources[j]:
+                    overlap = _overlap_length(texts[i], texts[j], min_overlap, max_overlap)
+                    if not overlap:
+                        continue
+                    merged = texts[i] + texts[j][overlap:]
+                else:
+                    continue
+                keep, drop = min(i, j), max(i, j)
+                texts[keep] = merged
+                alive[drop] = False
+                changed = True
+
+    merged_docs = []
+    for doc, text, is_alive in zip(docs, texts, alive):
+        if is_alive:
+            merged_docs.append(doc if text == doc.page_content else
+                               Document(id=doc.id, page_content=text, metadata=doc.metadata))
+    return merged_docs
@@ -0,0 +1,106 @@
+import os
+import json
+import sqlite3
+
+
+class CrawlState:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS frontier (url TEXT PRIMARY KEY, depth INTEGER, priority REAL, seq INTEGER);
+            CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY, seq INTEGER);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT,
+                                              links TEXT, last_seen INTEGER);
+        """)
+        self.conn.commit()
+        self._saved_visited_count = 0
+        self.generation = 0
+
+    def _get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def has_checkpoint(self, base_url):
+        return self._get_meta('base_url') == base_url
+
+    def load(self, frontier):
+        # In-progress URLs are stored in both tables; the frontier copy wins so they are fetched again.
+        for url, depth, priority in self.conn.execute("SELECT url, depth, priority FROM frontier ORDER BY priority, depth, seq"):
+            frontier.add(url, depth, priority)
+        for (url,) in self.conn.execute("SELECT url FROM visited WHERE url NOT IN (SELECT url FROM frontier) ORDER BY seq"):
+            frontier.mark_visited(url)
+        self._saved_visited_count = frontier.visited_count
+        return {
+            'base_url': self._get_meta('base_url'),
+            'pages_scraped': int(self._get_meta('pages_scraped', 0)),
+            'output_offset': int(self._get_meta('output_offset', 0)),
+        }
+
+    def checkpoint(self, base_url, frontier, pages_scraped_count, output_offset, in_progress=None):
+        # in_progress maps URLs popped but not finished to (depth, priority); they are requeued where they were.
+        in_progress = in_progress or {}
+        with self.conn:
+            new_visited = list(frontier.visited_urls(self._saved_visited_count))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO visited (url, seq) VALUES (?, ?)",
+                ((url, self._saved_visited_count + i) for i, url in enumerate(new_visited))
+            )
+            self.conn.execute("DELETE FROM frontier")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO frontier (url, depth, priority, seq) VALUES (?, ?, ?, ?)",
+                ((url, depth, priority, seq) for seq, (url, depth, priority) in enumerate(
+                    [(url, depth, priority) for url, (depth, priority) in in_progress.items()] + list(frontier.queued_entries())
+                ))
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [('base_url', base_url), ('pages_scraped', str(pages_scraped_count)), ('output_offset', str(output_offset))]
+            )
+        self._saved_visited_count += len(new_visited)
+
+    def begin_generation(self, resume):
+        # Each recrawl stamps the pages it sees; pages left with an older stamp after a full crawl were deleted.
+        saved_generation = self._get_meta('generation')
+        if resume and saved_generation is not None:
+            self.generation = int(saved_generation)
+        else:
+            latest = self.conn.execute("SELECT MAX(last_seen) FROM pages").fetchone()[0]
+            self.generation = (latest or 0) + 1
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)", (str(self.generation),))
+
+    def get_page(self, url):
+        row = self.conn.execute("SELECT etag, last_modified, content_hash, links FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'content_hash': row[2], 'links': set(json.loads(row[3] or '[]'))}
+
+    def record_page(self, url, etag, last_modified, content_hash, links):
+        # Page rows are committed with the next checkpoint, together with the output they describe.
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, links, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content_hash, json.dumps(sorted(links)), self.generation)
+        )
+
+    def mark_page_seen(self, url):
+        self.conn.execute("UPDATE pages SET last_seen = ? WHERE url = ?", (self.generation, url))
+
+    def pop_unseen_pages(self):
+        urls = [row[0] for row in self.conn.execute("SELECT url FROM pages WHERE last_seen < ?", (self.generation,))]
+        self.conn.execute("DELETE FROM pages WHERE last_seen < ?", (self.generation,))
+        return urls
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM frontier")
+            self.conn.execute("DELETE FROM visited")
+            self.conn.execute("DELETE FROM meta")
+        self._saved_visited_count = 0
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,118 @@
+import os
+import re
+import hashlib
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_BACKENDS = ('google', 'onnx', 'hashing')
+DEFAULT_ONNX_MODEL_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'chroma', 'onnx_models', 'all-MiniLM-L6-v2', 'onnx')
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbeddings(Embeddings):
+    # Deterministic bag-of-words vectors: each word and word bigram is hashed to a signed bucket and the result is
+    # L2-normalized. Needs no model or network, so tests and offline runs get stable, roughly lexical similarity.
+    def __init__(self, dimensions: int = 384, use_bigrams: bool = True):
+        self.dimensions = dimensions
+        self.use_bigrams = use_bigrams
+        self.model = f"hashing-{dimensions}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float64)
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = tokens + ([f"{a} {b}" for a, b in zip(tokens, tokens[1:])] if self.use_bigrams else [])
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'little')
+            vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class OnnxEmbeddings(Embeddings):
+    # all-MiniLM-L6-v2 run in-process with onnxruntime on the CPU, from the copy Chroma downloads for its default
+    # embedding function. Texts are sorted by token count and padded per batch rather than to max_length, so
+    # short chunks and queries do not pay for 256 tokens of padding.
+    def __init__(self, model_dir: Optional[str] = None, batch_size: int = 32, max_length: int = 256,
+                 intra_op_threads: Optional[int] = None):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.model_dir = model_dir or DEFAULT_ONNX_MODEL_DIR
+        if model_dir is None and not os.path.exists(os.path.join(self.model_dir, 'model.onnx')):
+            # Chroma's default embedding function downloads and verifies the model on its first call.
+            from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+            print(f"Downloading the ONNX embedding model to {os.path.dirname(self.model_dir)}...")
+            ONNXMiniLM_L6_V2()(["warm up"])
+        self.batch_size = batch_size
+        self.model = f"onnx-{os.path.basename(os.path.dirname(os.path.abspath(self.model_dir)))}"
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.no_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.log_severity_level = 3
+        options.intra_op_num_threads = intra_op_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(os.path.join(self.model_dir, 'model.onnx'), sess_options=options,
+                                                    providers=['CPUExecutionProvider'])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _run_batch(self, encodings) -> np.ndarray:
+        length = max(len(encoding.ids) for encoding in encodings)
+        input_ids = np.zeros((len(encodings), length), dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), length), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            input_ids[row, :len(encoding.ids)] = encoding.ids
+            attention_mask[row, :len(encoding.ids)] = 1
+        inputs = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self.input_names:
+            inputs['token_type_ids'] = np.zeros_like(input_ids)
+
+        last_hidden_state = self.session.run(None, inputs)[0]
+        mask = attention_mask[:, :, np.newaxis].astype(np.float32)
+        pooled = (last_hidden_state * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        encodings = self.tokenizer.encode_batch(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(encodings[i].ids))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            for index, vector in zip(indices, self._run_batch([encodings[i] for i in indices])):
+                vectors[index] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def make_embeddings(backend: str, model: Optional[str] = None, **options) -> Embeddings:
+    # backend is one of EMBEDDING_BACKENDS; model is the Google model name or the ONNX model directory.
+    if backend == 'google':
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        google_api_key = os.getenv('GOOGLE_API_KEY')
+        if not google_api_key:
+            raise ValueError("GOOGLE_API_KEY not found in environment variables.")
+        return GoogleGenerativeAIEmbeddings(model=model or 'models/text-embedding-004', google_api_key=google_api_key, **options)
+    if backend == 'onnx':
+        return OnnxEmbeddings(model_dir=model, **options)
+    if backend == 'hashing':
+        return HashingEmbeddings(**options)
+    raise ValueError(f"Unknown embedding backend '{backend}'; use one of: {', '.join(EMBEDDING_BACKENDS)}.")
@@ -0,0 +1,142 @@
+import os
+import hashlib
+import sqlite3
+import threading
+from array import array
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    # SQLite store of document embeddings keyed by (model, sha256 of the chunk text). Vectors are kept as float64
+    # so a cached vector is bit-identical to the one the model returned. Least recently used rows are evicted
+    # once the stored vectors exceed max_bytes.
+    def __init__(self, db_path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS embeddings (model TEXT, text_hash TEXT, vector BLOB, size INTEGER, last_used INTEGER,
+                                                   PRIMARY KEY (model, text_hash));
+            CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+        """)
+        self.conn.commit()
+        self._lock = threading.Lock()
+        row = self.conn.execute("SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_used), 0) FROM embeddings").fetchone()
+        self.total_bytes, self._clock = row
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, model: str, hashes: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                for key, vector in self.conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                        [model, *part]):
+                    found[key] = array('d', vector).tolist()
+            if found:
+                self._clock += 1
+                self.conn.executemany("UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                                      ((self._clock, model, key) for key in found))
+                self.conn.commit()
+        return found
+
+    def put_many(self, model: str, vectors: dict) -> None:
+        with self._lock:
+            self._clock += 1
+            rows = []
+            for key, vector in vectors.items():
+                blob = array('d', vector).tobytes()
+                rows.append((model, key, blob, len(blob), self._clock))
+            with self.conn:
+                for row in rows:
+                    previous = self.conn.execute("SELECT size FROM embeddings WHERE model = ? AND text_hash = ?",
+                                                 row[:2]).fetchone()
+                    self.total_bytes += row[3] - (previous[0] if previous else 0)
+                    self.conn.execute("INSERT OR REPLACE INTO embeddings (model, text_hash, vector, size, last_used) "
+                                      "VALUES (?, ?, ?, ?, ?)", row)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop least recently used rows until the cache is back under 90% of max_bytes.
+        target = self.max_bytes * 0.9
+        with self.conn:
+            while self.total_bytes > target:
+                rows = self.conn.execute("SELECT model, text_hash, size FROM embeddings ORDER BY last_used LIMIT 1000").fetchall()
+                if not rows:
+                    self.total_bytes = 0
+                    break
+                for model, key, size in rows:
+                    self.conn.execute("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", (model, key))
+                    self.total_bytes -= size
+                    self.evictions += 1
+                    if self.total_bytes <= target:
+                        break
+
+    def record_lookups(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0, 'bytes': self.total_bytes}
+
+    def report(self):
+        stats = self.get_stats()
+        print(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), "
+              f"{stats['evictions']} evicted, {stats['bytes'] / 1024 / 1024:.1f} MiB stored in {self.db_path}")
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    # Wraps an Embeddings object so documents whose text was embedded before by the same model are not sent again.
+    # Queries are passed through: some models (Google's included) embed queries with a different task type.
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model_name: Optional[str] = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name or getattr(embeddings, 'model', type(embeddings).__name__)
+
+    @property
+    def model(self):
+        return self.model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(text) for text in texts]
+        found = self.cache.get_many(self.model_name, list(set(hashes)))
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        misses = sum(1 for key in hashes if key in missing)
+        self.cache.record_lookups(len(texts) - misses, misses)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model_name, new_vectors)
+            found.update(new_vectors)
+        return [found[key] for key in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
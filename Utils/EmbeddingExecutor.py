@@ -0,0 +1,155 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import requests
+from langchain_core.embeddings import Embeddings
+
+from .RateLimiter import TokenBucket, parse_retry_after
+
+
+def _error_chain(error):
+    # Client wrappers such as GoogleGenerativeAIError re-raise the HTTP/API error as their cause.
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__
+
+
+def _status_code(error):
+    # requests errors carry the response; google.api_core errors carry the HTTP status as .code.
+    response = getattr(error, 'response', None)
+    for status in (getattr(response, 'status_code', None), getattr(error, 'status_code', None), getattr(error, 'code', None)):
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def error_status(error):
+    for cause in _error_chain(error):
+        status = _status_code(cause)
+        if status is not None:
+            return status
+    return None
+
+
+def is_transient_error(error):
+    # Timeouts, dropped connections, 429 and 5xx are worth retrying; bad requests, auth errors and the like are not.
+    if any(isinstance(cause, (TimeoutError, ConnectionError, requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+           for cause in _error_chain(error)):
+        return True
+    status = error_status(error)
+    return status is not None and (status == 429 or 500 <= status < 600)
+
+
+def retry_after_seconds(error):
+    for cause in _error_chain(error):
+        headers = getattr(getattr(cause, 'response', None), 'headers', None)
+        if headers:
+            return parse_retry_after(headers.get('Retry-After'))
+    return None
+
+
+class EmbeddingExecutor(Embeddings):
+    # Embeds documents in sub-batches on a thread pool. Each request takes a token from a shared bucket. Transient
+    # failures are retried with exponential backoff and full jitter; a 429 waits for Retry-After when the server
+    # sends one, and other transient failures that repeat halve the sub-batch. A 413 halves it at once. Any other
+    # error is raised without retrying.
+    def __init__(self, embeddings: Embeddings, max_workers: int = 4, requests_per_second: Optional[float] = None,
+                 sub_batch_size: int = 100, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.embeddings = embeddings
+        self.max_workers = max_workers
+        self.sub_batch_size = sub_batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket = TokenBucket(requests_per_second) if requests_per_second else None
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='embed')
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'splits': 0, 'failures': 0, 'backoff_seconds': 0.0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def model(self):
+        return getattr(self.embeddings, 'model', type(self.embeddings).__name__)
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = retry_after if retry_after is not None else random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        self._count('backoff_seconds', delay)
+        time.sleep(delay)
+
+    def _split(self, texts, attempt):
+        self._count('splits')
+        middle = len(texts) // 2
+        return self._embed_with_retries(texts[:middle], attempt) + self._embed_with_retries(texts[middle:], attempt)
+
+    def _embed_with_retries(self, texts: List[str], attempt: int = 0) -> List[List[float]]:
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            self._count('requests')
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                status = error_status(e)
+                if status == 413 and len(texts) > 1:
+                    # Nothing failed but the size of the request, so it is halved right away instead of retried.
+                    return self._split(texts, attempt)
+                if not is_transient_error(e):
+                    self._count('failures')
+                    print(f"Embedding {len(texts)} texts failed: {e}")
+                    raise
+                if attempt >= self.max_retries:
+                    self._count('failures')
+                    print(f"Embedding {len(texts)} texts failed after {attempt + 1} attempts: {e}")
+                    raise
+                if status == 429:
+                    # Throttling says nothing about the payload, so the batch is retried whole once the server allows.
+                    self._count('rate_limited')
+                    self._backoff(attempt, retry_after_seconds(e))
+                    attempt += 1
+                    continue
+                self._backoff(attempt)
+                attempt += 1
+                # A batch that fails twice in a row is halved; one failure is usually just a transient 5xx.
+                if len(texts) > 1 and attempt >= 2:
+                    return self._split(texts, attempt)
+                self._count('retries')
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        sub_batches = [texts[start:start + self.sub_batch_size] for start in range(0, len(texts), self.sub_batch_size)]
+        if len(sub_batches) <= 1 or self.max_workers <= 1:
+            return [vector for sub_batch in sub_batches for vector in self._embed_with_retries(sub_batch)]
+        futures = [self.pool.submit(self._embed_with_retries, sub_batch) for sub_batch in sub_batches]
+        return [vector for future in futures for vector in future.result()]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats = {key: 0 for key in self.stats}
+        if self.bucket is not None:
+            self.bucket.waited = 0.0
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['throttle_seconds'] = self.bucket.waited if self.bucket is not None else 0.0
+        return stats
+
+    def report(self):
+        stats = self.get_stats()
+        print(f"Embedding requests: {stats['requests']} sent with {self.max_workers} workers, {stats['retries']} retries, "
+              f"{stats['rate_limited']} throttled by the server, "
+              f"{stats['splits']} sub-batch splits, {stats['failures']} failures, "
+              f"{stats['backoff_seconds']:.1f} s backing off, {stats['throttle_seconds']:.1f} s rate limited")
+
+    def close(self):
+        self.pool.shutdown(wait=False)
@@ -0,0 +1,84 @@
+import heapq
+import itertools
+from itertools import islice
+import re
+
+
+class Frontier:
+    def __init__(self, max_size=None, priority_fn=None):
+        self.max_size = max_size
+        self.priority_fn = priority_fn
+        self._heap = []
+        self._queued = {}
+        self._visited = {}
+        self._counter = itertools.count()
+        self.dropped_count = 0
+
+    def _priority(self, url, depth, priority):
+        # Lower values are popped first; depth breaks ties so equal priorities keep breadth-first order.
+        if priority is None:
+            priority = self.priority_fn(url, depth) if self.priority_fn is not None else 0
+        return (priority, depth)
+
+    def add(self, url, depth, priority=None):
+        if url in self._visited or url in self._queued:
+            return False
+        if self.max_size is not None and len(self._queued) >= self.max_size:
+            self.dropped_count += 1
+            return False
+        self._queued[url] = depth
+        heapq.heappush(self._heap, (*self._priority(url, depth, priority), next(self._counter), url))
+        return True
+
+    def pop(self):
+        url, depth, _ = self.pop_with_priority()
+        return url, depth
+
+    def pop_with_priority(self):
+        priority, _, _, url = heapq.heappop(self._heap)
+        depth = self._queued.pop(url)
+        return url, depth, priority
+
+    def mark_visited(self, url):
+        self._visited[url] = None
+
+    def is_visited(self, url):
+        return url in self._visited
+
+    def is_queued(self, url):
+        return url in self._queued
+
+    def queued_entries(self):
+        for priority, depth, _, url in sorted(self._heap):
+            yield url, depth, priority
+
+    def visited_urls(self, start=0):
+        # Visited URLs in the order they were marked, so callers can persist only the new ones.
+        return islice(self._visited, start, None)
+
+    @property
+    def visited_count(self):
+        return len(self._visited)
+
+    def __contains__(self, url):
+        return url in self._visited or url in self._queued
+
+    def __len__(self):
+        return len(self._queued)
+
+    def __bool__(self):
+        return bool(self._queued)
+
+
+def url_pattern_priority(pattern_scores, default_score=0.0):
+    # Higher pattern scores are crawled first.
+    compiled = [(re.compile(pattern), score) for pattern, score in pattern_scores.items()]
+
+    def priority_fn(url, depth):
+        score = default_score
+        for pattern, pattern_score in compiled:
+            if pattern.search(url):
+                score = max(score, pattern_score)
+        return -score
+
+    return priority_fn
@@ -0,0 +1,149 @@
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin, urlparse
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+BLOCK_TAGS = HEADING_TAGS + ['p', 'li', 'div']
+TEXT_TAGS = BLOCK_TAGS + ['span']
+REMOVED_TAGS = ['nav', 'footer', 'aside', 'script', 'style', 'header', 'form', 'button', 'iframe']
+
+
+class HtmlExtractor:
+    def __init__(self, base_domain, ignored_links, ignored_extensions, parser=None, canonicalizer=None):
+        self.base_domain = base_domain
+        self.ignored_links = ignored_links
+        self.ignored_extensions = ignored_extensions
+        self.parser = parser or DEFAULT_PARSER
+        self.canonicalizer = canonicalizer
+
+    def normalize_url(self, url):
+        if self.canonicalizer is not None:
+            return self.canonicalizer.canonicalize(url)
+        return self.basic_normalize_url(url)
+
+    def basic_normalize_url(self, url):
+        # Fragment and trailing-slash normalization only; kept to measure what canonicalization saves.
+        parsed = urlparse(url)
+        path = parsed.path
+        if not path:
+            path = '/'
+        elif path != '/' and path.endswith('/'):
+            path = path.rstrip('/')
+
+        return parsed._replace(path=path, fragment='').geturl()
+
+    def should_ignore_link(self, url):
+        if any(keyword in url.lower() for keyword in self.ignored_links):
+            return True
+        parsed_url = urlparse(url)
+        if any(parsed_url.path.lower().endswith(ext) for ext in self.ignored_extensions):
+            return True
+        return False
+
+    def is_valid_link(self, link):
+        try:
+            parsed_link = urlparse(link)
+            if parsed_link.scheme not in ['http', 'https']:
+                return False
+
+            if parsed_link.netloc != self.base_domain:
+                return False
+
+            return True
+        except Exception:
+            return False
+
+    def _collect_link(self, links, link_variants, href, current_page_url):
+        full_url = urljoin(current_page_url, href)
+        normalized_url = self.normalize_url(full_url)
+        if self.is_valid_link(normalized_url) and not self.should_ignore_link(normalized_url):
+            links.add(normalized_url)
+            if self.canonicalizer is not None:
+                basic_url = self.basic_normalize_url(full_url)
+                if basic_url != normalized_url:
+                    link_variants[basic_url] = normalized_url
+
+    def extract(self, html_content, current_page_url):
+        # One parse yields the title/sections structure, the link set and the page's canonical URL. Links are
+        # read before boilerplate tags are removed, so links in menus and footers are followed too.
+        soup = BeautifulSoup(html_content, self.parser)
+
+        links = set()
+        link_variants = {}
+        canonical_url = None
+        removed = []
+        for tag in soup.find_all(['a', 'link'] + REMOVED_TAGS):
+            if tag.name == 'a':
+                href = tag.get('href')
+                if href:
+                    self._collect_link(links, link_variants, href, current_page_url)
+            elif tag.name == 'link':
+                if canonical_url is None and 'canonical' in (tag.get('rel') or []) and tag.get('href'):
+                    candidate = self.normalize_url(urljoin(current_page_url, tag['href']))
+                    if self.is_valid_link(candidate):
+                        canonical_url = candidate
+            else:
+                removed.append(tag)
+        for tag in removed:
+            if not tag.decomposed:
+                tag.decompose()
+
+        # The text blocks behind each section are returned separately, for site-wide boilerplate detection.
+        data = self._extract_sections(soup)
+        blocks = [section.pop('blocks') for section in data['sections']]
+        return data, links, {'canonical': canonical_url, 'link_variants': link_variants, 'blocks': blocks}
+
+    def _extract_sections(self, soup):
+        data = {'title': soup.title.string.strip() if soup.title and soup.title.string else '', 'sections': []}
+
+        elements = soup.find_all(TEXT_TAGS)
+
+        # A div only contributes its own text when no block element is nested in it. Marking ancestors once,
+        # stopping at the first already-marked one, replaces a find_all() per div with a linear pass.
+        has_block_descendant = set()
+        for element in elements:
+            if element.name in BLOCK_TAGS:
+                parent = element.parent
+                while parent is not None and id(parent) not in has_block_descendant:
+                    has_block_descendant.add(id(parent))
+                    parent = parent.parent
+
+        current_section_title = None
+        current_section_text = []
+
+        for element in elements:
+            if element.name in HEADING_TAGS:
+                if current_section_title is not None and current_section_text:
+                    data['sections'].append({'section_title': current_section_title, 'text': ' '.join(current_section_text).strip(),
+                                             'blocks': current_section_text})
+                    current_section_text = []
+                current_section_title = element.get_text(separator=' ', strip=True)
+            elif element.name in ['p', 'li'] or \
+                 (element.name == 'div' and id(element) not in has_block_descendant) or \
+                 element.name == 'span':
+
+                text = element.get_text(separator=' ', strip=True)
+                if text:
+                    current_section_text.append(text)
+                if current_section_title is None and not data['sections'] and text:
+                    current_section_title = "Introduction"
+
+        if current_section_title is not None and current_section_text:
+            data['sections'].append({'section_title': current_section_title, 'text': ' '.join(current_section_text).strip(),
+                                     'blocks': current_section_text})
+        elif not data['sections'] and current_section_text:
+            data['sections'].append({'section_title': "Content", 'text': ' '.join(current_section_text).strip(),
+                                     'blocks': current_section_text})
+
+        if not data['sections']:
+            body_text = soup.body.get_text(separator=' ', strip=True) if soup.body else ''
+            if body_text:
+                data['sections'].append({'section_title': "Full Page Content", 'text': body_text, 'blocks': [body_text]})
+
+        data['sections'] = [sec for sec in data['sections'] if sec['text']]
+        return data
@@ -0,0 +1,103 @@
+import time
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+
+class HttpClient:
+    def __init__(self, user_agent, timeout=10, max_body_bytes=5 * 1024 * 1024, pool_maxsize=20,
+                 accepted_content_types=('text/html',)):
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+        self.accepted_content_types = accepted_content_types
+        self.session = requests.Session()
+        self.pool_maxsize = 0
+        self.ensure_pool_size(pool_maxsize)
+        # make_headers advertises br/zstd only when urllib3 can decode them (brotli/zstandard installed).
+        self.session.headers.update({'User-Agent': user_agent, **make_headers(accept_encoding=True)})
+        self.rate_limiter = None
+        self.host_stats = {}
+        self._stats_lock = threading.Lock()
+
+    def ensure_pool_size(self, pool_maxsize):
+        # Keep at least one pooled keep-alive connection per concurrent fetcher.
+        if pool_maxsize <= self.pool_maxsize:
+            return
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.pool_maxsize = pool_maxsize
+
+    def _record(self, host, latency, bytes_transferred, failed):
+        with self._stats_lock:
+            stats = self.host_stats.setdefault(host, {'requests': 0, 'errors': 0, 'bytes': 0,
+                                                      'total_latency': 0.0, 'max_latency': 0.0})
+            stats['requests'] += 1
+            stats['errors'] += int(failed)
+            stats['bytes'] += bytes_transferred
+            stats['total_latency'] += latency
+            stats['max_latency'] = max(stats['max_latency'], latency)
+
+    def fetch(self, url, headers=None, any_content_type=False, max_body_bytes=None):
+        start = time.perf_counter()
+        host = urlparse(url).netloc
+        max_body_bytes = max_body_bytes or self.max_body_bytes
+        response = None
+        status_code = None
+        failed = True
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout, allow_redirects=True, stream=True)
+            status_code = response.status_code
+            response.raise_for_status()
+            failed = False
+            if response.status_code == 304:
+                body = b''
+            else:
+                content_type = response.headers.get('Content-Type', '').lower()
+                if not any_content_type and not any(accepted in content_type for accepted in self.accepted_content_types):
+                    print(f"Skipping non-HTML content at {url} (Content-Type: {content_type})")
+                    return None
+                content_length = response.headers.get('Content-Length', '')
+                if content_length.isdigit() and int(content_length) > max_body_bytes:
+                    print(f"Skipping {url}: Content-Length {content_length} exceeds {max_body_bytes} bytes")
+                    return None
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    body += chunk
+                    if len(body) > max_body_bytes:
+                        print(f"Skipping {url}: body exceeds {max_body_bytes} bytes")
+                        return None
+            # The body was streamed under our size cap; hand it to requests so .content and .text work as usual.
+            response._content = bytes(body)
+            response._content_consumed = True
+            return response
+        finally:
+            latency = time.perf_counter() - start
+            bytes_transferred = 0
+            retry_after = None
+            if response is not None:
+                bytes_transferred = response.raw.tell()
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+            self._record(host, latency, bytes_transferred, failed)
+            if self.rate_limiter is not None:
+                self.rate_limiter.record(host, status_code, latency, retry_after)
+
+    def get_host_stats(self):
+        with self._stats_lock:
+            return {
+                host: {**stats, 'avg_latency': stats['total_latency'] / stats['requests'] if stats['requests'] else 0.0}
+                for host, stats in self.host_stats.items()
+            }
+
+    def report(self):
+        for host, stats in self.get_host_stats().items():
+            print(f"  {host}: {stats['requests']} requests ({stats['errors']} errors), "
+                  f"{stats['bytes'] / 1024:.1f} KiB transferred, "
+                  f"latency avg {stats['avg_latency'] * 1000:.0f} ms / max {stats['max_latency'] * 1000:.0f} ms")
+
+    def close(self):
+        self.session.close()
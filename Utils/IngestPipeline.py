@@ -0,0 +1,169 @@
+import time
+import queue
+import threading
+
+from .Splitter import Splitter
+
+_DONE = object()
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        # Time spent waiting on a full downstream queue, i.e. how much backpressure slowed this stage down.
+        self.blocked_seconds = 0.0
+        self.started = None
+        self.finished = None
+
+    def as_dict(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started if self.started else 0.0
+        return {'items_in': self.items_in, 'items_out': self.items_out, 'busy_seconds': self.busy_seconds,
+                'blocked_seconds': self.blocked_seconds, 'elapsed_seconds': elapsed,
+                'items_per_second': self.items_out / elapsed if elapsed > 0 else 0.0}
+
+
+class IngestPipeline:
+    # Crawl -> split -> index with bounded queues between the stages, so chunks are embedded and indexed while the
+    # crawl is still running. A full queue blocks the stage feeding it, which throttles the crawl to indexing speed.
+    def __init__(self, scraper, vector_db, page_queue_size=64, doc_queue_size=8, batch_size=100, incremental=False,
+                 deduplicator=None):
+        if scraper.recrawl and not incremental:
+            raise ValueError("A recrawl only yields new, changed and deleted pages; use incremental=True to keep the unchanged ones indexed.")
+        self.scraper = scraper
+        self.vector_db = vector_db
+        self.splitter = Splitter(scraper.writer.path)
+        self.page_queue = queue.Queue(maxsize=page_queue_size)
+        self.doc_queue = queue.Queue(maxsize=doc_queue_size)
+        self.batch_size = batch_size
+        self.incremental = incremental
+        # Optional ChunkDeduplicator; repeated chunks are dropped in the split stage, before they reach the index.
+        self.deduplicator = deduplicator
+        self.stats = {name: StageStats(name) for name in ('crawl', 'split', 'index')}
+        self.error = None
+
+    def _put(self, target, item, stats):
+        start = time.perf_counter()
+        target.put(item)
+        stats.blocked_seconds += time.perf_counter() - start
+
+    def _receive_page(self, page_data):
+        stats = self.stats['crawl']
+        stats.items_out += 1
+        self._put(self.page_queue, page_data, stats)
+
+    def _split_stage(self):
+        stats = self.stats['split']
+        stats.started = time.perf_counter()
+        batch = []
+        while True:
+            page_data = self.page_queue.get()
+            if page_data is _DONE:
+                break
+            stats.items_in += 1
+            start = time.perf_counter()
+            try:
+                docs = self.splitter.split_record(page_data)
+                if self.deduplicator is not None:
+                    docs = [doc for doc in docs if self.deduplicator.keep(doc)]
+            except Exception as e:
+                print(f"Error splitting {page_data.get('url', 'Unknown')}: {e}")
+                docs = []
+            stats.busy_seconds += time.perf_counter() - start
+            batch.extend(docs)
+            if len(batch) >= self.batch_size:
+                stats.items_out += len(batch)
+                self._put(self.doc_queue, batch, stats)
+                batch = []
+        if batch:
+            stats.items_out += len(batch)
+            self._put(self.doc_queue, batch, stats)
+        self.doc_queue.put(_DONE)
+        stats.finished = time.perf_counter()
+
+    def _index_stage(self):
+        stats = self.stats['index']
+        stats.started = time.perf_counter()
+        while True:
+            batch = self.doc_queue.get()
+            if batch is _DONE:
+                break
+            stats.items_in += len(batch)
+            if self.error is not None:
+                # Keep draining after a failure so the crawl and split stages never block on a full queue.
+                continue
+            start = time.perf_counter()
+            try:
+                if self.incremental:
+                    self.vector_db.sync_batch(batch)
+                else:
+                    self.vector_db.add_batch(batch)
+                stats.items_out += len(batch)
+            except Exception as e:
+                print(f"Error adding {len(batch)} documents to Chroma: {e}")
+                self.error = e
+            stats.busy_seconds += time.perf_counter() - start
+        stats.finished = time.perf_counter()
+
+    def run(self, concurrency=1, politeness_delay=1, parse_workers=None):
+        self.vector_db.open_vector_db(reset=not self.incremental)
+        if self.deduplicator is not None:
+            self.deduplicator.reset()
+        if self.incremental:
+            self.vector_db.begin_sync()
+        stages = [threading.Thread(target=self._split_stage, name='split-stage', daemon=True),
+                  threading.Thread(target=self._index_stage, name='index-stage', daemon=True)]
+        for stage in stages:
+            stage.start()
+
+        crawl_stats = self.stats['crawl']
+        crawl_stats.started = time.perf_counter()
+        self.scraper.page_sink = self._receive_page
+        try:
+            try:
+                if concurrency > 1:
+                    self.scraper.crawl_website_async(politeness_delay=politeness_delay, concurrency=concurrency,
+                                                     parse_workers=parse_workers)
+                else:
+                    self.scraper.crawl_website(politeness_delay=politeness_delay)
+            finally:
+                self.scraper.page_sink = None
+                crawl_stats.finished = time.perf_counter()
+                self.page_queue.put(_DONE)
+                for stage in stages:
+                    stage.join()
+        except BaseException:
+            self.vector_db.discard_build()
+            raise
+
+        if self.deduplicator is not None and self.error is None:
+            self.vector_db.update_metadata(self.deduplicator.merged_metadata())
+            self.deduplicator.report()
+        if self.incremental and self.error is None:
+            # A recrawl only emits new, changed and deleted pages, so unchanged pages must not be pruned.
+            self.vector_db.finish_sync(self.splitter.removed_sources, prune_missing=not self.scraper.recrawl)
+        if self.error is None:
+            self.vector_db.finish_build()
+        else:
+            # A failed full build leaves the previous index in place.
+            self.vector_db.discard_build()
+        self.report()
+        self.vector_db.report_embedding_stats()
+        if self.error is not None:
+            return None
+        if not self.stats['index'].items_out and not self.incremental:
+            print("No documents were indexed.")
+            return None
+        return self.vector_db.db
+
+    def get_stats(self):
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    def report(self):
+        print("Ingestion pipeline stages:")
+        for name, stats in self.get_stats().items():
+            print(f"  {name}: {stats['items_out']} out in {stats['elapsed_seconds']:.2f} s "
+                  f"({stats['items_per_second']:.1f}/s), busy {stats['busy_seconds']:.2f} s, "
+                  f"blocked on downstream {stats['blocked_seconds']:.2f} s")
@@ -0,0 +1,393 @@
+import os
+import json
+import uuid
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+VECTOR_DTYPES = {'float16': np.float16, 'int8': np.int8}
+
+
+class NumpyVectorStore(VectorStore):
+    # Exact cosine search over L2-normalized embeddings kept in a memory-mapped float16 or int8 matrix (int8 rows
+    # carry a float32 scale), with chunk text and metadata in SQLite. Opening only maps the files, and a search is
+    # a blocked matrix product with a running top-k, so several queries share each pass over the matrix.
+    # Up to max_cache_bytes of the matrix is decoded once into float32 RAM, since NumPy converts float16 slowly and
+    # would otherwise do it on every query; larger stores are streamed from the memory map block by block.
+    # Besides the VectorStore API it offers the subset of Chroma's collection API that VectorDB uses (upsert,
+    # update, get, delete, count, query), so it can stand in for the Chroma collection.
+    def __init__(self, persist_directory: str, embedding_function: Optional[Embeddings] = None,
+                 dtype: str = 'float16', block_rows: int = 65536, max_cache_bytes: int = 256 * 1024 * 1024):
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector dtype '{dtype}'; use one of: {', '.join(VECTOR_DTYPES)}.")
+        os.makedirs(persist_directory, exist_ok=True)
+        self.persist_directory = persist_directory
+        self.embedding_function = embedding_function
+        self.block_rows = block_rows
+        self.max_cache_bytes = max_cache_bytes
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(os.path.join(persist_directory, 'chunks.sqlite'), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chunks (row INTEGER PRIMARY KEY, id TEXT UNIQUE, document TEXT, metadata TEXT,
+                                               source TEXT);
+            CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self.conn.commit()
+        # An existing store keeps the dtype and dimension it was built with.
+        stored = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        self.dtype = stored.get('dtype', dtype)
+        self.dim = int(stored['dim']) if 'dim' in stored else None
+        self._vectors_path = os.path.join(persist_directory, f"vectors.{self.dtype}")
+        self._scales_path = os.path.join(persist_directory, 'scales.float32')
+        self._alive_path = os.path.join(persist_directory, 'alive.uint8')
+        self._maps = None
+        self._decoded = None
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self.embedding_function
+
+    # Storage
+
+    def _rows(self) -> int:
+        return os.path.getsize(self._alive_path) if os.path.exists(self._alive_path) else 0
+
+    def _memmaps(self):
+        # (vectors, scales, alive) mapped read-only; remapped after every write.
+        if self._maps is None:
+            rows = self._rows()
+            if not rows:
+                return None
+            self._maps = (np.memmap(self._vectors_path, dtype=VECTOR_DTYPES[self.dtype], mode='r', shape=(rows, self.dim)),
+                          np.memmap(self._scales_path, dtype=np.float32, mode='r', shape=(rows,)) if self.dtype == 'int8' else None,
+                          np.memmap(self._alive_path, dtype=np.uint8, mode='r', shape=(rows,)))
+        return self._maps
+
+    def _decoded_matrix(self) -> Optional[np.ndarray]:
+        # The whole matrix as float32 (int8 rows already scaled), or None if it exceeds max_cache_bytes.
+        maps = self._memmaps()
+        if maps is None or len(maps[2]) * self.dim * 4 > self.max_cache_bytes:
+            return None
+        if self._decoded is None or len(self._decoded) != len(maps[2]):
+            vectors, scales, _ = maps
+            decoded = np.empty(vectors.shape, dtype=np.float32)
+            for start in range(0, len(decoded), self.block_rows):
+                decoded[start:start + self.block_rows] = vectors[start:start + self.block_rows]
+                if scales is not None:
+                    decoded[start:start + self.block_rows] *= scales[start:start + self.block_rows, np.newaxis]
+            self._decoded = decoded
+        return self._decoded
+
+    def _encode(self, embeddings) -> Tuple[np.ndarray, np.ndarray]:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self.conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                  [('dim', str(self.dim)), ('dtype', self.dtype)])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store's {self.dim}.")
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        if self.dtype == 'float16':
+            return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+        scales = np.clip(np.abs(vectors).max(axis=1), 1e-12, None) / 127.0
+        return np.round(vectors / scales[:, np.newaxis]).astype(np.int8), scales.astype(np.float32)
+
+    def _write_rows(self, rows: Sequence[int], vectors: np.ndarray, scales: np.ndarray) -> None:
+        row_bytes = self.dim * vectors.itemsize
+        with open(self._vectors_path, 'r+b') as vector_file, open(self._alive_path, 'r+b') as alive_file:
+            for row, vector in zip(rows, vectors):
+                vector_file.seek(row * row_bytes)
+                vector_file.write(vector.tobytes())
+                alive_file.seek(row)
+                alive_file.write(b'\x01')
+        if self.dtype == 'int8':
+            with open(self._scales_path, 'r+b') as scale_file:
+                for row, scale in zip(rows, scales):
+                    scale_file.seek(row * 4)
+                    scale_file.write(scale.tobytes())
+
+    def _append_rows(self, vectors: np.ndarray, scales: np.ndarray) -> None:
+        with open(self._vectors_path, 'ab') as vector_file:
+            vector_file.write(vectors.tobytes())
+        with open(self._alive_path, 'ab') as alive_file:
+            alive_file.write(b'\x01' * len(vectors))
+        if self.dtype == 'int8':
+            with open(self._scales_path, 'ab') as scale_file:
+                scale_file.write(scales.tobytes())
+
+    # Chroma collection-compatible subset, as used by VectorDB
+
+    @property
+    def _collection(self) -> 'NumpyVectorStore':
+        # VectorDB talks to Chroma through its collection; this store answers the same calls itself.
+        return self
+
+    def upsert(self, ids: List[str], embeddings, documents: Optional[List[str]] = None,
+               metadatas: Optional[List[dict]] = None) -> None:
+        if not ids:
+            return
+        documents = documents or [''] * len(ids)
+        metadatas = metadatas or [{}] * len(ids)
+        # Repeated IDs within one call: the last occurrence wins, like Chroma.
+        positions = list({chunk_id: i for i, chunk_id in enumerate(ids)}.values())
+        ids = [ids[i] for i in positions]
+        documents = [documents[i] for i in positions]
+        metadatas = [metadatas[i] or {} for i in positions]
+        with self._lock:
+            vectors, scales = self._encode(np.asarray(embeddings, dtype=np.float32)[positions])
+            existing = self._rows_for(ids)
+            replaced = [i for i, chunk_id in enumerate(ids) if chunk_id in existing]
+            appended = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+            if replaced:
+                self._write_rows([existing[ids[i]] for i in replaced], vectors[replaced], scales[replaced])
+            first_row = self._rows()
+            if appended:
+                self._append_rows(vectors[appended], scales[appended])
+            rows = dict(existing)
+            rows.update((ids[i], first_row + n) for n, i in enumerate(appended))
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (row, id, document, metadata, source) VALUES (?, ?, ?, ?, ?)",
+                    [(rows[chunk_id], chunk_id, document, json.dumps(metadata), metadata.get('source'))
+                     for chunk_id, document, metadata in zip(ids, documents, metadatas)])
+            self._maps = None
+            self._decoded = None
+
+    def _rows_for(self, ids: List[str]) -> Dict[str, int]:
+        found = {}
+        for start in range(0, len(ids), 500):
+            part = ids[start:start + 500]
+            placeholders = ",".join("?" * len(part))
+            found.update(self.conn.execute(f"SELECT id, row FROM chunks WHERE id IN ({placeholders})", part).fetchall())
+        return found
+
+    def update(self, ids: List[str], metadatas: List[dict]) -> None:
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE chunks SET metadata = ?, source = ? WHERE id = ?",
+                                  [(json.dumps(metadata or {}), (metadata or {}).get('source'), chunk_id)
+                                   for chunk_id, metadata in zip(ids, metadatas)])
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            include: Sequence[str] = ('documents', 'metadatas'), limit: Optional[int] = None,
+            offset: Optional[int] = None) -> Dict[str, Any]:
+        # where supports {'source': url}, the only filter VectorDB needs; rows come back in insertion order.
+        # 'embeddings' in include returns the stored unit vectors as a float32 matrix.
+        if where and set(where) != {'source'}:
+            raise ValueError("NumpyVectorStore.get only filters on {'source': ...}.")
+        clauses, params = [], []
+        if ids is not None:
+            if not ids:
+                return {'ids': [], 'documents': [], 'metadatas': [], 'embeddings': np.zeros((0, self.dim or 0), dtype=np.float32)}
+            clauses.append(f"id IN ({','.join('?' * len(ids))})")
+            params.extend(ids)
+        if where:
+            clauses.append("source = ?")
+            params.append(where['source'])
+        sql = "SELECT id, document, metadata, row FROM chunks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY row"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit if limit is not None else -1, offset or 0])
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+            embeddings = self._vectors_for_rows([row[3] for row in rows]) if 'embeddings' in include else None
+        return {'ids': [row[0] for row in rows],
+                'documents': [row[1] for row in rows] if 'documents' in include else None,
+                'metadatas': [json.loads(row[2]) for row in rows] if 'metadatas' in include else None,
+                'embeddings': embeddings}
+
+    def _vectors_for_rows(self, rows: List[int]) -> np.ndarray:
+        maps = self._memmaps()
+        if maps is None or not rows:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        vectors, scales, _ = maps
+        decoded = np.asarray(vectors[rows], dtype=np.float32)
+        if scales is not None:
+            decoded *= scales[rows, np.newaxis]
+        return decoded
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._lock:
+            rows = self._rows_for(list(ids))
+            if rows:
+                with open(self._alive_path, 'r+b') as alive_file:
+                    for row in rows.values():
+                        alive_file.seek(row)
+                        alive_file.write(b'\x00')
+                with self.conn:
+                    self.conn.executemany("DELETE FROM chunks WHERE id = ?", [(chunk_id,) for chunk_id in rows])
+                self._maps = None
+        return True
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def query(self, query_embeddings, n_results: int = 10, include: Sequence[str] = ()) -> Dict[str, Any]:
+        rows, scores = self.search_vectors(query_embeddings, n_results)
+        ids = [self._ids_for_rows(query_rows) for query_rows in rows]
+        return {'ids': ids, 'distances': [list(2.0 - 2.0 * query_scores) for query_scores in scores]}
+
+    def reset_collection(self) -> None:
+        with self._lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM chunks")
+                self.conn.execute("DELETE FROM meta")
+            self._maps = None
+            self._decoded = None
+            for path in (self._vectors_path, self._scales_path, self._alive_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.dim = None
+
+    def close(self) -> None:
+        # Releases the memory maps and the SQLite connection so the directory can be moved or removed.
+        with self._lock:
+            self._maps = None
+            self._decoded = None
+            self.conn.close()
+
+    def compact(self, max_dead_ratio: float = 0.2) -> None:
+        # Deleted rows stay in the matrix as dead rows; once they pass max_dead_ratio the files are rewritten.
+        with self._lock:
+            maps = self._memmaps()
+            if maps is None:
+                return
+            vectors, scales, alive = maps
+            live_rows = np.flatnonzero(alive)
+            if len(live_rows) >= (1 - max_dead_ratio) * len(alive):
+                return
+            print(f"Compacting vector store: dropping {len(alive) - len(live_rows)} deleted rows...")
+            for path, data in ((self._vectors_path, vectors), (self._scales_path, scales)):
+                if data is None:
+                    continue
+                with open(f"{path}.tmp", 'wb') as file:
+                    for start in range(0, len(live_rows), self.block_rows):
+                        file.write(np.ascontiguousarray(data[live_rows[start:start + self.block_rows]]).tobytes())
+            with open(f"{self._alive_path}.tmp", 'wb') as file:
+                file.write(b'\x01' * len(live_rows))
+            new_row = {int(old): new for new, old in enumerate(live_rows)}
+            with self.conn:
+                old_rows = [row for (row,) in self.conn.execute("SELECT row FROM chunks ORDER BY row")]
+                # Rows only move down, so renumbering in ascending order never collides.
+                self.conn.executemany("UPDATE chunks SET row = ? WHERE row = ?", [(new_row[row], row) for row in old_rows])
+            self._maps = None
+            self._decoded = None
+            del vectors, scales, alive, maps
+            for path in (self._vectors_path, self._scales_path, self._alive_path):
+                if os.path.exists(f"{path}.tmp"):
+                    os.replace(f"{path}.tmp", path)
+
+    # Search
+
+    def search_vectors(self, query_embeddings, k: int) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        # Top-k rows and cosine similarities for each query, best first. The matrix is read in blocks of
+        # block_rows, each converted to float32 for one BLAS product against all queries.
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        queries = queries / np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+        with self._lock:
+            maps = self._memmaps()
+            decoded = self._decoded_matrix()
+        if maps is None or k <= 0:
+            return [np.zeros(0, dtype=np.int64)] * len(queries), [np.zeros(0, dtype=np.float32)] * len(queries)
+        vectors, scales, alive = maps
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(alive), self.block_rows):
+            end = min(start + self.block_rows, len(alive))
+            if decoded is not None:
+                block_scores = queries @ decoded[start:end].T
+            else:
+                block_scores = queries @ np.asarray(vectors[start:end], dtype=np.float32).T
+                if scales is not None:
+                    block_scores *= scales[start:end]
+            block_scores[:, alive[start:end] == 0] = -np.inf
+            rows = np.broadcast_to(np.arange(start, end), block_scores.shape)
+            best_rows = np.concatenate([best_rows, rows], axis=1)
+            best_scores = np.concatenate([best_scores, block_scores], axis=1)
+            if best_scores.shape[1] > k:
+                top = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, top, axis=1)
+                best_scores = np.take_along_axis(best_scores, top, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        live = np.isfinite(best_scores)
+        return [rows[mask] for rows, mask in zip(best_rows, live)], [scores[mask] for scores, mask in zip(best_scores, live)]
+
+    def _ids_for_rows(self, rows: np.ndarray) -> List[str]:
+        if not len(rows):
+            return []
+        with self._lock:
+            found = dict(self.conn.execute(f"SELECT row, id FROM chunks WHERE row IN ({','.join('?' * len(rows))})",
+                                           [int(row) for row in rows]).fetchall())
+        return [found[int(row)] for row in rows if int(row) in found]
+
+    def _documents_for_rows(self, rows: np.ndarray) -> Dict[int, Document]:
+        if not len(rows):
+            return {}
+        with self._lock:
+            found = self.conn.execute(f"SELECT row, id, document, metadata FROM chunks WHERE row IN ({','.join('?' * len(rows))})",
+                                      [int(row) for row in rows]).fetchall()
+        return {row: Document(id=chunk_id, page_content=document, metadata=json.loads(metadata))
+                for row, chunk_id, document, metadata in found}
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        return self.batch_similarity_search_by_vector([embedding], k)[0]
+
+    def batch_similarity_search_by_vector(self, embeddings, k: int = 4) -> List[List[Tuple[Document, float]]]:
+        # Scores are squared L2 distances between the unit vectors (2 - 2 * cosine), as in Chroma's default space.
+        all_rows, all_scores = self.search_vectors(embeddings, k)
+        documents = self._documents_for_rows(np.concatenate(all_rows) if all_rows else np.zeros(0, dtype=np.int64))
+        return [[(documents[int(row)], float(2.0 - 2.0 * score)) for row, score in zip(rows, scores) if int(row) in documents]
+                for rows, scores in zip(all_rows, all_scores)]
+
+    # VectorStore API
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None,
+                  **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        self.upsert(ids, self.embedding_function.embed_documents(texts), documents=texts, metadatas=metadatas)
+        return ids
+
+    def add_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        ids = kwargs.pop('ids', None) or [doc.id or str(uuid.uuid4()) for doc in documents]
+        return self.add_texts([doc.page_content for doc in documents], [doc.metadata for doc in documents], ids=ids)
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        found = self.get(ids=list(ids))
+        return [Document(id=chunk_id, page_content=document, metadata=metadata)
+                for chunk_id, document, metadata in zip(found['ids'], found['documents'], found['metadatas'])]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding_function.embed_query(query), k)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self._euclidean_relevance_score_fn
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   persist_directory: Optional[str] = None, dtype: str = 'float16', ids: Optional[List[str]] = None,
+                   **kwargs: Any) -> 'NumpyVectorStore':
+        store = cls(persist_directory or os.path.join(os.getcwd(), 'numpy_index'), embedding_function=embedding, dtype=dtype)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -0,0 +1,234 @@
+import os
+import io
+import gzip
+import json
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SHARD_EXTENSIONS = {None: '.jsonl', 'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+MANIFEST_FILE = 'manifest.json'
+
+
+def _shard_compression(file_name):
+    if file_name.endswith('.gz'):
+        return 'gzip'
+    if file_name.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def _compress(data, compression):
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def open_jsonl(path, binary=False):
+    # binary=True yields undecoded lines, so callers can handle invalid UTF-8 per line.
+    compression = _shard_compression(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rb') if binary else gzip.open(path, 'rt', encoding='utf-8')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError(f"Reading {path} requires the zstandard package.")
+        raw = open(path, 'rb')
+        stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True))
+        return stream if binary else io.TextIOWrapper(stream, encoding='utf-8')
+    return open(path, 'rb') if binary else open(path, 'r', encoding='utf-8')
+
+
+def list_shards(path):
+    if not os.path.isdir(path):
+        return [path] if os.path.exists(path) else []
+    return [os.path.join(path, name) for name in sorted(os.listdir(path))
+            if name.startswith('part-') and name.endswith(tuple(SHARD_EXTENSIONS.values()))]
+
+
+def read_jsonl_lines(path, binary=False):
+    # Streams lines from a JSONL file, a .jsonl.gz/.jsonl.zst file or a PageWriter shard directory, in write order.
+    for shard in list_shards(path):
+        with open_jsonl(shard, binary=binary) as infile:
+            for line in infile:
+                yield line
+
+
+class PageWriter:
+    # Buffers scraped pages and appends them in blocks. With compression or max_shard_bytes set, path is a
+    # directory of part-NNNNN shards plus a manifest; each flush appends one gzip member / zstd frame, so a shard
+    # is always readable up to its last flush.
+    def __init__(self, path, compression=None, max_shard_bytes=None, buffer_bytes=1024 * 1024, flush_interval=5.0):
+        if compression not in SHARD_EXTENSIONS:
+            raise ValueError(f"Unknown compression '{compression}'; use one of: gzip, zstd.")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package (pip install zstandard).")
+        self.path = path
+        self.compression = compression
+        self.max_shard_bytes = max_shard_bytes
+        self.sharded = compression is not None or max_shard_bytes is not None
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.records_written = 0
+        self.flush_count = 0
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._buffered_records = 0
+        self._last_flush = time.monotonic()
+        self._file = None
+        self._shards = None
+
+    def _load_shards(self):
+        # [{'file', 'records', 'bytes'}] for the shards already on disk, taken from the manifest when it is current.
+        if self._shards is not None:
+            return self._shards
+        manifest = {}
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as file:
+                    manifest = {shard['file']: shard for shard in json.load(file).get('shards', [])}
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable manifest {manifest_path}: {e}")
+        self._shards = []
+        for shard_path in list_shards(self.path) if os.path.isdir(self.path) else []:
+            name = os.path.basename(shard_path)
+            size = os.path.getsize(shard_path)
+            entry = manifest.get(name)
+            if entry is None or entry.get('bytes') != size:
+                entry = {'file': name, 'records': self._count_records(shard_path), 'bytes': size}
+            self._shards.append(dict(entry))
+        return self._shards
+
+    def _count_records(self, shard_path):
+        try:
+            with open_jsonl(shard_path) as infile:
+                return sum(1 for _ in infile)
+        except (OSError, EOFError, ImportError) as e:
+            print(f"Could not read shard {shard_path}: {e}")
+            return 0
+
+    def _write_manifest(self):
+        manifest = {'compression': self.compression, 'records': sum(shard['records'] for shard in self._shards),
+                    'shards': self._shards}
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    def _current_shard(self):
+        shards = self._load_shards()
+        current = shards[-1] if shards else None
+        if (current is None or _shard_compression(current['file']) != self.compression
+                or (self.max_shard_bytes is not None and current['bytes'] >= self.max_shard_bytes)):
+            current = {'file': f"part-{len(shards):05d}{SHARD_EXTENSIONS[self.compression]}", 'records': 0, 'bytes': 0}
+            shards.append(current)
+        return current
+
+    def write(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        self._buffer.append(line)
+        self._buffered_bytes += len(line)
+        self._buffered_records += 1
+        self.records_written += 1
+        if self._buffered_bytes >= self.buffer_bytes or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        data = b''.join(self._buffer)
+        try:
+            if self.sharded:
+                os.makedirs(self.path, exist_ok=True)
+                shard = self._current_shard()
+                block = _compress(data, self.compression)
+                with open(os.path.join(self.path, shard['file']), 'ab') as file:
+                    file.write(block)
+                shard['records'] += self._buffered_records
+                shard['bytes'] += len(block)
+                self._write_manifest()
+            else:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    self._file = open(self.path, 'ab')
+                self._file.write(data)
+                self._file.flush()
+        except IOError as e:
+            print(f"Error saving data to {self.path}: {e}")
+        self.flush_count += 1
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._buffered_records = 0
+
+    def tell(self):
+        # Position after everything written so far, flushed or not: a byte offset for a plain JSONL file and a
+        # record count for shards, whose compressed sizes are only known at flush time.
+        if self.sharded:
+            return sum(shard['records'] for shard in self._load_shards()) + self._buffered_records
+        if self._file is not None:
+            return self._file.tell() + self._buffered_bytes
+        return (os.path.getsize(self.path) if os.path.exists(self.path) else 0) + self._buffered_bytes
+
+    def truncate(self, position):
+        # Drops everything after a position returned by tell(), e.g. pages written after the last checkpoint.
+        self.flush()
+        if not self.sharded:
+            self.close()
+            if os.path.exists(self.path):
+                os.truncate(self.path, position)
+            return
+        shards = self._load_shards()
+        kept = []
+        remaining = position
+        for shard in shards:
+            shard_path = os.path.join(self.path, shard['file'])
+            if remaining <= 0:
+                os.remove(shard_path)
+                continue
+            if shard['records'] > remaining:
+                self._rewrite_shard(shard, remaining)
+            remaining -= shard['records']
+            kept.append(shard)
+        self._shards = kept
+        self._write_manifest()
+
+    def _rewrite_shard(self, shard, records):
+        shard_path = os.path.join(self.path, shard['file'])
+        lines = []
+        with open_jsonl(shard_path) as infile:
+            for line in infile:
+                if len(lines) == records:
+                    break
+                lines.append(line.encode('utf-8'))
+        block = _compress(b''.join(lines), _shard_compression(shard['file']))
+        with open(shard_path + '.tmp', 'wb') as file:
+            file.write(block)
+        os.replace(shard_path + '.tmp', shard_path)
+        shard['records'] = records
+        shard['bytes'] = len(block)
+
+    def size(self):
+        return sum(os.path.getsize(shard) for shard in list_shards(self.path))
+
+    def clear(self):
+        self.close()
+        for shard_path in list_shards(self.path):
+            os.remove(shard_path)
+        if os.path.isdir(self.path):
+            manifest_path = os.path.join(self.path, MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+        self._shards = None
+        self.records_written = 0
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -3,16 +3,27 @@ from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnablePassthrough, RunnableParallel
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.messages import HumanMessage, AIMessage
-from typing import Any, Optional, Union, List
+from langchain_core.documents import Document
+from typing import Any, Dict, Optional, Union, List
 from operator import itemgetter 
+from .ContextSelection import merge_overlapping_chunks
+from .ContextPacker import ContextPacker
+from .ChatCache import ChatCache
 
 class RAG:
-    def __init__(self):
+    def __init__(self, context_packer: Optional[ContextPacker] = None, cache: Optional[ChatCache] = None):
         self.chat_history: List[Union[AIMessage, HumanMessage]] = []
+        # Retrieved chunks and history are packed into the packer's token budget; token_usage keeps one record
+        # per chat request.
+        self.context_packer = context_packer or ContextPacker()
+        self.token_usage: List[Dict[str, Any]] = []
+        # Optional cache of reformulations, retrieved chunks and answers, which can be shared between sessions.
+        self.cache = cache
         
     @staticmethod
     def getprocessedcontent(docs):
-        processed_content = "\n\n".join([doc.page_content for doc in docs])
+        # Overlapping chunks of the same page are joined first, so shared text reaches the prompt once.
+        processed_content = "\n\n".join([doc.page_content for doc in merge_overlapping_chunks(docs)])
         return processed_content
     
     @staticmethod
@@ -24,8 +35,9 @@ class RAG:
                      content: Optional[str] = None) -> Any: 
         
         if content is not None: 
+            # Like the retrieval branch, takes the question and history variables as a dict and adds the context.
             rag_chain = (
-                {"context": lambda _: content, "question": RunnablePassthrough()} 
+                RunnablePassthrough.assign(context=lambda _: content)
                 | prompt
                 | llm 
                 | StrOutputParser()
@@ -60,14 +72,17 @@ class RAG:
     def get_formatted_messages(self):
         return [msg for msg in self.chat_history if isinstance(msg, HumanMessage) or isinstance(msg, AIMessage)]
     
-    def get_formatted_history_str(self):
-        history_str = ""
+    def get_formatted_history_lines(self) -> List[str]:
+        lines = []
         for msg in self.chat_history[:-1]:
             if isinstance(msg, HumanMessage):
-                history_str += f"Human: {msg.content}\n"
+                lines.append(f"Human: {msg.content}")
             elif isinstance(msg, AIMessage):
-                history_str += f"AI: {msg.content}\n"
-        return history_str.strip()
+                lines.append(f"AI: {msg.content}")
+        return lines
+
+    def get_formatted_history_str(self):
+        return "\n".join(self.get_formatted_history_lines()).strip()
 
     def chat(self, query: str, retriever: Any = None, llm: Any = None,
              include_history: bool = True, memory_key: str = "chat_history", 
@@ -77,21 +92,34 @@ class RAG:
         if llm is None:
             raise ValueError("An LLM must be provided to chat")
         
+        cache = self.cache
+        if cache is not None:
+            cache.check_index_version()
         
         history_for_reformulation = self.get_formatted_messages() 
 
         reformulated_query = query
         if use_question_reformulation and history_for_reformulation: 
-            contextualize_chain = self.create_contextualize_chain(llm)
-            try:
-                reformulated_query = contextualize_chain.invoke({
-                    "input": query,
-                    "chat_history": history_for_reformulation 
-                })
-                print(f"Original query: '{query}' --- Reformulated: '{reformulated_query}'")
-            except Exception as e:
-                print(f"Question reformulation failed: {e}. Using original query.")
-                reformulated_query = query
+            reformulation_key, cached_query = None, None
+            if cache is not None:
+                reformulation_key = cache.fingerprint(cache.normalize_query(query),
+                                                      *(f"{msg.type}: {msg.content}" for msg in history_for_reformulation))
+                cached_query = cache.get('reformulation', reformulation_key)
+            if cached_query is not None:
+                reformulated_query = cached_query
+            else:
+                contextualize_chain = self.create_contextualize_chain(llm)
+                try:
+                    reformulated_query = contextualize_chain.invoke({
+                        "input": query,
+                        "chat_history": history_for_reformulation 
+                    })
+                    print(f"Original query: '{query}' --- Reformulated: '{reformulated_query}'")
+                    if reformulation_key is not None:
+                        cache.put('reformulation', reformulation_key, reformulated_query)
+                except Exception as e:
+                    print(f"Question reformulation failed: {e}. Using original query.")
+                    reformulated_query = query
         
         
         self.chat_history.append(HumanMessage(content=query))
@@ -122,23 +150,66 @@ class RAG:
         
  
         current_prompt = RAG.create_prompt(template)
-        
+
+        # Chunks are retrieved here rather than inside the chain, so they can be packed into the token budget.
+        if content is not None:
+            docs = [Document(page_content=content)]
+        elif cache is None:
+            docs = retriever.invoke(reformulated_query)
+        else:
+            retrieval_key = cache.fingerprint(cache.normalize_query(reformulated_query), RAG.retriever_key(retriever))
+            docs = cache.get('retrieval', retrieval_key)
+            if docs is None:
+                docs = retriever.invoke(reformulated_query)
+                cache.put('retrieval', retrieval_key, docs)
+        packer = self.context_packer
+        reserved_tokens = packer.count_tokens(template) + packer.count_tokens(reformulated_query)
+        packed = packer.pack(docs, history=self.get_formatted_history_lines() if include_history else (),
+                             reserved_tokens=reserved_tokens)
  
-        chain = RAG.create_chain(retriever=retriever, content=content, llm=llm, prompt=current_prompt)
+        chain = RAG.create_chain(retriever=None, content=packed['context'], llm=llm, prompt=current_prompt)
         
   
         chain_input = {"question": reformulated_query}
         if include_history:
-            chain_input[memory_key] = self.get_formatted_history_str()
+            chain_input[memory_key] = packed['history']
         
-        response_str = chain.invoke(chain_input) 
+        # The answer key covers everything the prompt is built from, so a hit is an answer to the same prompt.
+        response_str = None
+        if cache is not None:
+            answer_key = cache.fingerprint(cache.normalize_query(reformulated_query), template,
+                                           packed['history'], packed['context'])
+            response_str = cache.get('answer', answer_key)
+        cached_answer = response_str is not None
+        if not cached_answer:
+            response_str = chain.invoke(chain_input) 
+            if cache is not None:
+                cache.put('answer', answer_key, response_str)
         
         self.chat_history.append(AIMessage(content=response_str))
+
+        usage = dict(packed['usage'], response_tokens=packer.count_tokens(response_str), cached_answer=cached_answer)
+        self.token_usage.append(usage)
+        if cached_answer:
+            print(f"Answered from cache ({usage['response_tokens']} tokens)")
+        else:
+            print(f"Prompt: {usage['prompt_tokens']} of {usage['budget']} tokens ({usage['context_tokens']} context from "
+                  f"{usage['chunks_used']} of {usage['chunks']} chunks, {usage['history_tokens']} history), "
+                  f"response: {usage['response_tokens']} tokens")
         
         return response_str
     
     def get_chat_history(self) -> List[Union[AIMessage, HumanMessage]]:
         return self.chat_history
     
+    @staticmethod
+    def retriever_key(retriever: Any) -> str:
+        # Retrievers with different settings return different chunks for the same question.
+        settings = {name: getattr(retriever, name, None) for name in ('mode', 'search_type', 'search_kwargs')}
+        return f"{type(retriever).__name__}:{sorted((name, repr(value)) for name, value in settings.items())}"
+
+    def get_token_usage(self) -> List[Dict[str, Any]]:
+        return self.token_usage
+
     def clear_chat_history(self) -> None:
         self.chat_history = []
\ No newline at end of file
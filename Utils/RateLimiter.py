@@ -0,0 +1,114 @@
+import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostRateLimiter:
+    # AIMD on the request rate per host: each healthy response adds rate_step requests/second,
+    # slow responses and server errors cut the rate, and 429/503 halve it and honor Retry-After.
+    def __init__(self, initial_delay=1.0, min_delay=0.05, max_delay=60.0, target_latency=1.0,
+                 rate_step=0.25, slow_factor=0.8, backoff_factor=0.5, adaptive=True):
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+        self.rate_step = rate_step
+        self.slow_factor = slow_factor
+        self.backoff_factor = backoff_factor
+        self.adaptive = adaptive
+        self.hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = {'delay': max(self.min_delay, self.initial_delay), 'crawl_delay': 0.0, 'next_allowed': 0.0,
+                                'backoffs': 0}
+        return self.hosts[host]
+
+    def _set_delay(self, state, delay):
+        floor = max(self.min_delay, state['crawl_delay'])
+        state['delay'] = min(self.max_delay, max(floor, delay))
+
+    def set_crawl_delay(self, host, crawl_delay):
+        with self._lock:
+            state = self._host(host)
+            state['crawl_delay'] = float(crawl_delay or 0.0)
+            self._set_delay(state, state['delay'])
+
+    def reserve(self, host):
+        # Claims the next request slot for host and returns how long the caller must wait for it.
+        with self._lock:
+            state = self._host(host)
+            now = time.monotonic()
+            slot = max(now, state['next_allowed'])
+            state['next_allowed'] = slot + state['delay']
+            return slot - now
+
+    def record(self, host, status_code, latency, retry_after=None):
+        with self._lock:
+            state = self._host(host)
+            if status_code in (429, 503):
+                state['backoffs'] += 1
+                self._set_delay(state, state['delay'] / self.backoff_factor)
+                wait = parse_retry_after(retry_after)
+                if wait is not None:
+                    state['next_allowed'] = max(state['next_allowed'], time.monotonic() + wait)
+            elif not self.adaptive:
+                return
+            elif status_code is None or status_code >= 500 or latency > self.target_latency:
+                self._set_delay(state, state['delay'] / self.slow_factor)
+            else:
+                self._set_delay(state, 1.0 / (1.0 / state['delay'] + self.rate_step))
+
+    def get_rates(self):
+        with self._lock:
+            return {
+                host: {'requests_per_second': 1.0 / state['delay'], 'delay': state['delay'],
+                       'crawl_delay': state['crawl_delay'], 'backoffs': state['backoffs']}
+                for host, state in self.hosts.items()
+            }
+
+    def report(self):
+        for host, rate in self.get_rates().items():
+            crawl_delay = f", robots Crawl-delay {rate['crawl_delay']:g}s" if rate['crawl_delay'] else ''
+            print(f"  {host}: {rate['requests_per_second']:.2f} requests/second ({rate['backoffs']} backoffs{crawl_delay})")
+
+
+class TokenBucket:
+    # Allows bursts of up to capacity calls, refilled at rate calls/second; acquire() blocks until a token is free.
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1.0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
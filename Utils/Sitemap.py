@@ -0,0 +1,98 @@
+import io
+import gzip
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+import requests
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element, name):
+    for child in element:
+        if _local_name(child.tag) == name and child.text:
+            return child.text.strip()
+    return None
+
+
+def parse_lastmod(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class SitemapReader:
+    def __init__(self, http_client, max_sitemaps=50, max_sitemap_bytes=50 * 1024 * 1024):
+        self.http_client = http_client
+        self.max_sitemaps = max_sitemaps
+        self.max_sitemap_bytes = max_sitemap_bytes
+
+    def _fetch_xml(self, sitemap_url):
+        try:
+            response = self.http_client.fetch(sitemap_url, any_content_type=True, max_body_bytes=self.max_sitemap_bytes)
+        except requests.exceptions.RequestException as e:
+            print(f"Could not fetch sitemap {sitemap_url}: {e}")
+            return None
+        if response is None:
+            return None
+        content = response.content
+        # .xml.gz sitemaps usually arrive as application/gzip rather than with Content-Encoding, so requests leaves them compressed.
+        if content[:2] == b'\x1f\x8b':
+            # Decompressed output is capped too, so a small gzip bomb cannot expand into gigabytes in memory.
+            try:
+                with gzip.GzipFile(fileobj=io.BytesIO(content)) as stream:
+                    content = stream.read(self.max_sitemap_bytes + 1)
+            except (OSError, EOFError) as e:
+                print(f"Invalid gzip sitemap {sitemap_url}: {e}")
+                return None
+            if len(content) > self.max_sitemap_bytes:
+                print(f"Skipping sitemap {sitemap_url}: decompresses to more than {self.max_sitemap_bytes} bytes.")
+                return None
+        try:
+            return ET.fromstring(content)
+        except ET.ParseError as e:
+            print(f"Invalid sitemap XML at {sitemap_url}: {e}")
+            return None
+
+    def read(self, sitemap_urls):
+        entries = {}
+        pending = list(sitemap_urls)
+        seen = set()
+        while pending and len(seen) < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+            root = self._fetch_xml(sitemap_url)
+            if root is None:
+                continue
+
+            root_name = _local_name(root.tag)
+            if root_name == 'sitemapindex':
+                for sitemap in root:
+                    loc = _child_text(sitemap, 'loc')
+                    if loc:
+                        pending.append(loc)
+            elif root_name == 'urlset':
+                for url_element in root:
+                    loc = _child_text(url_element, 'loc')
+                    if not loc:
+                        continue
+                    try:
+                        priority = float(_child_text(url_element, 'priority') or 0.5)
+                    except ValueError:
+                        priority = 0.5
+                    entries[loc] = {'url': loc, 'lastmod': parse_lastmod(_child_text(url_element, 'lastmod')),
+                                    'priority': priority}
+        if pending:
+            print(f"Stopped reading sitemaps after {self.max_sitemaps} files; {len(pending)} not read.")
+        print(f"Read {len(entries)} URLs from {len(seen)} sitemap(s).")
+        return list(entries.values())
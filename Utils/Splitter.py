@@ -1,82 +1,223 @@
 import os
 import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from langchain_text_splitters import RecursiveJsonSplitter, RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
+from .PageWriter import read_jsonl_lines, list_shards, open_jsonl
+
+CHUNK_SIZE = 2000
+CHUNK_OVERLAP = 200
+
+_worker_text_splitter = None
+
+
+def page_text(json_obj):
+    text_sections = []
+    for section in json_obj.get('sections', []):
+        if isinstance(section, dict) and 'text' in section:
+            text_sections.append(section['text'])
+    return "\n".join(text_sections).strip()
+
+
+def page_metadata(json_obj):
+    return {"source": json_obj.get("url", "Unknown"), "title": json_obj.get("title", "No Title")}
+
+
+def chunk_ids(url, chunks):
+    # Stable IDs from the page URL, the chunk's content hash and how often that text already occurred on the page,
+    # so an unchanged chunk keeps its ID when text is added or removed elsewhere on the page.
+    ids = []
+    occurrences = {}
+    for chunk in chunks:
+        content_hash = hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+        occurrence = occurrences.get(content_hash, 0)
+        occurrences[content_hash] = occurrence + 1
+        ids.append(hashlib.sha256(f"{url}\0{content_hash}\0{occurrence}".encode('utf-8')).hexdigest()[:32])
+    return ids
+
+
+def _read_range_lines(path, start, end):
+    # Undecoded lines that start inside [start, end) of a plain JSONL file; end=None reads a whole (possibly
+    # compressed) file.
+    if end is None:
+        with open_jsonl(path, binary=True) as infile:
+            yield from infile
+        return
+    with open(path, 'rb') as infile:
+        if start > 0:
+            infile.seek(start - 1)
+            infile.readline()
+        while infile.tell() < end:
+            line = infile.readline()
+            if not line:
+                break
+            yield line
+
+
+def _split_range(path, start, end, chunk_size, chunk_overlap):
+    # Runs in a worker process: returns (id, page_content, metadata) for the range's chunks, in file order.
+    global _worker_text_splitter
+    if _worker_text_splitter is None:
+        _worker_text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = []
+    errors = 0
+    removed_sources = []
+    for line in _read_range_lines(path, start, end):
+        # Only unreadable lines are skipped; any other error is a bug and stops the split.
+        try:
+            json_obj = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            errors += 1
+            continue
+        full_text = page_text(json_obj)
+        if full_text:
+            metadata = page_metadata(json_obj)
+            text_chunks = _worker_text_splitter.split_text(full_text)
+            chunks.extend((chunk_id, chunk, metadata)
+                          for chunk_id, chunk in zip(chunk_ids(metadata['source'], text_chunks), text_chunks))
+        elif 'url' in json_obj:
+            removed_sources.append(json_obj['url'])
+    return chunks, errors, removed_sources
+
 
 class Splitter:
     def __init__(self, input_file):
         self.input_file = input_file  
         self.splitter = RecursiveJsonSplitter(max_chunk_size=2000)
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,
-            chunk_overlap=200
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP
         )
         self.chunks = None
         self.docs = None
+        self.doc_count = 0
+        self.removed_sources = set()
     
     def split_jsonl(self):
         if not os.path.exists(self.input_file):
             print(f"File not found: {self.input_file}")
             return []
         
-        with open(self.input_file, 'r', encoding='utf-8') as infile:
-            all_chunks = []
-            for line in infile:
-                try:
-                    json_obj = json.loads(line)
-                    chunks = self.splitter.split_json(json_obj)
-                    all_chunks.extend(chunks)  
-                except json.JSONDecodeError:
-                    print(f"Invalid JSON line: {line}")
-            
-            self.chunks = all_chunks
-            return self.chunks
+        all_chunks = []
+        for line in read_jsonl_lines(self.input_file):
+            try:
+                json_obj = json.loads(line)
+                chunks = self.splitter.split_json(json_obj)
+                all_chunks.extend(chunks)  
+            except json.JSONDecodeError:
+                print(f"Invalid JSON line: {line}")
+        
+        self.chunks = all_chunks
+        return self.chunks
    
-    def split_jsonl_to_doc(self):
+    def split_record(self, json_obj):
+        full_text = page_text(json_obj)
+        if not full_text:
+            # Deleted pages (from a recrawl) and pages without text leave no chunks behind in an incremental index.
+            if 'url' in json_obj:
+                self.removed_sources.add(json_obj['url'])
+            return []
+        metadata = page_metadata(json_obj)
+        text_chunks = self.text_splitter.split_text(full_text)
+        return [Document(id=chunk_id, page_content=chunk, metadata=dict(metadata))
+                for chunk_id, chunk in zip(chunk_ids(metadata['source'], text_chunks), text_chunks)]
+
+    def iter_documents(self):
+        # Yields chunk Documents one page at a time, so memory does not grow with the size of the crawl.
+        self.doc_count = 0
+        self.removed_sources.clear()
         if not os.path.exists(self.input_file):
             print(f"File not found: {self.input_file}")
-            return []
-       
-        all_docs = []
-        with open(self.input_file, 'r', encoding='utf-8') as infile:
-            for line_num, line in enumerate(infile, 1):
-                try:
-                    json_obj = json.loads(line)
-                    sections = json_obj.get('sections', [])
-                    
-                    text_sections = []
-                    for section in sections:
-                        if isinstance(section, dict) and 'text' in section:
-                            text_sections.append(section['text'])
-                    
-                    full_text = "\n".join(text_sections).strip()
-                    if not full_text:
-                        print(f"No valid text content in JSON object: {json_obj.get('url', 'Unknown')}")
-                        continue
-                    
- 
-                    text_chunks = self.text_splitter.split_text(full_text)
-                    
-
-                    for chunk in text_chunks:
-                        doc = Document(
-                            page_content=chunk,
-                            metadata={
-                                "source": json_obj.get("url", "Unknown"),
-                                "title": json_obj.get("title", "No Title")
-                            }
-                        )
-                        all_docs.append(doc)
-                    
-                    print(f"Processed line {line_num}: Created {len(text_chunks)} documents")
-                    
-                except json.JSONDecodeError:
-                    print(f"Invalid JSON line {line_num}: {line[:50]}...")
-                except Exception as e:
-                    print(f"Unexpected error while processing line {line_num}: {str(e)}")
-       
-        self.docs = all_docs
-        return all_docs
+            return
+
+        errors = 0
+        for line in read_jsonl_lines(self.input_file, binary=True):
+            try:
+                json_obj = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                errors += 1
+                continue
+            docs = self.split_record(json_obj)
+            self.doc_count += len(docs)
+            yield from docs
+        if errors:
+            print(f"Skipped {errors} invalid JSON lines.")
+        print(f"Created {self.doc_count} documents.")
+
+    def iter_batches(self, batch_size=500):
+        batch = []
+        for doc in self.iter_documents():
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _plan_ranges(self, range_bytes):
+        # Plain JSONL is cut into byte ranges; compressed shards cannot be seeked, so each is one range.
+        ranges = []
+        for path in list_shards(self.input_file):
+            if path.endswith('.jsonl'):
+                size = os.path.getsize(path)
+                ranges.extend((path, start, min(start + range_bytes, size)) for start in range(0, size, range_bytes))
+            else:
+                ranges.append((path, 0, None))
+        return ranges
+
+    def iter_batches_parallel(self, workers=None, batch_size=500, range_bytes=4 * 1024 * 1024):
+        # Chunks byte ranges of the input in a process pool. Results are consumed in range order with at most
+        # two ranges per worker in flight, so output order and metadata match iter_documents().
+        self.doc_count = 0
+        self.removed_sources.clear()
+        if not os.path.exists(self.input_file):
+            print(f"File not found: {self.input_file}")
+            return
+        workers = workers or os.cpu_count() or 1
+        ranges = self._plan_ranges(range_bytes)
+        print(f"Splitting {len(ranges)} ranges of {self.input_file} with {workers} worker(s)...")
+
+        def range_results():
+            if workers == 1:
+                for path, start, end in ranges:
+                    yield _split_range(path, start, end, CHUNK_SIZE, CHUNK_OVERLAP)
+                return
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = []
+                for path, start, end in ranges:
+                    pending.append(executor.submit(_split_range, path, start, end, CHUNK_SIZE, CHUNK_OVERLAP))
+                    if len(pending) >= 2 * workers:
+                        yield pending.pop(0).result()
+                for future in pending:
+                    yield future.result()
+
+        batch = []
+        errors = 0
+        for chunks, range_errors, removed_sources in range_results():
+            errors += range_errors
+            self.removed_sources.update(removed_sources)
+            for chunk_id, page_content, metadata in chunks:
+                batch.append(Document(id=chunk_id, page_content=page_content, metadata=dict(metadata)))
+                if len(batch) >= batch_size:
+                    self.doc_count += len(batch)
+                    yield batch
+                    batch = []
+        if batch:
+            self.doc_count += len(batch)
+            yield batch
+        if errors:
+            print(f"Skipped {errors} invalid JSON lines.")
+        print(f"Created {self.doc_count} documents.")
+
+    def iter_documents_parallel(self, workers=None, range_bytes=4 * 1024 * 1024):
+        # Same documents in the same order as iter_documents(), chunked in a process pool.
+        for batch in self.iter_batches_parallel(workers=workers, range_bytes=range_bytes):
+            yield from batch
+
+    def split_jsonl_to_doc(self):
+        self.docs = list(self.iter_documents())
+        return self.docs
     
     def get_chunk_count(self):
         if self.chunks is None:
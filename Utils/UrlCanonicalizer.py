@@ -0,0 +1,49 @@
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+TRACKING_PARAMS = ['fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', '_gl', 'yclid', 'igshid']
+TRACKING_PARAM_PREFIXES = ['utm_']
+DEFAULT_DOCUMENTS = ['index.html', 'index.htm', 'index.php', 'index.asp', 'index.aspx', 'default.asp', 'default.aspx', 'default.htm']
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class UrlCanonicalizer:
+    def __init__(self, strip_params=None, strip_param_prefixes=None, keep_params=None, sort_params=True,
+                 default_documents=None):
+        self.strip_params = set(TRACKING_PARAMS if strip_params is None else strip_params)
+        self.strip_param_prefixes = tuple(TRACKING_PARAM_PREFIXES if strip_param_prefixes is None else strip_param_prefixes)
+        # When keep_params is set, only those query parameters survive (e.g. ['id', 'page'] for a CMS).
+        self.keep_params = set(keep_params) if keep_params is not None else None
+        self.sort_params = sort_params
+        self.default_documents = set(DEFAULT_DOCUMENTS if default_documents is None else default_documents)
+
+    def _keep_param(self, name):
+        if self.keep_params is not None:
+            return name in self.keep_params
+        return name not in self.strip_params and not name.lower().startswith(self.strip_param_prefixes)
+
+    def canonicalize(self, url):
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+
+        netloc = parsed.netloc.lower()
+        try:
+            port = parsed.port
+        except ValueError:
+            port = None
+        if port is not None and DEFAULT_PORTS.get(scheme) == port:
+            netloc = netloc.rsplit(':', 1)[0]
+
+        path = parsed.path
+        head, _, last_segment = path.rpartition('/')
+        if last_segment.lower() in self.default_documents:
+            path = head + '/'
+        if not path:
+            path = '/'
+        elif path != '/' and path.endswith('/'):
+            path = path.rstrip('/') or '/'
+
+        params = [(name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True) if self._keep_param(name)]
+        if self.sort_params:
+            params.sort()
+
+        return parsed._replace(scheme=scheme, netloc=netloc, path=path, query=urlencode(params), fragment='').geturl()
@@ -1,74 +1,443 @@
 import os
+import uuid
+import shutil
+import hashlib
+import sqlite3
+import numpy as np
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.documents import Document
 from langchain_chroma import Chroma
 from langchain_core.retrievers import BaseRetriever
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from typing import List, Optional, Tuple, Any, Dict
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from .EmbeddingCache import EmbeddingCache, CachedEmbeddings, text_hash
+from .EmbeddingExecutor import EmbeddingExecutor
+from .EmbeddingBackends import make_embeddings
+from .ChunkDeduplicator import ChunkDeduplicator
+from .BM25Index import BM25Index
+from .NumpyVectorStore import NumpyVectorStore
+from .ContextSelection import maximal_marginal_relevance
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from typing import Collection, Iterable, Iterator, List, Optional, Set, Tuple, Any, Dict
+
+RETRIEVAL_MODES = ('vector', 'lexical', 'hybrid')
+VECTOR_BACKENDS = ('chroma', 'numpy')
+# search_kwargs that only VectorDB.search understands.
+SEARCH_OPTIONS = ('fetch_k', 'rrf_k', 'mmr', 'lambda_mult')
+# A full build writes to a staging collection (or numpy_index directory) that replaces the live one once it succeeds.
+STAGING_SUFFIX = '_staging'
+
+
+def document_id(doc: Document) -> str:
+    # Splitter gives every chunk a deterministic ID. Documents made elsewhere without one get a stable ID from their
+    # source and text, so building them again replaces them instead of adding copies.
+    if doc.id:
+        return doc.id
+    source = (doc.metadata or {}).get('source', '')
+    return hashlib.sha256(f"{source}\0{text_hash(doc.page_content)}".encode('utf-8')).hexdigest()[:32]
+
+
+def _with_id(doc: Document) -> Document:
+    if doc.id:
+        return doc
+    return Document(id=document_id(doc), page_content=doc.page_content, metadata=doc.metadata or {})
+
+
+def read_index_version(persist_directory: Optional[str]) -> Optional[str]:
+    # None for an index built before versions were recorded, or without a persist directory.
+    try:
+        with open(os.path.join(persist_directory, 'index_version')) as file:
+            return file.read().strip()
+    except (OSError, TypeError):
+        return None
+
+
+def _copy_legacy_embedding_cache(legacy_path: str, path: str) -> None:
+    # The cache used to sit beside persist_directory, where stores sharing a parent directory collided. An existing
+    # one is copied into the store on first use so its vectors are not paid for again.
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    source, target = sqlite3.connect(legacy_path), sqlite3.connect(path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+
+class VectorDBRetriever(BaseRetriever):
+    # Retriever for the lexical and hybrid modes and MMR re-ranking of VectorDB.search; plain vector search uses
+    # the store's own retriever.
+    vector_db: Any
+    mode: str = 'hybrid'
+    search_kwargs: Dict[str, Any] = {}
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.vector_db.search(query, mode=self.mode, **self.search_kwargs)
 
 class VectorDB:
-    def __init__(self, embedding_model: str = 'models/text-embedding-004', persist_directory: Optional[str] = None):
-        
-        print(f"VectorDB initializing with embedding model: {embedding_model}") 
+    def __init__(self, embedding_model: str = 'models/text-embedding-004', persist_directory: Optional[str] = None,
+                 embedding_function: Optional[Embeddings] = None, use_embedding_cache: bool = True,
+                 embedding_cache_path: Optional[str] = None, embedding_cache_max_bytes: int = 512 * 1024 * 1024,
+                 embedding_workers: Optional[int] = None, embedding_requests_per_second: Optional[float] = None,
+                 embedding_sub_batch_size: int = 100, embedding_max_retries: int = 5,
+                 embedding_backend: Optional[str] = None, embedding_options: Optional[Dict[str, Any]] = None,
+                 lexical_index: bool = True, backend: Optional[str] = None, vector_dtype: str = 'float16'):
         
-        google_api_key = os.getenv('GOOGLE_API_KEY')
-        if not google_api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables.")
+        # 'google' (default), 'onnx' (local CPU model; embedding_model is then an optional model directory) or
+        # 'hashing' (deterministic, for tests). The EMBEDDING_BACKEND environment variable sets the default.
+        self.embedding_backend = embedding_backend or os.getenv('EMBEDDING_BACKEND', 'google')
+        if embedding_function is not None:
+            # Any LangChain Embeddings object, e.g. a local model or a fake one for tests.
+            self.embedding_model = embedding_function
+            self.embedding_name = getattr(embedding_function, 'model', type(embedding_function).__name__)
+        else:
+            if self.embedding_backend == 'google':
+                print(f"VectorDB initializing with embedding model: {embedding_model}") 
+            else:
+                print(f"VectorDB initializing with {self.embedding_backend} embeddings")
+            # For onnx, a non-default embedding_model is read as the model directory.
+            model = None if embedding_model == 'models/text-embedding-004' and self.embedding_backend != 'google' else embedding_model
+            try:
+                self.embedding_model = make_embeddings(self.embedding_backend, model, **(embedding_options or {}))
+            except Exception as e:
+                print(f"Error initializing {self.embedding_backend} embeddings: {e}")
+                raise
+            # Backends are cached under separate names so their vectors never mix.
+            self.embedding_name = embedding_model if self.embedding_backend == 'google' else self.embedding_model.model
+        if embedding_workers is None:
+            # Local backends already use every core per batch; more threads only contend with each other.
+            embedding_workers = 4 if self.embedding_backend == 'google' or embedding_function is not None else 1
 
-        try:
-            self.embedding_model = GoogleGenerativeAIEmbeddings(
-                model=embedding_model,
-                google_api_key=google_api_key 
-            )
-        except Exception as e:
-            print(f"Error initializing GoogleGenerativeAIEmbeddings: {e}")
-            raise
+        # Cache misses are embedded concurrently under a request rate limit, with retries.
+        self.embedding_executor = EmbeddingExecutor(self.embedding_model, max_workers=embedding_workers,
+                                                    requests_per_second=embedding_requests_per_second,
+                                                    sub_batch_size=embedding_sub_batch_size,
+                                                    max_retries=embedding_max_retries)
+        self.embedding_model = self.embedding_executor
+
+        # Chunks whose text was embedded before by the same model are served from disk instead of the API.
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        if use_embedding_cache and embedding_cache_path is None and persist_directory:
+            embedding_cache_path = os.path.join(persist_directory, 'embedding_cache.sqlite')
+            _copy_legacy_embedding_cache(os.path.join(os.path.dirname(os.path.abspath(persist_directory)), 'embedding_cache.sqlite'),
+                                    embedding_cache_path)
+        if use_embedding_cache and embedding_cache_path:
+            self.embedding_cache = EmbeddingCache(embedding_cache_path, max_bytes=embedding_cache_max_bytes)
+            self.embedding_model = CachedEmbeddings(self.embedding_model, self.embedding_cache, model_name=self.embedding_name)
             
         self.persist_directory = persist_directory
         self.collection_name = "document_collection"
-        self.db: Optional[Chroma] = None # This will hold the Chroma DB instance
+        # 'chroma' (default) or 'numpy', an exact memory-mapped float16/int8 matrix in persist_directory/numpy_index.
+        # The VECTOR_BACKEND environment variable sets the default.
+        self.backend = backend or os.getenv('VECTOR_BACKEND', 'chroma')
+        if self.backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend '{self.backend}'; use one of: {', '.join(VECTOR_BACKENDS)}.")
+        if self.backend == 'numpy' and not persist_directory:
+            raise ValueError("The numpy vector backend needs a persist_directory.")
+        self.vector_dtype = vector_dtype
+        self.db: Optional[VectorStore] = None # This will hold the Chroma (or NumpyVectorStore) instance
+        self.index_stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+        # A BM25 index over the same chunks, saved with the collection, for lexical and hybrid retrieval.
+        self.bm25: Optional[BM25Index] = BM25Index() if lexical_index else None
+        self.bm25_path = os.path.join(persist_directory, 'bm25_index.npz') if persist_directory else None
+        # Rewritten after every build or sync, so caches of search results can tell that the index changed.
+        self.index_version_path = os.path.join(persist_directory, 'index_version') if persist_directory else None
+        self._staging = False
+        self._synced_ids: Set[str] = set()
+        self._synced_sources: Set[str] = set()
         
-    def make_vector_db(self, documents: List[Document], chroma_upsert_batch_size: int = 4000) -> Optional[Chroma]:
+    @staticmethod
+    def _iter_batches(documents: Iterable[Document], batch_size: int) -> Iterator[List[Document]]:
+        iterator = iter(documents)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def make_vector_db(self, documents: Iterable[Document], chroma_upsert_batch_size: int = 4000,
+                       incremental: bool = False, removed_sources: Collection[str] = (),
+                       prune_missing: bool = True, deduplicator: Optional[ChunkDeduplicator] = None) -> Optional[Chroma]:
+        # documents may be a list or a lazy stream such as Splitter.iter_documents(); only one batch is held at a time.
+        # A full build replaces the collection. incremental=True diffs against it instead: only new chunks are
+        # embedded, chunks that left a page are deleted, and so are pages in removed_sources (read after the stream
+        # is consumed, e.g. Splitter.removed_sources) and, with prune_missing, every page not in the stream.
+        # With a deduplicator, repeated chunks are dropped before embedding and the kept copy lists every source.
         if not self.embedding_model:
             print("Embedding model not initialized. Cannot create vector DB.")
             return None
-        if not documents:
+        document_count = len(documents) if isinstance(documents, list) else None
+        documents = (_with_id(doc) for doc in documents)
+        if deduplicator is not None:
+            deduplicator.reset()
+            documents = deduplicator.filter(documents)
+        iterator = iter(documents)
+        first_document = next(iterator, None)
+        if first_document is None and not incremental:
             print("No documents provided to create vector database.")
             return None
             
-        print(f"Initializing Chroma DB client for collection '{self.collection_name}' using {self.embedding_model.model}...")
+        self.open_vector_db(reset=not incremental)
+        try:
+            self._build(chain([first_document] if first_document is not None else [], iterator), document_count,
+                        chroma_upsert_batch_size, incremental, removed_sources, prune_missing, deduplicator)
+        except BaseException:
+            self.discard_build()
+            raise
+        if self.persist_directory:
+            print(f"Chroma DB changes should be persisted to {self.persist_directory} automatically.")
+        self.report_embedding_stats()
+        return self.db
+
+    def _build(self, documents: Iterable[Document], document_count: Optional[int], chroma_upsert_batch_size: int,
+               incremental: bool, removed_sources: Collection[str], prune_missing: bool,
+               deduplicator: Optional[ChunkDeduplicator]) -> None:
+        if incremental:
+            self.begin_sync()
+
+        total_batches = '?'
+        if document_count is not None:
+            print(f"Adding {document_count} documents to Chroma DB in batches of {chroma_upsert_batch_size}...")
+            total_batches = (document_count + chroma_upsert_batch_size - 1) // chroma_upsert_batch_size
+        else:
+            print(f"Streaming documents to Chroma DB in batches of {chroma_upsert_batch_size}...")
+
+        num_documents = 0
+        # Chroma writes run on their own thread, so batch N is written while batch N+1 is being embedded.
+        writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chroma-write')
+        pending_write = None
         try:
-            self.db = Chroma(
-                collection_name=self.collection_name,
-                embedding_function=self.embedding_model,
-                persist_directory=self.persist_directory,
-            )
+            for current_batch_number, batch_documents in enumerate(self._iter_batches(documents, chroma_upsert_batch_size), 1):
+                num_documents += len(batch_documents)
+                
+                print(f"Adding batch {current_batch_number}/{total_batches} with {len(batch_documents)} documents...")
+                
+                try:
+                    if incremental:
+                        self.sync_batch(batch_documents)
+                    else:
+                        prepared = self.embed_batch(batch_documents)
+                        if pending_write is not None:
+                            pending_write.result()
+                        pending_write = writer.submit(self.write_batch, *prepared)
+                except Exception as e:
+                    print(f"Error adding batch {current_batch_number} of documents to Chroma: {e}")
+                    raise 
+            if pending_write is not None:
+                pending_write.result()
+        finally:
+            writer.shutdown(wait=True)
+        if deduplicator is not None:
+            self.update_metadata(deduplicator.merged_metadata())
+            deduplicator.report()
+        if incremental:
+            self.finish_sync(removed_sources, prune_missing)
+        self.finish_build()
+        print(f"Vector database processing complete. {num_documents} documents processed into collection '{self.collection_name}'.")
+
+    def _numpy_index_path(self, staging: bool = False) -> str:
+        return os.path.join(self.persist_directory, 'numpy_index' + (STAGING_SUFFIX if staging else ''))
+
+    def _create_store(self, staging: bool = False) -> VectorStore:
+        if self.backend == 'numpy':
+            return NumpyVectorStore(self._numpy_index_path(staging), embedding_function=self.embedding_model,
+                                    dtype=self.vector_dtype)
+        return Chroma(
+            collection_name=self.collection_name + (STAGING_SUFFIX if staging else ''),
+            embedding_function=self.embedding_model,
+            persist_directory=self.persist_directory,
+        )
+
+    def open_vector_db(self, reset: bool = False) -> VectorStore:
+        if self.embedding_cache is not None:
+            self.embedding_cache.reset_stats()
+        self.embedding_executor.reset_stats()
+        self.index_stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+        print(f"Initializing {self.backend} vector store for collection '{self.collection_name}' using {self.embedding_name}...")
+        if reset and self.backend == 'numpy':
+            # Left behind by a build that was interrupted; removed so the new store takes the configured dtype.
+            shutil.rmtree(self._numpy_index_path(staging=True), ignore_errors=True)
+        try:
+            # A reset builds into a staging store, so the live collection keeps serving until finish_build swaps
+            # the new one in, and a failed build leaves it untouched.
+            self.db = self._create_store(staging=reset)
         except Exception as e:
-            print(f"Error initializing Chroma client: {e}")
+            print(f"Error initializing {self.backend} vector store: {e}")
             raise
+        self._staging = reset
+        if reset and self.db._collection.count():
+            self.db.reset_collection()
+        if self.bm25 is not None:
+            if reset:
+                self.bm25.clear()
+            else:
+                self._load_bm25_index()
+        return self.db
 
-        num_documents = len(documents)
-        print(f"Adding {num_documents} documents to Chroma DB in batches of {chroma_upsert_batch_size}...")
+    def _load_bm25_index(self) -> None:
+        # A missing or out-of-date index file (e.g. from before the BM25 index existed) is rebuilt from the collection.
+        count = self.db._collection.count()
+        loaded = BM25Index.load(self.bm25_path) if self.bm25_path else None
+        if loaded is not None and len(loaded) == count:
+            self.bm25 = loaded
+            return
+        print(f"Building the BM25 index from {count} documents in collection '{self.collection_name}'...")
+        self.bm25.clear()
+        offset = 0
+        while True:
+            page = self.db._collection.get(include=['documents'], limit=5000, offset=offset)
+            if not page['ids']:
+                break
+            self.bm25.add(Document(id=chunk_id, page_content=text or '') for chunk_id, text in zip(page['ids'], page['documents']))
+            offset += len(page['ids'])
+        self.save_bm25_index()
 
-        for i in range(0, num_documents, chroma_upsert_batch_size):
+    def save_bm25_index(self) -> None:
+        if self.bm25 is not None and self.bm25_path:
+            self.bm25.save(self.bm25_path)
 
-            batch_documents = documents[i:i + chroma_upsert_batch_size]
-            current_batch_number = (i // chroma_upsert_batch_size) + 1
-            total_batches = (num_documents + chroma_upsert_batch_size - 1) // chroma_upsert_batch_size
-            
-            print(f"Adding batch {current_batch_number}/{total_batches} with {len(batch_documents)} documents...")
-            
+    def finish_build(self) -> None:
+        # Called once a build or sync is complete.
+        if self._staging:
+            self._promote_staging()
+        self.save_bm25_index()
+        if isinstance(self.db, NumpyVectorStore):
+            self.db.compact()
+        self.bump_index_version()
+
+    def _promote_staging(self) -> None:
+        print(f"Replacing collection '{self.collection_name}' with the new build.")
+        if isinstance(self.db, NumpyVectorStore):
+            self.db.close()
+            live, old = self._numpy_index_path(), self._numpy_index_path() + '_old'
+            shutil.rmtree(old, ignore_errors=True)
+            if os.path.exists(live):
+                os.replace(live, old)
+            os.replace(self._numpy_index_path(staging=True), live)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
             try:
-                self.db.add_documents(documents=batch_documents)
-            except Exception as e:
-                print(f"Error adding batch {current_batch_number} of documents to Chroma: {e}")
-                raise 
-        if self.persist_directory:
-            print(f"Chroma DB changes should be persisted to {self.persist_directory} automatically.")
+                self.db._client.delete_collection(self.collection_name)
+            except ValueError:
+                pass  # No previous collection.
+            self.db._collection.modify(name=self.collection_name)
+        self._staging = False
+        self.db = self._create_store()
 
-        print(f"Vector database processing complete. {num_documents} documents processed into collection '{self.collection_name}'.")
-        return self.db
-            
-    def load_vector_db(self) -> Optional[Chroma]:
+    def discard_build(self) -> None:
+        # Drops the staging store of a failed full build and goes back to the live collection.
+        if not self._staging:
+            return
+        print(f"Build failed; keeping the existing collection '{self.collection_name}'.")
+        if isinstance(self.db, NumpyVectorStore):
+            self.db.close()
+            shutil.rmtree(self._numpy_index_path(staging=True), ignore_errors=True)
+        else:
+            try:
+                self.db._client.delete_collection(self.collection_name + STAGING_SUFFIX)
+            except ValueError:
+                pass
+        self._staging = False
+        self.db = None
+        self.load_vector_db()
+
+    def bump_index_version(self) -> None:
+        if not self.index_version_path:
+            return
+        os.makedirs(self.persist_directory, exist_ok=True)
+        temp_path = f"{self.index_version_path}.tmp"
+        with open(temp_path, 'w') as file:
+            file.write(uuid.uuid4().hex)
+        os.replace(temp_path, self.index_version_path)
+
+    def index_version(self) -> Optional[str]:
+        return read_index_version(self.persist_directory)
+
+    def embed_batch(self, documents: List[Document]) -> Tuple[List[Document], List[List[float]]]:
+        unique = list({doc.id: doc for doc in map(_with_id, documents)}.values())
+        return unique, self.embedding_model.embed_documents([doc.page_content for doc in unique])
+
+    def write_batch(self, documents: List[Document], embeddings: List[List[float]]) -> None:
+        # Chunk IDs are deterministic, so upserting a chunk that is already indexed replaces it instead of duplicating it.
+        # Chroma rejects empty metadata dicts but accepts None.
+        self.db._collection.upsert(ids=[doc.id for doc in documents], embeddings=embeddings,
+                                   documents=[doc.page_content for doc in documents],
+                                   metadatas=[doc.metadata or None for doc in documents])
+        if self.bm25 is not None:
+            self.bm25.add(documents)
+        self.index_stats['added'] += len(documents)
+
+    def add_batch(self, documents: List[Document]) -> None:
+        self.write_batch(*self.embed_batch(documents))
+
+    def update_metadata(self, metadatas: Dict[str, dict]) -> None:
+        # Rewrites metadata of chunks that are already indexed, without embedding them again.
+        ids = list(metadatas)
+        for start in range(0, len(ids), 5000):
+            part = ids[start:start + 5000]
+            self.db._collection.update(ids=part, metadatas=[metadatas[chunk_id] for chunk_id in part])
+        self.index_stats['updated'] += len(ids)
+
+    def begin_sync(self) -> None:
+        # The IDs and sources of every synced chunk are kept until finish_sync, so a page's chunks may arrive in any
+        # order and spread over any number of batches; nothing is deleted before the whole stream is seen.
+        self._synced_ids = set()
+        self._synced_sources = set()
+
+    def sync_batch(self, documents: List[Document]) -> None:
+        unique = {doc.id: doc for doc in map(_with_id, documents)}
+        existing = self.db._collection.get(ids=list(unique), include=['metadatas'])
+        existing_metadata = dict(zip(existing['ids'], existing['metadatas']))
+
+        new_documents = [doc for chunk_id, doc in unique.items() if chunk_id not in existing_metadata]
+        changed = [doc for chunk_id, doc in unique.items()
+                   if chunk_id in existing_metadata and (existing_metadata[chunk_id] or {}) != (doc.metadata or {})]
+        if new_documents:
+            self.add_batch(new_documents)
+        if changed:
+            self.db._collection.update(ids=[doc.id for doc in changed], metadatas=[doc.metadata or None for doc in changed])
+            self.index_stats['updated'] += len(changed)
+        self.index_stats['unchanged'] += len(unique) - len(new_documents) - len(changed)
+
+        self._synced_ids.update(unique)
+        self._synced_sources.update(doc.metadata['source'] for doc in unique.values() if doc.metadata.get('source'))
+
+    def _delete_ids(self, ids: List[str]) -> None:
+        for start in range(0, len(ids), 5000):
+            self.db._collection.delete(ids=ids[start:start + 5000])
+        if self.bm25 is not None:
+            self.bm25.remove(ids)
+        self.index_stats['deleted'] += len(ids)
+
+    def finish_sync(self, removed_sources: Collection[str] = (), prune_missing: bool = True) -> None:
+        # A chunk that was not in the stream is stale if its page was (the page changed), if its page was removed,
+        # or, with prune_missing, whatever its page.
+        removed = set(removed_sources) - self._synced_sources
+        stale = []
+        offset = 0
+        while True:
+            page = self.db._collection.get(include=['metadatas'], limit=5000, offset=offset)
+            if not page['ids']:
+                break
+            for chunk_id, metadata in zip(page['ids'], page['metadatas']):
+                source = (metadata or {}).get('source')
+                if chunk_id not in self._synced_ids and (prune_missing or source in self._synced_sources or source in removed):
+                    stale.append(chunk_id)
+            offset += len(page['ids'])
+        self._delete_ids(stale)
+        print(f"Incremental index update: {self.index_stats['added']} chunks embedded and added, "
+              f"{self.index_stats['updated']} metadata updates, {self.index_stats['unchanged']} unchanged, "
+              f"{self.index_stats['deleted']} deleted.")
+
+    def report_embedding_stats(self) -> None:
+        self.embedding_executor.report()
+        if self.embedding_cache is not None:
+            self.embedding_cache.report()
+
+    def load_vector_db(self) -> Optional[VectorStore]:
         if not self.embedding_model:
             print("Embedding model not initialized. Cannot load vector DB.")
             return None
@@ -76,18 +445,16 @@ class VectorDB:
             print(f"Persist directory '{self.persist_directory}' not provided or doesn't exist.")
             return None
             
-        print(f"Loading vector database from {self.persist_directory} using {self.embedding_model.model}...")
+        print(f"Loading vector database from {self.persist_directory} using {self.embedding_name}...")
         
         try:
-            self.db = Chroma(
-                collection_name=self.collection_name,
-                embedding_function=self.embedding_model, 
-                persist_directory=self.persist_directory
-            )
+            self.db = self._create_store()
             print(f"Vector database loaded successfully.")
+            if self.bm25 is not None:
+                self._load_bm25_index()
             return self.db
         except Exception as e:
-            print(f"Error loading Chroma vector database from {self.persist_directory}: {e}")
+            print(f"Error loading {self.backend} vector database from {self.persist_directory}: {e}")
             return None 
             
     def similarity_search(self, query: str, db: Chroma, k: int = 4 ) -> List[Document]:
@@ -126,7 +493,80 @@ class VectorDB:
             print(f"Error during similarity search with score: {e}")
             return []
             
-    def get_retriever(self, search_kwargs: Optional[Dict[str, Any]] = None) -> Optional[BaseRetriever]:
+    def get_documents(self, ids: List[str]) -> List[Document]:
+        # Chunks by ID, in the order given.
+        return self.get_documents_with_embeddings(ids)[0] if ids else []
+
+    def get_documents_with_embeddings(self, ids: List[str], with_embeddings: bool = False) -> Tuple[List[Document], Optional[np.ndarray]]:
+        # Chunks by ID in the order given, and optionally their stored embeddings as rows of a matrix.
+        if not ids:
+            return [], None
+        include = ['documents', 'metadatas'] + (['embeddings'] if with_embeddings else [])
+        found = self.db._collection.get(ids=ids, include=include)
+        position = {chunk_id: index for index, chunk_id in enumerate(found['ids'])}
+        present = [chunk_id for chunk_id in ids if chunk_id in position]
+        docs = [Document(id=chunk_id, page_content=found['documents'][position[chunk_id]],
+                         metadata=found['metadatas'][position[chunk_id]] or {}) for chunk_id in present]
+        embeddings = None
+        if with_embeddings:
+            embeddings = np.asarray([found['embeddings'][position[chunk_id]] for chunk_id in present], dtype=np.float32)
+        return docs, embeddings
+
+    def vector_search_ids(self, query: str, k: int) -> List[str]:
+        return [chunk_id for chunk_id, _ in self.vector_search_scores(query, k)]
+
+    def vector_search_scores(self, query: str, k: int) -> List[Tuple[str, float]]:
+        # (chunk ID, cosine similarity) pairs, best first. Both stores return squared L2 distances between unit
+        # vectors, which are 2 - 2 * cosine.
+        embedding = self.embedding_model.embed_query(query)
+        found = self.db._collection.query(query_embeddings=[embedding], n_results=k, include=['distances'])
+        return [(chunk_id, 1.0 - distance / 2.0) for chunk_id, distance in zip(found['ids'][0], found['distances'][0])]
+
+    def ranked_ids(self, query: str, n: int, mode: str = 'hybrid', fetch_k: int = 20, rrf_k: int = 60) -> List[Tuple[str, float]]:
+        # The top n (chunk ID, score) pairs of one retrieval mode, best first. Scores are cosine similarities for
+        # 'vector', BM25 scores for 'lexical' and reciprocal rank fusion scores for 'hybrid'.
+        if mode == 'vector':
+            return self.vector_search_scores(query, n)
+        lexical = self.bm25.search(query, n if mode == 'lexical' else max(n, fetch_k))
+        if mode == 'lexical':
+            return lexical
+
+        fused: Dict[str, float] = {}
+        for ranking in ([chunk_id for chunk_id, _ in lexical], self.vector_search_ids(query, max(n, fetch_k))):
+            for rank, chunk_id in enumerate(ranking, 1):
+                fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (rrf_k + rank)
+        return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    def search(self, query: str, k: int = 4, mode: str = 'hybrid', fetch_k: int = 20, rrf_k: int = 60,
+               mmr: bool = False, lambda_mult: float = 0.5) -> List[Document]:
+        # 'lexical' answers from the BM25 index alone, with no embedding call. 'hybrid' fuses the top fetch_k
+        # results of both searches by reciprocal rank, sum(1 / (rrf_k + rank)), which needs no score calibration.
+        # With mmr, the top fetch_k candidates of the mode are re-ranked by maximal marginal relevance over their
+        # stored embeddings, so near-identical chunks do not fill all k slots. Lexical and hybrid scores are scaled
+        # by the best candidate's to be comparable with cosine similarities.
+        if not self.db:
+            self.load_vector_db()
+            if not self.db:
+                print("No vector database loaded. Cannot perform search.")
+                return []
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}'; use one of: {', '.join(RETRIEVAL_MODES)}.")
+        if mode != 'vector' and self.bm25 is None:
+            raise ValueError(f"Retrieval mode '{mode}' needs the BM25 index; create VectorDB with lexical_index=True.")
+
+        if not mmr:
+            return self.get_documents([chunk_id for chunk_id, _ in self.ranked_ids(query, k, mode, fetch_k, rrf_k)])
+
+        candidates = dict(self.ranked_ids(query, max(k, fetch_k), mode, fetch_k, rrf_k))
+        docs, embeddings = self.get_documents_with_embeddings(list(candidates), with_embeddings=True)
+        if not docs:
+            return []
+        relevance = np.array([candidates[doc.id] for doc in docs], dtype=np.float32)
+        if mode != 'vector':
+            relevance /= max(float(relevance.max()), 1e-12)
+        return [docs[index] for index in maximal_marginal_relevance(relevance, embeddings, k, lambda_mult)]
+
+    def get_retriever(self, search_kwargs: Optional[Dict[str, Any]] = None, mode: str = 'vector') -> Optional[BaseRetriever]:
         if not self.db:
             print("No vector database (self.db) loaded or created. Attempting to load...")
             if self.persist_directory and os.path.exists(self.persist_directory):
@@ -141,8 +581,17 @@ class VectorDB:
         if search_kwargs is None:
             search_kwargs = {"k": 4} 
             
+        if mode != 'vector' or search_kwargs.get('mmr'):
+            if mode not in RETRIEVAL_MODES or (mode != 'vector' and self.bm25 is None):
+                print(f"Retrieval mode '{mode}' is not available; use 'vector' or enable the BM25 index.")
+                return None
+            return VectorDBRetriever(vector_db=self, mode=mode, search_kwargs=search_kwargs)
+
         try:
-            retriever = self.db.as_retriever(search_kwargs=search_kwargs)
+            # The store's similarity search only takes k (and a filter); options of VectorDB.search would make every
+            # query raise a TypeError.
+            store_kwargs = {key: value for key, value in search_kwargs.items() if key not in SEARCH_OPTIONS}
+            retriever = self.db.as_retriever(search_kwargs=store_kwargs)
             return retriever
         except Exception as e:
             print(f"Error creating retriever: {e}")
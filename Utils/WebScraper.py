@@ -1,18 +1,49 @@
 import os
-import json
+import math
+import hashlib
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 import time
-from collections import deque
+import asyncio
+import threading
+from urllib.robotparser import RobotFileParser
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .Frontier import Frontier
+from .CrawlState import CrawlState
+from .HtmlExtractor import HtmlExtractor
+from .HttpClient import HttpClient
+from .RateLimiter import HostRateLimiter
+from .Sitemap import SitemapReader
+from .UrlCanonicalizer import UrlCanonicalizer
+from .PageWriter import PageWriter
+from .BoilerplateDetector import BoilerplateDetector
+
+# Rough chunk count for a page of text at Splitter's 2000-character chunks with 200 characters of overlap.
+CHUNK_CHARS_ESTIMATE = 1800
 
 class WebScraper:
-    def __init__(self, base_url, max_depth=3, max_crawl_duration=None, max_pages_to_scrape=None):
-        self.base_url = self._normalize_url(base_url)
-        self.base_domain = urlparse(self.base_url).netloc
+    def __init__(self, base_url, max_depth=3, max_crawl_duration=None, max_pages_to_scrape=None,
+                 max_frontier_size=None, priority_fn=None, state_file=None, resume=False, checkpoint_interval=50,
+                 recrawl=False, html_parser=None, max_body_bytes=5 * 1024 * 1024, adaptive_rate=True, max_retries=2,
+                 use_sitemaps=True, respect_robots=True, canonicalizer=None, writer=None, strip_boilerplate=False):
+        self.canonicalizer = canonicalizer or UrlCanonicalizer()
+        self.base_domain = urlparse(self.canonicalizer.canonicalize(base_url)).netloc
         self.max_depth = max_depth
         self.max_crawl_duration = max_crawl_duration
         self.max_pages_to_scrape = max_pages_to_scrape
+        self.max_frontier_size = max_frontier_size
+        self.priority_fn = priority_fn
+        self.crawl_state = CrawlState(state_file) if state_file else None
+        self.resume = resume
+        self.checkpoint_interval = checkpoint_interval
+        if recrawl and self.crawl_state is None:
+            raise ValueError("recrawl requires a state_file to store page validators between crawls.")
+        self.recrawl = recrawl
+        self.change_counts = {'new': 0, 'changed': 0, 'unchanged': 0, 'deleted': 0}
+        self.frontier = None
+        self.dedup_stats = {'fetches_saved': 0, 'duplicate_pages': 0, 'chunks_saved': 0}
+        self._seen_link_variants = set()
+        self._aliased_urls = set()
         self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         self.ignored_links = [
             "login", "signup", "register", "signin", "auth", "account", "cart", "checkout",
@@ -27,112 +58,110 @@ class WebScraper:
             '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
             '.zip', '.tar', '.gz', '.rar', '.7z'
         ]
+        self.http_client = HttpClient(self.user_agent, max_body_bytes=max_body_bytes)
+        self.adaptive_rate = adaptive_rate
+        self.max_retries = max_retries
+        self.use_sitemaps = use_sitemaps
+        self.respect_robots = respect_robots
+        self._robots_lock = threading.Lock()
+        self._start_rate_limiter(1)
+        self.extractor = HtmlExtractor(self.base_domain, self.ignored_links, self.ignored_extensions, parser=html_parser,
+                                       canonicalizer=self.canonicalizer)
+        self.base_url = self._normalize_url(base_url)
+        # One writer per scraper: pages are buffered and appended in blocks instead of reopening the file per page.
+        self.writer = writer or PageWriter(self._get_output_file())
+        # Optional callable that receives every saved page record, e.g. to index pages while the crawl runs. It may
+        # block to apply backpressure; concurrent crawls call it from a separate thread, off the event loop.
+        self.page_sink = None
+        # Optionally, text blocks repeated across the site (menus, banners, sidebars) are learned during the crawl and
+        # stripped. Off by default: the detector learns as pages arrive, so which copies survive depends on crawl
+        # order, and concurrent or resumed crawls can produce different text for the same site.
+        self.boilerplate = BoilerplateDetector() if strip_boilerplate else None
+
     def _normalize_url(self, url):
+        return self.extractor.normalize_url(url)
+
+    def _start_rate_limiter(self, politeness_delay):
+        # politeness_delay is the starting gap between requests to a host; the limiter adapts it from there.
+        self.rate_limiter = HostRateLimiter(initial_delay=politeness_delay, adaptive=self.adaptive_rate)
+        self.http_client.rate_limiter = self.rate_limiter
+        self.robots = {}
+
+    def _get_robots(self, url):
         parsed = urlparse(url)
-        path = parsed.path
-        if not path:
-            path = '/'
-        elif path != '/' and path.endswith('/'):
-            path = path.rstrip('/')
-        
-        return parsed._replace(path=path, fragment='').geturl()
+        with self._robots_lock:
+            if parsed.netloc in self.robots:
+                return self.robots[parsed.netloc]
+            robots = RobotFileParser()
+            robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+            lines = []
+            try:
+                response = self.http_client.fetch(robots_url, any_content_type=True)
+                if response is not None:
+                    lines = response.text.splitlines()
+            except requests.exceptions.RequestException as e:
+                print(f"Could not read {robots_url} ({e}); assuming no restrictions.")
+            robots.parse(lines)
+            robots.modified()
 
-    def _fetch_page(self, url):
-        try:
-            headers = {'User-Agent': self.user_agent}
-            response = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
-            response.raise_for_status()
-            content_type = response.headers.get('Content-Type', '').lower()
-            if 'text/html' not in content_type:
-                print(f"Skipping non-HTML content at {url} (Content-Type: {content_type})")
-                return None
-            return response
-        except requests.exceptions.HTTPError as e:
-            print(f"HTTP error fetching {url}: {e}")
-        except requests.exceptions.ConnectionError as e:
-            print(f"Connection error fetching {url}: {e}")
-        except requests.exceptions.Timeout as e:
-            print(f"Timeout fetching {url}: {e}")
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching {url}: {e}")
-        return None
+            crawl_delay = robots.crawl_delay(self.user_agent)
+            request_rate = robots.request_rate(self.user_agent)
+            if request_rate and request_rate.requests:
+                crawl_delay = max(crawl_delay or 0, request_rate.seconds / request_rate.requests)
+            if crawl_delay:
+                print(f"Using robots.txt Crawl-delay of {crawl_delay}s for {parsed.netloc}")
+                self.rate_limiter.set_crawl_delay(parsed.netloc, crawl_delay)
+            self.robots[parsed.netloc] = robots
+            return robots
 
-    def _should_ignore_link(self, url):
-        if any(keyword in url.lower() for keyword in self.ignored_links):
-            return True
-        parsed_url = urlparse(url)
-        if any(parsed_url.path.lower().endswith(ext) for ext in self.ignored_extensions):
-            return True
-        return False
+    def _is_disallowed(self, url):
+        return self.respect_robots and not self._get_robots(url).can_fetch(self.user_agent, url)
 
-    def _is_valid_link(self, link):
-        try:
-            parsed_link = urlparse(link)
-            if parsed_link.scheme not in ['http', 'https']:
-                return False
-            
-            if parsed_link.netloc != self.base_domain:
-                return False
-            
-            return True
-        except Exception:
-            return False 
-
-    def _extract_links_from_html(self, html_content, current_page_url):
-        soup = BeautifulSoup(html_content, 'html.parser')
-        links = set()
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
-            if href: 
-                full_url = urljoin(current_page_url, href)
-                normalized_url = self._normalize_url(full_url)
-                
-                if self._is_valid_link(normalized_url) and not self._should_ignore_link(normalized_url):
-                    links.add(normalized_url)
-        return links
+    def _seed_from_sitemaps(self, frontier):
+        robots = self._get_robots(self.base_url)
+        parsed = urlparse(self.base_url)
+        sitemap_urls = robots.site_maps() or [f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"]
+        entries = SitemapReader(self.http_client).read(sitemap_urls)
 
-    def _extract_text_from_html(self, html_content):
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        for tag_name in ['nav', 'footer', 'aside', 'script', 'style', 'header', 'form', 'button', 'iframe']:
-            for tag in soup.find_all(tag_name):
-                tag.decompose()
+        # Seeds go ahead of link-discovered URLs: highest sitemap priority first, most recently modified first within it.
+        entries.sort(key=lambda entry: (-entry['priority'], -(entry['lastmod'] or 0)))
+        seeded_count = 0
+        for entry in entries:
+            url = self._normalize_url(entry['url'])
+            if not self._is_valid_link(url) or self._should_ignore_link(url) or self._is_disallowed(url):
+                continue
+            if frontier.add(url, 0, priority=-entry['priority']):
+                seeded_count += 1
+        print(f"Seeded {seeded_count} URLs from sitemaps.")
 
-        data = {'title': soup.title.string.strip() if soup.title and soup.title.string else '', 'sections': []}
-        
-        current_section_title = None
-        current_section_text = []
-
-        for element in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li', 'span', 'div']):
-            if element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                if current_section_title is not None and current_section_text: 
-                    data['sections'].append({'section_title': current_section_title, 'text': ' '.join(current_section_text).strip()})
-                    current_section_text = []
-                current_section_title = element.get_text(separator=' ', strip=True)
-            elif element.name in ['p', 'li'] or \
-                 (element.name == 'div' and not element.find_all(['h1','h2','h3','h4','h5','h6','p','li','div'])) or \
-                 (element.name == 'span' and element.get_text(strip=True)): 
-
-                text = element.get_text(separator=' ', strip=True)
-                if text:
-                    current_section_text.append(text)
-                if current_section_title is None and not data['sections'] and text:
-                    current_section_title = "Introduction" 
-
-        if current_section_title is not None and current_section_text:
-            data['sections'].append({'section_title': current_section_title, 'text': ' '.join(current_section_text).strip()})
-        elif not data['sections'] and current_section_text: 
-             data['sections'].append({'section_title': "Content", 'text': ' '.join(current_section_text).strip()})
-
-        if not data['sections']:
-            body_text = soup.body.get_text(separator=' ', strip=True) if soup.body else ''
-            if body_text:
-                 data['sections'].append({'section_title': "Full Page Content", 'text': body_text})
-        
-        data['sections'] = [sec for sec in data['sections'] if sec['text']] 
-        return data
+    def _fetch_page(self, url, extra_headers=None):
+        host = urlparse(url).netloc
+        self._get_robots(url)
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self.rate_limiter.reserve(host))
+            try:
+                return self.http_client.fetch(url, headers=extra_headers)
+            except requests.exceptions.HTTPError as e:
+                status_code = e.response.status_code if e.response is not None else None
+                if status_code in (429, 503) and attempt < self.max_retries:
+                    print(f"HTTP {status_code} from {url}; backing off before retry {attempt + 1}/{self.max_retries}.")
+                    continue
+                print(f"HTTP error fetching {url}: {e}")
+            except requests.exceptions.ConnectionError as e:
+                print(f"Connection error fetching {url}: {e}")
+            except requests.exceptions.Timeout as e:
+                print(f"Timeout fetching {url}: {e}")
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching {url}: {e}")
+            return None
 
-    def save_page_to_jsonl(self, page_data):
+    def _should_ignore_link(self, url):
+        return self.extractor.should_ignore_link(url)
+
+    def _is_valid_link(self, link):
+        return self.extractor.is_valid_link(link)
+
+    def _get_output_file(self):
         script_dir = os.path.dirname(os.path.abspath(__file__))
         data_folder = os.path.join(script_dir, '..', 'Data')
         
@@ -143,18 +172,170 @@ class WebScraper:
             os.makedirs(data_folder, exist_ok=True)
             print(f"Warning: Could not use relative path based on script location. Saving to: {data_folder}")
 
-        file_path = os.path.join(data_folder, "scraped_data.jsonl")
+        return os.path.join(data_folder, "scraped_data.jsonl")
+
+    def _get_output_offset(self):
+        return self.writer.tell()
+
+    def save_page_to_jsonl(self, page_data):
+        self.writer.write(page_data)
+        if self.page_sink is not None:
+            self.page_sink(page_data)
+
+    def _conditional_headers(self, url):
+        if not self.recrawl:
+            return None
+        previous = self.crawl_state.get_page(url)
+        if previous is None:
+            return None
+        headers = {}
+        if previous['etag']:
+            headers['If-None-Match'] = previous['etag']
+        if previous['last_modified']:
+            headers['If-Modified-Since'] = previous['last_modified']
+        return headers
+
+    def _check_unchanged(self, normalized_url, response):
+        # Returns the stored page record, the new content hash and, for unchanged pages, their stored links.
+        if not self.recrawl:
+            return None, None, None
+        previous = self.crawl_state.get_page(normalized_url)
+        if previous is not None and response.status_code == 304:
+            self.crawl_state.mark_page_seen(normalized_url)
+            self.change_counts['unchanged'] += 1
+            return previous, None, previous['links']
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if previous is not None and previous['content_hash'] == content_hash:
+            self.crawl_state.record_page(normalized_url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                         content_hash, previous['links'])
+            self.change_counts['unchanged'] += 1
+            return previous, content_hash, previous['links']
+        return previous, content_hash, None
+
+    def _claim_alias(self, page_url, alias_url):
+        # A redirect target or <link rel="canonical"> names the page's real URL. The page is scraped under that
+        # URL, which is marked visited so it is never fetched again; if it was already visited this page is a duplicate.
+        if alias_url is None or alias_url == page_url or not self._is_valid_link(alias_url):
+            return True
+        if self.frontier.is_visited(alias_url):
+            return False
+        if self.frontier.is_queued(alias_url):
+            self.dedup_stats['fetches_saved'] += 1
+        else:
+            self._aliased_urls.add(alias_url)
+        self.frontier.mark_visited(alias_url)
+        return True
+
+    def _count_duplicate(self, structured_text=None):
+        self.dedup_stats['duplicate_pages'] += 1
+        if structured_text is not None:
+            text_length = sum(len(section['text']) for section in structured_text['sections'])
+            self.dedup_stats['chunks_saved'] += math.ceil(text_length / CHUNK_CHARS_ESTIMATE)
+
+    def _resolve_redirect(self, normalized_url, response):
+        page_url = self._normalize_url(response.url) if response.url else normalized_url
+        if not self._claim_alias(normalized_url, page_url):
+            self._count_duplicate()
+            return None
+        return page_url if self._is_valid_link(page_url) else normalized_url
+
+    def _enqueue_links(self, new_links, link_variants, next_depth):
+        for link in new_links:
+            if not self.frontier.add(link, next_depth) and link in self._aliased_urls:
+                self._aliased_urls.discard(link)
+                self.dedup_stats['fetches_saved'] += 1
+        # Every distinct tracking/reordered/index.html variant is a fetch the old normalization would have made.
+        for variant in link_variants:
+            if variant not in self._seen_link_variants:
+                self._seen_link_variants.add(variant)
+                self.dedup_stats['fetches_saved'] += 1
+
+    def _scrape_response(self, normalized_url, current_depth, response):
+        page_url = self._resolve_redirect(normalized_url, response)
+        if page_url is None:
+            return 'duplicate', None, set(), {}
+        previous, content_hash, unchanged_links = self._check_unchanged(normalized_url, response)
+        if unchanged_links is not None:
+            return 'unchanged', None, unchanged_links, {}
+
+        structured_text, new_links, page_meta = self.extractor.extract(response.text, page_url)
+        return self._build_page(normalized_url, page_url, current_depth, response.headers, previous, content_hash,
+                                structured_text, new_links, page_meta)
+
+    def _build_page(self, normalized_url, page_url, current_depth, headers, previous, content_hash, structured_text,
+                    new_links, page_meta):
+        if not self._claim_alias(page_url, page_meta['canonical']):
+            self._count_duplicate(structured_text)
+            return 'duplicate', None, new_links, page_meta['link_variants']
+        page_url = page_meta['canonical'] or page_url
+        if self.boilerplate is not None:
+            structured_text = self.boilerplate.strip(page_url, structured_text, page_meta['blocks'])
+
+        page_data = None
+        if structured_text['sections'] or structured_text['title']:
+            page_data = {'url': page_url, 'depth': current_depth, **structured_text}
+        if self.recrawl:
+            self.crawl_state.record_page(normalized_url, headers.get('ETag'), headers.get('Last-Modified'),
+                                         content_hash, new_links)
+            if page_data is not None:
+                page_data['change'] = 'changed' if previous is not None else 'new'
+                self.change_counts[page_data['change']] += 1
+        return ('scraped' if page_data is not None else 'empty'), page_data, new_links, page_meta['link_variants']
+
+    def _emit_deleted_pages(self):
+        if not self.recrawl:
+            return
+        for url in self.crawl_state.pop_unseen_pages():
+            self.save_page_to_jsonl({'url': url, 'change': 'deleted'})
+            self.change_counts['deleted'] += 1
+
+    def _start_frontier(self):
+        frontier = Frontier(max_size=self.max_frontier_size, priority_fn=self.priority_fn)
+        self.frontier = frontier
+        if self.crawl_state is not None:
+            if self.resume and self.crawl_state.has_checkpoint(self.base_url):
+                saved = self.crawl_state.load(frontier)
+                if self._get_output_offset() < saved['output_offset']:
+                    print(f"Warning: {self.writer.path} is shorter than at the last checkpoint; pages scraped before it may be missing.")
+                else:
+                    # Drop pages written after the last checkpoint; they are still in the saved frontier and will be fetched again.
+                    self.writer.truncate(saved['output_offset'])
+                print(f"Resuming crawl from checkpoint: {saved['pages_scraped']} pages scraped, {len(frontier)} URLs queued, {frontier.visited_count} visited.")
+                if self.recrawl:
+                    self.crawl_state.begin_generation(resume=True)
+                return frontier, saved['pages_scraped']
+            self.crawl_state.clear()
+            if self.recrawl:
+                self.crawl_state.begin_generation(resume=False)
+        if self.resume:
+            # Without a checkpoint the pages already in the output belong to an earlier crawl and would be indexed again.
+            print(f"No checkpoint to resume for {self.base_url}; starting a fresh crawl.")
+            self.writer.clear()
+        # The start page always goes first; sitemap seeds and discovered links are ordered behind it.
+        frontier.add(self.base_url, 0, priority=float('-inf'))
+        if self.use_sitemaps:
+            self._seed_from_sitemaps(frontier)
+        return frontier, 0
+
+    def _checkpoint(self, frontier, pages_scraped_count, output_offset=None, in_progress=None):
+        # The checkpointed offset must be on disk, so buffered pages are flushed first.
+        self.writer.flush()
+        if self.crawl_state is None:
+            return
+        if output_offset is None:
+            output_offset = self._get_output_offset()
         try:
-            with open(file_path, 'a', encoding='utf-8') as file:
-                file.write(json.dumps(page_data, ensure_ascii=False) + "\n")
-        except IOError as e:
-            print(f"Error saving data to {file_path}: {e}")
+            self.crawl_state.checkpoint(self.base_url, frontier, pages_scraped_count, output_offset, in_progress)
+        except Exception as e:
+            print(f"Error saving crawl checkpoint: {e}")
 
     def crawl_website(self, politeness_delay=1): 
-        urls_to_visit = deque([(self.base_url, 0)])
-        visited_urls = set()
+        self._start_rate_limiter(politeness_delay)
+        frontier, pages_scraped_count = self._start_frontier()
+        last_checkpoint_count = pages_scraped_count
+        in_progress = {}
         start_time = time.time()
-        pages_scraped_count = 0
         print(f"Starting crawl for {self.base_url}...")
         if self.max_crawl_duration:
             print(f"Time limit: {self.max_crawl_duration} seconds")
@@ -162,7 +343,12 @@ class WebScraper:
             print(f"Page limit: {self.max_pages_to_scrape} pages")
         print(f"Max depth: {self.max_depth}")
         try:
-            while urls_to_visit:
+            while frontier:
+                in_progress = {}
+                if self.crawl_state is not None and pages_scraped_count - last_checkpoint_count >= self.checkpoint_interval:
+                    self._checkpoint(frontier, pages_scraped_count)
+                    last_checkpoint_count = pages_scraped_count
+
                 if self.max_crawl_duration is not None and (time.time() - start_time) >= self.max_crawl_duration:
                     print(f"\nStopping crawl: Maximum duration of {self.max_crawl_duration} seconds reached.")
                     break
@@ -171,56 +357,291 @@ class WebScraper:
                     print(f"\nStopping crawl: Maximum number of {self.max_pages_to_scrape} pages scraped.")
                     break
                 
-                current_url, current_depth = urls_to_visit.popleft()
+                current_url, current_depth, current_priority = frontier.pop_with_priority()
+                in_progress = {current_url: (current_depth, current_priority)}
+                if self.crawl_state is not None:
+                    resume_point = (pages_scraped_count, self._get_output_offset())
 
                 normalized_url = self._normalize_url(current_url) 
 
-                if normalized_url in visited_urls:
+                if frontier.is_visited(normalized_url):
                     continue
                 
                 if current_depth > self.max_depth: 
                     print(f"Skipping {normalized_url}: Exceeds max depth ({current_depth} > {self.max_depth})")
                     continue
                 
+                frontier.mark_visited(normalized_url)
                 if self._should_ignore_link(normalized_url):
-                    visited_urls.add(normalized_url) 
                     continue
-                visited_urls.add(normalized_url)
+                if self._is_disallowed(normalized_url):
+                    print(f"Skipping {normalized_url}: Disallowed by robots.txt")
+                    continue
 
                 print(f"\nProcessing (Depth: {current_depth}, Scraped: {pages_scraped_count}): {normalized_url}")
     
-                response = self._fetch_page(normalized_url)
-                if response and response.content: 
-                    html_content = response.text
-                    
-                    structured_text = self._extract_text_from_html(html_content)
-                    if structured_text['sections'] or structured_text['title']: 
-                        page_data = {'url': normalized_url, 'depth': current_depth, **structured_text}
-                        self.save_page_to_jsonl(page_data)
-                        pages_scraped_count += 1
-                        print(f"Successfully scraped and saved: {normalized_url} ({pages_scraped_count}/{self.max_pages_to_scrape if self.max_pages_to_scrape is not None else 'unlimited'} pages)")
-                    else:
-                        print(f"No meaningful text content extracted from {normalized_url}")
-                    
-                    if current_depth < self.max_depth: 
-                        try:
-                            new_links = self._extract_links_from_html(html_content, normalized_url)
-                            for link in new_links:
-                                if link not in visited_urls and link not in [item[0] for item in urls_to_visit]: 
-                                    urls_to_visit.append((link, current_depth + 1))
-                        except Exception as e:
-                            print(f"Error extracting links from {normalized_url}: {e}")
-                    
-                    time.sleep(politeness_delay) 
-                else:
+                response = self._fetch_page(normalized_url, self._conditional_headers(normalized_url))
+                if response is None or (response.status_code != 304 and not response.content):
                     print(f"Failed to fetch or no content for {normalized_url}")
+                    continue
+
+                status, page_data, new_links, link_variants = self._scrape_response(normalized_url, current_depth, response)
+                if status == 'empty':
+                    print(f"No meaningful text content extracted from {normalized_url}")
+                elif status == 'duplicate':
+                    print(f"Skipping {normalized_url}: Duplicate of an already scraped page")
+                else:
+                    if page_data is not None:
+                        self.save_page_to_jsonl(page_data)
+                    pages_scraped_count += 1
+                    print(f"{'Unchanged since last crawl' if status == 'unchanged' else 'Successfully scraped and saved'}: {normalized_url} ({pages_scraped_count}/{self.max_pages_to_scrape if self.max_pages_to_scrape is not None else 'unlimited'} pages)")
+
+                if current_depth < self.max_depth:
+                    self._enqueue_links(new_links, link_variants, current_depth + 1)
+                in_progress = {}
+            else:
+                self._emit_deleted_pages()
+            in_progress = {}
+
+        except KeyboardInterrupt:
+            print("\nCrawl interrupted by user.")
+        finally:
+            if in_progress and self.crawl_state is not None:
+                self._checkpoint(frontier, *resume_point, in_progress=in_progress)
+            else:
+                self._checkpoint(frontier, pages_scraped_count)
+            self.writer.close()
+            self._report_crawl_stats(pages_scraped_count, frontier, time.time() - start_time)
+
+    def _report_crawl_stats(self, pages_scraped_count, frontier, elapsed_time):
+        visited_count = frontier.visited_count
+        pages_per_second = pages_scraped_count / elapsed_time if elapsed_time > 0 else 0.0
+        self.crawl_stats = {
+            'pages_scraped': pages_scraped_count,
+            'urls_visited': visited_count,
+            'elapsed_seconds': elapsed_time,
+            'pages_per_second': pages_per_second,
+            'frontier_remaining': len(frontier),
+            'frontier_dropped': frontier.dropped_count,
+        }
+        print(f"\nCrawl finished for {self.base_url}.")
+        print(f"Total pages scraped: {pages_scraped_count}")
+        print(f"Total URLs visited (or attempted): {visited_count}")
+        print(f"Total time taken: {elapsed_time:.2f} seconds.")
+        print(f"Throughput: {pages_per_second:.2f} pages/second.")
+        self.crawl_stats['hosts'] = self.http_client.get_host_stats()
+        print("Fetch stats per host:")
+        self.http_client.report()
+        self.crawl_stats['host_rates'] = self.rate_limiter.get_rates()
+        print("Request rate per host:")
+        self.rate_limiter.report()
+        self.crawl_stats['dedup'] = dict(self.dedup_stats)
+        print(f"URL deduplication: {self.dedup_stats['fetches_saved']} fetches saved, "
+              f"{self.dedup_stats['duplicate_pages']} duplicate pages skipped "
+              f"(~{self.dedup_stats['chunks_saved']} chunks not embedded).")
+        if self.boilerplate is not None:
+            self.crawl_stats['boilerplate'] = self.boilerplate.get_stats()
+            self.boilerplate.report()
+        if self.recrawl:
+            self.crawl_stats['changes'] = dict(self.change_counts)
+            print(f"Recrawl changes: {self.change_counts['new']} new, {self.change_counts['changed']} changed, "
+                  f"{self.change_counts['unchanged']} unchanged, {self.change_counts['deleted']} deleted.")
+        if frontier.dropped_count:
+            print(f"Links dropped because the frontier was full ({self.max_frontier_size} URLs): {frontier.dropped_count}")
+        print(f"Data saved to '{self.writer.path}' ({self.writer.records_written} records in {self.writer.flush_count} writes).")
 
+    def crawl_website_async(self, politeness_delay=1, concurrency=8, per_host_concurrency=2, parse_workers=None,
+                            parse_queue_size=None):
+        try:
+            asyncio.run(self._crawl_async(politeness_delay, concurrency, per_host_concurrency, parse_workers, parse_queue_size))
         except KeyboardInterrupt:
             print("\nCrawl interrupted by user.")
+        return self.crawl_stats
+
+    async def _crawl_async(self, politeness_delay, concurrency, per_host_concurrency, parse_workers=None, parse_queue_size=None):
+        self._start_rate_limiter(politeness_delay)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.http_client.ensure_pool_size(concurrency)
+        frontier, pages_scraped_count = self._start_frontier()
+        last_checkpoint_count = pages_scraped_count
+        in_progress = {}
+        host_limits = {}
+        stop_crawl = asyncio.Event()
+        start_time = time.time()
+
+        # page_sink may block, e.g. on a full IngestPipeline queue, so it runs on its own thread instead of the event
+        # loop; a single thread keeps the pages in order.
+        sink_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='page-sink') if self.page_sink else None
+
+        # With parse_workers set, fetchers hand raw pages to a bounded queue and a process pool does the parsing.
+        parse_pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers else None
+        parse_queue = asyncio.Queue(maxsize=parse_queue_size or 2 * (parse_workers or 1))
+        parse_progress = asyncio.Event()
+        parse_pending = 0
+
+        print(f"Starting concurrent crawl for {self.base_url} with {concurrency} fetchers ({per_host_concurrency} per host)...")
+        if parse_pool is not None:
+            print(f"Parsing in {parse_workers} worker processes.")
+        if self.max_crawl_duration:
+            print(f"Time limit: {self.max_crawl_duration} seconds")
+        if self.max_pages_to_scrape:
+            print(f"Page limit: {self.max_pages_to_scrape} pages")
+        print(f"Max depth: {self.max_depth}")
+
+        def page_limit_reached():
+            return self.max_pages_to_scrape is not None and pages_scraped_count >= self.max_pages_to_scrape
+
+        async def finish_page(current_url, normalized_url, current_depth, status, page_data, new_links, link_variants):
+            nonlocal pages_scraped_count
+            if status == 'empty':
+                print(f"No meaningful text content extracted from {normalized_url}")
+            elif status == 'duplicate':
+                print(f"Skipping {normalized_url}: Duplicate of an already scraped page")
+            else:
+                if page_data is not None:
+                    self.writer.write(page_data)
+                pages_scraped_count += 1
+                print(f"{'Unchanged since last crawl' if status == 'unchanged' else 'Successfully scraped and saved'}: {normalized_url} ({pages_scraped_count}/{self.max_pages_to_scrape if self.max_pages_to_scrape is not None else 'unlimited'} pages)")
+                if page_limit_reached():
+                    print(f"\nStopping crawl: Maximum number of {self.max_pages_to_scrape} pages scraped.")
+                    stop_crawl.set()
+
+            if current_depth < self.max_depth and not stop_crawl.is_set():
+                self._enqueue_links(new_links, link_variants, current_depth + 1)
+
+            in_progress.pop(current_url, None)
+            if sink_executor is not None and page_data is not None:
+                # Shielded so a page already written is still handed over when the crawl stops and cancels this task.
+                await asyncio.shield(loop.run_in_executor(sink_executor, self.page_sink, page_data))
+
+        async def process(current_url, current_depth):
+            # Returns True once the page has been handed to the parse stage, which then owns it.
+            nonlocal parse_pending
+            normalized_url = self._normalize_url(current_url)
+            if frontier.is_visited(normalized_url):
+                return False
+            if current_depth > self.max_depth:
+                print(f"Skipping {normalized_url}: Exceeds max depth ({current_depth} > {self.max_depth})")
+                return False
+            frontier.mark_visited(normalized_url)
+            if self._should_ignore_link(normalized_url):
+                return False
+            if self._is_disallowed(normalized_url):
+                print(f"Skipping {normalized_url}: Disallowed by robots.txt")
+                return False
+
+            host = urlparse(normalized_url).netloc
+            host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host_concurrency))
+            async with host_limit:
+                if stop_crawl.is_set():
+                    return False
+                print(f"\nProcessing (Depth: {current_depth}, Scraped: {pages_scraped_count}): {normalized_url}")
+                response = await loop.run_in_executor(executor, self._fetch_page, normalized_url,
+                                                      self._conditional_headers(normalized_url))
+                if response is None or (response.status_code != 304 and not response.content):
+                    print(f"Failed to fetch or no content for {normalized_url}")
+                    return False
+                if page_limit_reached():
+                    stop_crawl.set()
+                    return False
+
+                handed_off = False
+                if parse_pool is None:
+                    await finish_page(current_url, normalized_url, current_depth,
+                                *self._scrape_response(normalized_url, current_depth, response))
+                else:
+                    page_url = self._resolve_redirect(normalized_url, response)
+                    if page_url is None:
+                        await finish_page(current_url, normalized_url, current_depth, 'duplicate', None, set(), {})
+                        return False
+                    previous, content_hash, unchanged_links = self._check_unchanged(normalized_url, response)
+                    if unchanged_links is not None:
+                        await finish_page(current_url, normalized_url, current_depth, 'unchanged', None, unchanged_links, {})
+                    else:
+                        await parse_queue.put((current_url, normalized_url, page_url, current_depth, response.text,
+                                               response.headers, previous, content_hash))
+                        parse_pending += 1
+                        handed_off = True
+
+                return handed_off
+
+        async def parse_worker():
+            nonlocal parse_pending
+            while True:
+                current_url, normalized_url, page_url, current_depth, html_content, headers, previous, content_hash = await parse_queue.get()
+                try:
+                    structured_text, new_links, page_meta = await loop.run_in_executor(parse_pool, self.extractor.extract,
+                                                                                       html_content, page_url)
+                    if page_limit_reached():
+                        stop_crawl.set()
+                        continue
+                    await finish_page(current_url, normalized_url, current_depth,
+                                      *self._build_page(normalized_url, page_url, current_depth, headers, previous, content_hash,
+                                                        structured_text, new_links, page_meta))
+                except Exception as e:
+                    print(f"Error parsing {normalized_url}: {e}")
+                    in_progress.pop(current_url, None)
+                finally:
+                    parse_pending -= 1
+                    parse_progress.set()
+
+        async def track(current_url, current_depth):
+            handed_off = False
+            try:
+                handed_off = await process(current_url, current_depth)
+            finally:
+                # URLs still in flight when the crawl stops stay in in_progress so the checkpoint requeues them.
+                if not handed_off and not stop_crawl.is_set():
+                    in_progress.pop(current_url, None)
+
+        in_flight = set()
+        parsers = [asyncio.create_task(parse_worker()) for _ in range(parse_workers or 0)]
+        try:
+            while (frontier or in_flight or parse_pending) and not stop_crawl.is_set():
+                while frontier and len(in_flight) < concurrency:
+                    current_url, current_depth, current_priority = frontier.pop_with_priority()
+                    in_progress[current_url] = (current_depth, current_priority)
+                    in_flight.add(asyncio.create_task(track(current_url, current_depth)))
+
+                timeout = None
+                if self.max_crawl_duration is not None:
+                    timeout = self.max_crawl_duration - (time.time() - start_time)
+                    if timeout <= 0:
+                        print(f"\nStopping crawl: Maximum duration of {self.max_crawl_duration} seconds reached.")
+                        break
+
+                waiters = set(in_flight)
+                progress_waiter = None
+                if parse_pending:
+                    parse_progress.clear()
+                    progress_waiter = asyncio.create_task(parse_progress.wait())
+                    waiters.add(progress_waiter)
+                done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if progress_waiter is not None:
+                    progress_waiter.cancel()
+                    done.discard(progress_waiter)
+                in_flight -= done
+                for task in done:
+                    if not task.cancelled() and task.exception() is not None:
+                        print(f"Unexpected error during crawl: {task.exception()}")
+
+                if self.crawl_state is not None and pages_scraped_count - last_checkpoint_count >= self.checkpoint_interval:
+                    self._checkpoint(frontier, pages_scraped_count, in_progress=in_progress)
+                    last_checkpoint_count = pages_scraped_count
+
+            if not frontier and not in_flight and not parse_pending and not stop_crawl.is_set():
+                await loop.run_in_executor(sink_executor or executor, self._emit_deleted_pages)
         finally:
-            elapsed_time = time.time() - start_time
-            print(f"\nCrawl finished for {self.base_url}.")
-            print(f"Total pages scraped: {pages_scraped_count}")
-            print(f"Total URLs visited (or attempted): {len(visited_urls)}")
-            print(f"Total time taken: {elapsed_time:.2f} seconds.")
-            print(f"Data saved to 'Data/scraped_data.jsonl' (relative to script's parent or CWD).")
+            stop_crawl.set()
+            for task in in_flight | set(parsers):
+                task.cancel()
+            await asyncio.gather(*in_flight, *parsers, return_exceptions=True)
+            executor.shutdown(wait=False, cancel_futures=True)
+            if sink_executor is not None:
+                sink_executor.shutdown(wait=True)
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._checkpoint(frontier, pages_scraped_count, in_progress=in_progress)
+            self.writer.close()
+            self._report_crawl_stats(pages_scraped_count, frontier, time.time() - start_time)
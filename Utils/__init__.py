@@ -1,4 +1,23 @@
 from .WebScraper import WebScraper
+from .Frontier import Frontier
+from .CrawlState import CrawlState
+from .HtmlExtractor import HtmlExtractor
+from .BoilerplateDetector import BoilerplateDetector
+from .UrlCanonicalizer import UrlCanonicalizer
+from .HttpClient import HttpClient
+from .RateLimiter import HostRateLimiter
+from .Sitemap import SitemapReader
+from .PageWriter import PageWriter
 from .Splitter import Splitter
+from .EmbeddingCache import EmbeddingCache, CachedEmbeddings
+from .EmbeddingExecutor import EmbeddingExecutor
+from .EmbeddingBackends import HashingEmbeddings, OnnxEmbeddings, make_embeddings
+from .ChunkDeduplicator import ChunkDeduplicator, split_sources
+from .BM25Index import BM25Index
+from .ContextSelection import maximal_marginal_relevance, merge_overlapping_chunks
+from .ContextPacker import ContextPacker, estimate_tokens
+from .ChatCache import ChatCache, TTLCache
+from .NumpyVectorStore import NumpyVectorStore
 from .VectorDB import VectorDB
-from .RAG import RAG
+from .IngestPipeline import IngestPipeline
+from .RAG import RAG
\ No newline at end of file
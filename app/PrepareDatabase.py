@@ -9,18 +9,32 @@ if project_root not in sys.path:
 from Utils.WebScraper import WebScraper
 from Utils.Splitter import Splitter
 from Utils.VectorDB import VectorDB
+from Utils.PageWriter import PageWriter, zstandard
+from Utils.IngestPipeline import IngestPipeline
+from Utils.ChunkDeduplicator import ChunkDeduplicator
 
-def prepare_database(url: str, max_depth: int, max_crawl_duration: int | None, max_pages_to_scrape: int | None):
+def prepare_database(url: str, max_depth: int, max_crawl_duration: int | None, max_pages_to_scrape: int | None,
+                     concurrency: int = 1, resume: bool = False, recrawl: bool = False, parse_workers: int = 0,
+                     output_compression: str | None = None, pipelined: bool = False, incremental_index: bool = False,
+                     deduplicate_chunks: bool = True, strip_boilerplate: bool = False, split_workers: int = 1):
+
+    if recrawl and not incremental_index:
+        # A recrawl's output only holds new, changed and deleted pages; rebuilding the index from it would drop the rest.
+        raise ValueError("recrawl=True requires incremental_index=True, otherwise unchanged pages are removed from the index.")
 
     base_data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Data')
     os.makedirs(base_data_dir, exist_ok=True)
 
-    scraped_data_file = os.path.join(base_data_dir, 'scraped_data.jsonl')
+    # Compressed output goes to size-rotated shards in a directory instead of a single JSONL file.
+    scraped_data_file = os.path.join(base_data_dir, 'scraped_data' if output_compression else 'scraped_data.jsonl')
+    writer = PageWriter(scraped_data_file, compression=output_compression,
+                        max_shard_bytes=64 * 1024 * 1024 if output_compression else None)
     persist_directory = os.path.join(base_data_dir, 'chroma_db')
+    crawl_state_file = os.path.join(base_data_dir, 'crawl_state.sqlite')
 
-    if os.path.exists(scraped_data_file):
+    if not resume:
         try:
-            os.remove(scraped_data_file)
+            writer.clear()
         except OSError:
             pass 
 
@@ -28,21 +42,39 @@ def prepare_database(url: str, max_depth: int, max_crawl_duration: int | None, m
         base_url=url,
         max_depth=max_depth,
         max_crawl_duration=max_crawl_duration,
-        max_pages_to_scrape=max_pages_to_scrape
+        max_pages_to_scrape=max_pages_to_scrape,
+        state_file=crawl_state_file,
+        resume=resume,
+        recrawl=recrawl,
+        writer=writer,
+        strip_boilerplate=strip_boilerplate
     )
-    scraper.crawl_website()
+    # Repeated blocks (program blurbs, contact details, cookie notices) are embedded once, not once per page.
+    deduplicator = ChunkDeduplicator() if deduplicate_chunks else None
+    if pipelined:
+        # Chunks are embedded and indexed while the crawl is still running.
+        pipeline = IngestPipeline(scraper, VectorDB(persist_directory=persist_directory), incremental=incremental_index,
+                                  deduplicator=deduplicator)
+        return pipeline.run(concurrency=concurrency, parse_workers=parse_workers or None)
+
+    if concurrency > 1:
+        scraper.crawl_website_async(concurrency=concurrency, parse_workers=parse_workers or None)
+    else:
+        scraper.crawl_website()
 
-    if not os.path.exists(scraped_data_file) or os.path.getsize(scraped_data_file) == 0:
+    if writer.size() == 0 and not incremental_index:
          return None 
 
+    # Chunks are streamed from the scraped data straight into the index instead of being collected in a list first.
+    # With split_workers > 1 they are chunked in a process pool, in the same order.
     splitter = Splitter(scraped_data_file)
-    documents = splitter.split_jsonl_to_doc()
-
-    if not documents:
-        return None
+    documents = splitter.iter_documents_parallel(workers=split_workers) if split_workers > 1 else splitter.iter_documents()
 
     vector_db_manager = VectorDB(persist_directory=persist_directory)
-    db_instance = vector_db_manager.make_vector_db(documents)
+    # A recrawl's output only holds new, changed and deleted pages, so unchanged pages are kept in the index.
+    db_instance = vector_db_manager.make_vector_db(documents, incremental=incremental_index,
+                                                   removed_sources=splitter.removed_sources, prune_missing=not recrawl,
+                                                   deduplicator=deduplicator)
 
     if db_instance:
         return db_instance 
@@ -72,6 +104,28 @@ def run_prepare_database_app():
         if use_page_limit:
             max_pages_to_scrape = st.number_input("Max Pages to Scrape", min_value=1, value=10, step=1)
 
+        concurrency = st.number_input("Concurrent Fetchers", min_value=1, value=1, step=1, help="Pages fetched in parallel (1=sequential crawl).")
+
+        parse_workers = st.number_input("Parser Processes", min_value=0, value=0, step=1, help="Worker processes for HTML parsing in concurrent crawls (0=parse on the crawl thread).")
+
+        split_workers = st.number_input("Splitter Processes", min_value=1, value=1, step=1, help="Worker processes for chunking the scraped pages after the crawl (1=split on the main process).")
+
+        resume = st.checkbox("Resume Previous Crawl?", value=False, help="Continue an interrupted crawl of the same URL instead of starting over.")
+
+        recrawl = st.checkbox("Only Changed Pages?", value=False, help="Recrawl using stored ETag/Last-Modified and content hashes, and only process new, changed and deleted pages.")
+
+        # A recrawl only returns changed pages, so it always updates the existing index.
+        incremental_index = st.checkbox("Update Existing Index?", value=recrawl, disabled=recrawl, help="Embed only new or changed chunks and delete chunks of removed pages instead of rebuilding the whole index. Always on when only changed pages are crawled.")
+
+        pipelined = st.checkbox("Index While Crawling?", value=False, help="Embed and index pages as they are scraped instead of after the crawl finishes.")
+
+        strip_boilerplate = st.checkbox("Strip Site-Wide Boilerplate?", value=False, help="Learn menus, banners and sidebars repeated across pages during the crawl and leave them out of the scraped text. The first pages crawled keep their copies, so the text depends on crawl order.")
+
+        deduplicate_chunks = st.checkbox("Remove Duplicate Chunks?", value=True, help="Embed text repeated across pages (near-duplicates included) only once and list all of its source pages.")
+
+        compression_options = ["None", "gzip"] + (["zstd"] if zstandard is not None else [])
+        output_compression = st.selectbox("Scraped Data Compression", compression_options, help="Write scraped pages as compressed shards to save disk space on large crawls.")
+
         prepare_button = st.button("Prepare Knowledge Base", use_container_width=True)
 
     with col2:
@@ -88,7 +142,17 @@ def run_prepare_database_app():
                                 url=url,
                                 max_depth=max_depth,
                                 max_crawl_duration=max_crawl_duration,
-                                max_pages_to_scrape=max_pages_to_scrape
+                                max_pages_to_scrape=max_pages_to_scrape,
+                                concurrency=concurrency,
+                                resume=resume,
+                                recrawl=recrawl,
+                                parse_workers=parse_workers,
+                                output_compression=None if output_compression == "None" else output_compression,
+                                pipelined=pipelined,
+                                incremental_index=incremental_index,
+                                deduplicate_chunks=deduplicate_chunks,
+                                strip_boilerplate=strip_boilerplate,
+                                split_workers=split_workers
                             )
 
                             if db_result:
@@ -7,8 +7,10 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from Utils.VectorDB import VectorDB
+from Utils.VectorDB import VectorDB, read_index_version
 from Utils.RAG import RAG      
+from Utils.ContextPacker import ContextPacker
+from Utils.ChatCache import ChatCache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -33,13 +35,31 @@ def get_llm():
     )
     return llm
 
+PERSIST_DIRECTORY = os.path.join(os.path.dirname(__file__), '..', 'Data', 'chroma_db')
+
+@st.cache_resource(max_entries=1)
+def get_vector_db(persist_directory, index_version):
+    # Keyed on the index version, so a rebuild of the knowledge base loads the new collection and BM25 index
+    # instead of serving the ones loaded before it.
+    vector_db = VectorDB(persist_directory=persist_directory)
+    if vector_db.load_vector_db() is None:
+        return None
+    return vector_db
+
+@st.cache_resource
+def get_chat_cache(persist_directory):
+    # One cache for all sessions of this server, so a question asked by one student is answered from it for the next.
+    # It is cleared automatically when the knowledge base is rebuilt.
+    return ChatCache(max_entries=int(os.getenv("CHAT_CACHE_SIZE", "2048")),
+                     ttl_seconds=float(os.getenv("CHAT_CACHE_TTL", "3600")),
+                     index_version=lambda: read_index_version(persist_directory))
+
 def chat_page():
     st.title("Chat with University Website Knowledge Base")
 
     try:
-        vector_db = VectorDB(persist_directory=os.path.join(os.path.dirname(__file__), '..', 'Data', 'chroma_db'))
-        db = vector_db.load_vector_db()
-        if db is None: 
+        vector_db = get_vector_db(PERSIST_DIRECTORY, read_index_version(PERSIST_DIRECTORY))
+        if vector_db is None: 
             st.error("Failed to load vector database. Please ensure it's prepared.")
             return
     except Exception as e:
@@ -48,7 +68,9 @@ def chat_page():
     
 
     if 'rag_instance' not in st.session_state:
-        st.session_state.rag_instance = RAG()
+        # Retrieved chunks and chat history are trimmed to fit PROMPT_TOKEN_BUDGET tokens per question.
+        context_packer = ContextPacker(max_tokens=int(os.getenv("PROMPT_TOKEN_BUDGET", "3000")))
+        st.session_state.rag_instance = RAG(context_packer=context_packer, cache=get_chat_cache(PERSIST_DIRECTORY))
     rag = st.session_state.rag_instance 
 
     llm = get_llm()
@@ -65,7 +87,11 @@ def chat_page():
         with st.chat_message("user"): 
             st.markdown(prompt)
         
-        retriever = vector_db.get_retriever()
+        # 'vector' (default) is plain similarity search; 'hybrid' fuses BM25 and vector results and 'lexical' skips
+        # the query embedding call entirely. RETRIEVAL_MMR=true re-ranks 20 candidates so the 4 chunks in the prompt
+        # are not near-copies of each other.
+        search_kwargs = {"k": 4, "fetch_k": 20, "mmr": os.getenv("RETRIEVAL_MMR", "false").lower() == "true"}
+        retriever = vector_db.get_retriever(search_kwargs=search_kwargs, mode=os.getenv("RETRIEVAL_MODE", "vector"))
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
                 response = rag.chat(
@@ -78,6 +104,11 @@ def chat_page():
         
         st.session_state.messages.append({"role": "assistant", "content": response})
 
+    if rag.cache is not None:
+        stats = rag.cache.get_stats()
+        st.sidebar.caption("Cache hit rates: " + ", ".join(f"{tier} {stats[tier]['hit_rate']:.0%}"
+                                                          for tier in ('reformulation', 'retrieval', 'answer')))
+
 def main():
     st.sidebar.title("University Website Knowledge Base")
     
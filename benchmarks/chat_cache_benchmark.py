@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+import io
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.runnables import RunnableLambda
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.Splitter import Splitter
+from Utils.VectorDB import VectorDB
+from Utils.RAG import RAG
+from Utils.ChatCache import ChatCache, CACHE_TIERS
+
+# Latency of RAG.chat over a stream of student sessions with and without ChatCache. Most first questions come
+# from a small set of popular ones, asked with varying case and punctuation; follow-up questions are mostly new.
+# The LLM and the query embedding API are stand-ins with fixed delays. The index is rebuilt partway through to
+# show the invalidation.
+
+NUM_PAGES = 200
+NUM_SESSIONS = 150
+POPULAR_QUESTIONS = 20
+QUERY_EMBEDDING_LATENCY = 0.05
+REFORMULATION_LATENCY = 0.3
+ANSWER_LATENCY = 0.8
+
+class RemoteHashingEmbeddings(HashingEmbeddings):
+    def embed_query(self, text):
+        time.sleep(QUERY_EMBEDDING_LATENCY)
+        return super().embed_query(text)
+
+def fake_llm(prompt_value):
+    # Reformulation prompts get the latest question back unchanged, everything else a fixed answer.
+    messages = prompt_value.to_messages()
+    if "standalone question" in messages[0].content:
+        time.sleep(REFORMULATION_LATENCY)
+        return messages[-1].content
+    time.sleep(ANSWER_LATENCY)
+    return "The answer is listed on the admissions page."
+
+def make_sessions(rng, vocabulary):
+    popular = [" ".join(rng.sample(vocabulary, 5)) for _ in range(POPULAR_QUESTIONS)]
+    weights = 1.0 / np.arange(1, POPULAR_QUESTIONS + 1)
+    sessions = []
+    for _ in range(NUM_SESSIONS):
+        if rng.random() < 0.8:
+            first = rng.choices(popular, weights=weights)[0]
+            first = rng.choice([first, first.capitalize(), first + "?", first.upper() + " ?"])
+        else:
+            first = " ".join(rng.sample(vocabulary, 5))
+        follow_ups = [" ".join(rng.sample(vocabulary, 4)) for _ in range(rng.randint(0, 2))]
+        sessions.append([first] + follow_ups)
+    return sessions
+
+def run(vector_db, sessions, cache):
+    retriever = vector_db.get_retriever(search_kwargs={"k": 4}, mode='hybrid')
+    latencies = []
+    for number, session in enumerate(sessions):
+        if number == len(sessions) // 2:
+            vector_db.bump_index_version()
+        rag = RAG(cache=cache)
+        for question in session:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                rag.chat(question, retriever=retriever, llm=RunnableLambda(fake_llm))
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def main():
+    rng = random.Random(7)
+    vocabulary = [f"term{i}" for i in range(3000)]
+    splitter = Splitter(os.devnull)
+    pages = [{'url': f"https://example.edu/page/{i}", 'title': f"Page {i}",
+              'sections': [{'text': " ".join(rng.choice(vocabulary) for _ in range(rng.randint(300, 900)))}]}
+             for i in range(NUM_PAGES)]
+    documents = [doc for page in pages for doc in splitter.split_record(page)]
+    sessions = make_sessions(rng, vocabulary)
+    print(f"{len(documents)} chunks, {NUM_SESSIONS} sessions, {sum(map(len, sessions))} questions")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vector_db = VectorDB(persist_directory=os.path.join(tmp, 'chroma_db'), embedding_function=RemoteHashingEmbeddings(),
+                             use_embedding_cache=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            vector_db.make_vector_db(documents)
+
+        for name, use_cache in [("no cache", False), ("ChatCache", True)]:
+            cache = ChatCache(index_version=vector_db.index_version) if use_cache else None
+            with contextlib.redirect_stdout(io.StringIO()):
+                latencies = run(vector_db, sessions, cache)
+            print(f"{name:10s} p50 {np.percentile(latencies, 50):7.1f} ms, mean {np.mean(latencies):7.1f} ms, "
+                  f"p95 {np.percentile(latencies, 95):7.1f} ms")
+            if cache is not None:
+                stats = cache.get_stats()
+                print("           hit rates: " + ", ".join(f"{tier} {stats[tier]['hit_rate']:.0%} of "
+                                                           f"{stats[tier]['hits'] + stats[tier]['misses']}"
+                                                           for tier in CACHE_TIERS)
+                      + f"; invalidated {stats['invalidations']} time(s) by the rebuild")
+
+if __name__ == "__main__":
+    main()
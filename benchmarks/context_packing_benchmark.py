@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+import io
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.runnables import RunnableLambda
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.Splitter import Splitter
+from Utils.VectorDB import VectorDB
+from Utils.RAG import RAG
+from Utils.ContextPacker import ContextPacker, estimate_tokens
+
+# Prompt size over a long conversation with and without a token budget. The LLM is a stand-in that records each
+# prompt it is sent and answers with a fixed-length reply after a delay proportional to the prompt length, roughly
+# like a hosted model's prefill time. Retrieval returns the top K chunks of 2000 characters.
+
+NUM_PAGES = 200
+NUM_TURNS = 30
+K = 8
+ANSWER_WORDS = 150
+SECONDS_PER_PROMPT_TOKEN = 0.00005
+
+class FakeLLM:
+    def __init__(self, rng):
+        self.rng = rng
+        self.prompt_tokens = []
+
+    def invoke(self, prompt_value):
+        prompt = prompt_value.to_string()
+        tokens = estimate_tokens(prompt)
+        self.prompt_tokens.append(tokens)
+        time.sleep(tokens * SECONDS_PER_PROMPT_TOKEN)
+        return " ".join(self.rng.choice(["The", "deadline", "fee", "is", "listed", "on", "the", "page."])
+                        for _ in range(ANSWER_WORDS))
+
+def make_pages(rng, vocabulary):
+    pages = []
+    for i in range(NUM_PAGES):
+        text = " ".join(" ".join(rng.choice(vocabulary) for _ in range(rng.randint(8, 20))).capitalize() + "."
+                        for _ in range(rng.randint(30, 60)))
+        pages.append({'url': f"https://example.edu/page/{i}", 'title': f"Page {i}", 'sections': [{'text': text}]})
+    return pages
+
+def main():
+    rng = random.Random(7)
+    vocabulary = [f"term{i}" for i in range(3000)]
+    splitter = Splitter(os.devnull)
+    documents = [doc for page in make_pages(rng, vocabulary) for doc in splitter.split_record(page)]
+    questions = [" ".join(rng.sample(vocabulary, 8)) + "?" for _ in range(NUM_TURNS)]
+    print(f"{len(documents)} chunks, {NUM_TURNS} turns, top {K} chunks per question")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vector_db = VectorDB(persist_directory=os.path.join(tmp, 'chroma_db'), embedding_function=HashingEmbeddings(),
+                             use_embedding_cache=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            vector_db.make_vector_db(documents)
+        retriever = vector_db.get_retriever(search_kwargs={"k": K})
+
+        for name, packer in [("unbounded", ContextPacker(max_tokens=10 ** 9, max_history_tokens=10 ** 9)),
+                             ("budget 3000", ContextPacker(max_tokens=3000, max_history_tokens=800)),
+                             ("budget 1500", ContextPacker(max_tokens=1500, max_history_tokens=400))]:
+            rag = RAG(context_packer=packer)
+            llm = FakeLLM(random.Random(1))
+            latencies = []
+            for question in questions:
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    rag.chat(question, retriever=retriever, llm=RunnableLambda(llm.invoke),
+                             use_question_reformulation=False)
+                latencies.append((time.perf_counter() - start) * 1000)
+            usage = rag.get_token_usage()
+            print(f"{name:12s} prompt tokens p50 {np.percentile(llm.prompt_tokens, 50):6.0f}, max {max(llm.prompt_tokens):6d}, "
+                  f"last turn {llm.prompt_tokens[-1]:6d}; chunks used {np.mean([u['chunks_used'] for u in usage]):.1f} "
+                  f"(trimmed {sum(u['chunks_trimmed'] for u in usage)}), history messages "
+                  f"{np.mean([u['history_messages'] for u in usage]):4.1f}; turn p50 {np.percentile(latencies, 50):6.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+import io
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.Splitter import Splitter
+from Utils.VectorDB import VectorDB
+from Utils.RAG import RAG
+from Utils.ContextSelection import maximal_marginal_relevance
+
+# Prompt context built from the top K chunks with and without MMR re-ranking: latency, characters handed to the
+# LLM after overlapping chunks are merged, and how many distinct pages the context covers. Pages are long enough
+# to split into overlapping chunks, and each page is mirrored with small edits at a second URL, as university sites
+# often do (print views, archived copies).
+
+NUM_PAGES = 400
+NUM_QUERIES = 100
+K = 4
+FETCH_K = 20
+
+def make_pages(rng, vocabulary):
+    pages = []
+    for i in range(NUM_PAGES):
+        topic = rng.sample(vocabulary, 40)
+        sentences = [" ".join(rng.choice(topic) for _ in range(rng.randint(8, 20))).capitalize() + "."
+                     for _ in range(rng.randint(40, 80))]
+        text = " ".join(sentences)
+        pages.append({'url': f"https://example.edu/page/{i}", 'title': f"Page {i}", 'sections': [{'text': text}]})
+        pages.append({'url': f"https://example.edu/print/page/{i}", 'title': f"Page {i}",
+                      'sections': [{'text': text + f" Printed copy {i}."}]})
+    return pages, [" ".join(rng.sample(page['sections'][0]['text'].split()[:200], 12)) for page in rng.sample(pages, NUM_QUERIES)]
+
+def main():
+    rng = random.Random(7)
+    vocabulary = [f"term{i}" for i in range(5000)]
+    pages, queries = make_pages(rng, vocabulary)
+    splitter = Splitter(os.devnull)
+    documents = [doc for page in pages for doc in splitter.split_record(page)]
+    print(f"{len(pages)} pages, {len(documents)} chunks, {NUM_QUERIES} queries, top {K} of {FETCH_K} candidates")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vector_db = VectorDB(persist_directory=os.path.join(tmp, 'chroma_db'), embedding_function=HashingEmbeddings(),
+                             use_embedding_cache=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            vector_db.make_vector_db(documents)
+
+        for mode in ['vector', 'hybrid']:
+            for mmr in [False, True]:
+                latencies, raw_chars, merged_chars, page_counts = [], [], [], []
+                for query in queries:
+                    start = time.perf_counter()
+                    docs = vector_db.search(query, k=K, mode=mode, fetch_k=FETCH_K, mmr=mmr)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    raw_chars.append(len("\n\n".join(doc.page_content for doc in docs)))
+                    merged_chars.append(len(RAG.getprocessedcontent(docs)))
+                    page_counts.append(len({doc.metadata['source'].replace('/print/', '/') for doc in docs}))
+                print(f"{mode:7s} {'mmr' if mmr else 'top-k':5s} p50 {np.percentile(latencies, 50):6.2f} ms, "
+                      f"context {np.mean(raw_chars):6.0f} chars, {np.mean(merged_chars):6.0f} after merging, "
+                      f"{np.mean(page_counts):.2f} distinct pages")
+
+    embeddings = np.random.default_rng(7).standard_normal((FETCH_K, 768)).astype(np.float32)
+    relevance = np.random.default_rng(8).random(FETCH_K)
+    start = time.perf_counter()
+    for _ in range(1000):
+        maximal_marginal_relevance(relevance, embeddings, K)
+    print(f"MMR selection of {K} from {FETCH_K} candidates: {time.perf_counter() - start:.3f} ms per query")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import contextlib
+import io
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils.Splitter import Splitter
+from Utils.ChunkDeduplicator import ChunkDeduplicator
+
+# Chunks and embeddings saved by ChunkDeduplicator on a generated crawl where every page repeats a few site-wide
+# blocks, some of them with small per-page edits (a changed date or name), and half the pages share a program blurb.
+
+WORDS = ("admission course faculty hostel fee semester library research campus student deadline exam "
+         "scholarship department laboratory lecture seminar thesis credit timetable").split()
+
+def paragraph(rng, sentences):
+    return " ".join(" ".join(rng.choice(WORDS) for _ in range(14)).capitalize() + "." for _ in range(sentences))
+
+def make_jsonl(path, num_pages=1000, seed=7):
+    rng = random.Random(seed)
+    contact = paragraph(rng, 25)
+    notice = paragraph(rng, 20)
+    blurbs = [paragraph(rng, 25) for _ in range(5)]
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(num_pages):
+            # A one-word edit in the notice makes it a near duplicate rather than an exact one.
+            edited_notice = notice.replace("Student", f"Student{i % 7}", 1)
+            sections = [{'section_title': 'Content', 'text': paragraph(rng, rng.randint(10, 40))},
+                        {'section_title': 'Contact', 'text': contact},
+                        {'section_title': 'Notice', 'text': edited_notice}]
+            if i % 2:
+                sections.insert(1, {'section_title': 'Programme', 'text': rng.choice(blurbs)})
+            file.write(json.dumps({'url': f"https://example.edu/page/{i}", 'title': f"Page {i}",
+                                   'sections': sections}) + "\n")
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'scraped_data.jsonl')
+        make_jsonl(path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            documents = list(Splitter(path).iter_documents())
+
+        deduplicator = ChunkDeduplicator()
+        start = time.perf_counter()
+        kept = list(deduplicator.filter(documents))
+        elapsed = time.perf_counter() - start
+        stats = deduplicator.get_stats()
+        merged = deduplicator.merged_metadata()
+        widest = max((metadata['duplicate_sources'] for metadata in merged.values()), default=0)
+        print(f"{stats['chunks']} chunks in {elapsed:.2f} s ({stats['chunks'] / elapsed:.0f} chunks/second): "
+              f"{len(kept)} kept, {stats['exact_duplicates']} exact and {stats['near_duplicates']} near duplicates, "
+              f"{stats['embeddings_saved']} embeddings saved ({stats['saved_ratio']:.0%})")
+        print(f"{len(merged)} kept chunks list other source pages, up to {widest + 1} sources each")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import threading
+import contextlib
+import io
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from Utils.VectorDB import VectorDB
+
+# Indexing throughput of VectorDB.make_vector_db against a local fake embedding server that adds latency,
+# answers a share of requests with 429/500 and rejects payloads over MAX_TEXTS texts with 413.
+
+LATENCY = 0.05
+ERROR_RATE = 0.1
+MAX_TEXTS = 64
+
+class FakeEmbeddingHandler(BaseHTTPRequestHandler):
+    rng = random.Random(7)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        texts = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['texts']
+        time.sleep(LATENCY)
+        if len(texts) > MAX_TEXTS:
+            status, body = 413, {'error': 'payload too large'}
+        elif self.rng.random() < ERROR_RATE:
+            status, body = self.rng.choice([429, 500]), {'error': 'injected failure'}
+        else:
+            status, body = 200, {'embeddings': [[float(len(text) % 97), float(text.count(' ')), 1.0] for text in texts]}
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+class HttpEmbeddings(Embeddings):
+    model = 'fake-http-embeddings'
+
+    def __init__(self, url):
+        self.url = url
+        self.session = requests.Session()
+
+    def embed_documents(self, texts):
+        response = self.session.post(self.url, json={'texts': texts}, timeout=10)
+        response.raise_for_status()
+        return response.json()['embeddings']
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+def make_documents(num_documents=3000, seed=7):
+    rng = random.Random(seed)
+    words = "admission course faculty hostel fee semester library research campus student deadline exam".split()
+    return [Document(id=f"chunk-{i}", page_content=" ".join(rng.choice(words) for _ in range(rng.randint(50, 300))),
+                     metadata={'source': f"https://example.edu/page/{i // 5}", 'title': f"Page {i // 5}"})
+            for i in range(num_documents)]
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeEmbeddingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/embed"
+    documents = make_documents()
+    print(f"{len(documents)} documents, {LATENCY * 1000:.0f} ms per request, {ERROR_RATE:.0%} injected 429/500, "
+          f"413 above {MAX_TEXTS} texts")
+    try:
+        for workers in [1, 8]:
+            with tempfile.TemporaryDirectory() as tmp:
+                vector_db = VectorDB(persist_directory=os.path.join(tmp, 'chroma_db'), embedding_function=HttpEmbeddings(url),
+                                     use_embedding_cache=False, embedding_workers=workers, embedding_sub_batch_size=100)
+                vector_db.embedding_executor.base_delay = 0.05
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    db = vector_db.make_vector_db(documents, chroma_upsert_batch_size=1000)
+                elapsed = time.perf_counter() - start
+                stats = vector_db.embedding_executor.get_stats()
+                print(f"{workers} worker(s): {len(documents) / elapsed:7.0f} docs/second, {db._collection.count()} indexed, "
+                      f"{stats['requests']} requests, {stats['retries']} retries, {stats['rate_limited']} rate limited, {stats['splits']} splits, "
+                      f"{stats['failures']} failures")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils.WebScraper import WebScraper
+from Utils.HtmlExtractor import HtmlExtractor
+from tests.test_html_extractor import reference_extract_links, reference_extract_text
+
+# Parse time per page for the old two-parse extraction against the single-pass HtmlExtractor,
+# over generated pages shaped like university sites: menus, deep div nesting, lists, tables and footers.
+
+WORDS = "admission course faculty hostel fee semester library research campus student deadline exam".split()
+
+def sentence(rng, n=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def nested_divs(rng, depth):
+    if depth == 0:
+        return f"<span>{sentence(rng, 6)}</span> <a href='/dept/{rng.randrange(500)}'>{rng.choice(WORDS)}</a>"
+    return f"<div class='wrap-{depth}'>{nested_divs(rng, depth - 1)}</div>"
+
+def make_page(rng, page_id):
+    menu = "".join(f"<li><a href='/section/{i}?utm_source=nav'>{rng.choice(WORDS)}</a></li>" for i in range(40))
+    body = []
+    for s in range(rng.randint(4, 12)):
+        body.append(f"<h2>{sentence(rng, 4)}</h2>")
+        body.extend(f"<p>{sentence(rng)} <a href='/page/{rng.randrange(5000)}'>more</a></p>" for _ in range(rng.randint(1, 5)))
+        body.append("<ul>" + "".join(f"<li>{sentence(rng, 8)}</li>" for _ in range(rng.randint(2, 8))) + "</ul>")
+        body.append(nested_divs(rng, rng.randint(5, 25)))
+        body.append("<table>" + "".join(f"<tr><td>{sentence(rng, 3)}</td><td><span>{rng.randrange(999)}</span></td></tr>" for _ in range(5)) + "</table>")
+    return (f"<!DOCTYPE html><html><head><title>Page {page_id}</title><style>body{{}}</style><script>var x=1;</script></head>"
+            f"<body><header><nav><ul>{menu}</ul></nav></header><main>{''.join(body)}</main>"
+            f"<aside><p>{sentence(rng)}</p></aside><footer><p>Contact {sentence(rng)}</p><form><button>Go</button></form></footer></body></html>")
+
+def make_corpus(num_pages=200, seed=7):
+    rng = random.Random(seed)
+    return [(f"https://example.edu/page/{i}", make_page(rng, i)) for i in range(num_pages)]
+
+def main():
+    corpus = make_corpus()
+    scraper = WebScraper("https://example.edu/", html_parser="html.parser")
+    total_bytes = sum(len(html) for _, html in corpus)
+    print(f"Corpus: {len(corpus)} pages, {total_bytes / len(corpus) / 1024:.1f} KiB average")
+
+    start = time.perf_counter()
+    reference_extractor = HtmlExtractor(scraper.base_domain, scraper.ignored_links, scraper.ignored_extensions,
+                                        parser="html.parser", canonicalizer=scraper.canonicalizer)
+    reference = [(reference_extract_text(html), reference_extract_links(reference_extractor, html, url)) for url, html in corpus]
+    elapsed = time.perf_counter() - start
+    print(f"two-parse (html.parser):    {elapsed / len(corpus) * 1000:7.2f} ms/page")
+
+    for parser in ["html.parser", "lxml"]:
+        extractor = HtmlExtractor(scraper.base_domain, scraper.ignored_links, scraper.ignored_extensions, parser=parser,
+                                  canonicalizer=scraper.canonicalizer)
+        try:
+            start = time.perf_counter()
+            results = [extractor.extract(html, url) for url, html in corpus]
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            print(f"single-pass ({parser}): unavailable ({e})")
+            continue
+        mismatches = sum(1 for got, expected in zip(results, reference) if got[:2] != expected)
+        print(f"single-pass ({parser}):{' ' * (15 - len(parser))}{elapsed / len(corpus) * 1000:7.2f} ms/page, {mismatches} pages differ from two-parse output")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import random
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils.Frontier import Frontier
+
+# Crawl-frontier bookkeeping on a synthetic link graph, without any network or parsing.
+# The list-scan baseline is the dedup check crawl_website used before the Frontier class.
+
+def make_link_graph(num_nodes, links_per_page=10, seed=42):
+    rng = random.Random(seed)
+    urls = [f"https://example.edu/page/{i}" for i in range(num_nodes)]
+    return urls, [[urls[rng.randrange(num_nodes)] for _ in range(links_per_page)] for _ in range(num_nodes)]
+
+def crawl_with_list_scan(urls, graph):
+    index = {url: i for i, url in enumerate(urls)}
+    urls_to_visit = deque([(urls[0], 0)])
+    visited_urls = set()
+    while urls_to_visit:
+        url, depth = urls_to_visit.popleft()
+        if url in visited_urls:
+            continue
+        visited_urls.add(url)
+        for link in graph[index[url]]:
+            if link not in visited_urls and link not in [item[0] for item in urls_to_visit]:
+                urls_to_visit.append((link, depth + 1))
+    return len(visited_urls)
+
+def crawl_with_frontier(urls, graph):
+    index = {url: i for i, url in enumerate(urls)}
+    frontier = Frontier()
+    frontier.add(urls[0], 0)
+    while frontier:
+        url, depth = frontier.pop()
+        frontier.mark_visited(url)
+        for link in graph[index[url]]:
+            frontier.add(link, depth + 1)
+    return frontier.visited_count
+
+def time_crawl(crawl_fn, urls, graph):
+    start = time.perf_counter()
+    visited = crawl_fn(urls, graph)
+    return visited, time.perf_counter() - start
+
+def main():
+    for num_nodes, include_baseline in [(2_000, True), (10_000, True), (100_000, False)]:
+        urls, graph = make_link_graph(num_nodes)
+        visited, elapsed = time_crawl(crawl_with_frontier, urls, graph)
+        print(f"{num_nodes:>7} nodes  Frontier:  {elapsed:8.3f}s  ({visited} visited, {visited / elapsed:,.0f} pages/s)")
+        if include_baseline:
+            visited, elapsed = time_crawl(crawl_with_list_scan, urls, graph)
+            print(f"{num_nodes:>7} nodes  list scan: {elapsed:8.3f}s  ({visited} visited, {visited / elapsed:,.0f} pages/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import threading
+import contextlib
+import io
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import Embeddings
+from Utils.WebScraper import WebScraper
+from Utils.PageWriter import PageWriter
+from Utils.Splitter import Splitter
+from Utils.VectorDB import VectorDB
+from Utils.IngestPipeline import IngestPipeline
+
+# Wall time of crawl-then-split-then-index against the pipelined IngestPipeline, on a generated site served
+# from a local HTTP server and a fake embedding function with a fixed per-call latency.
+
+WORDS = "admission course faculty hostel fee semester library research campus student deadline exam".split()
+
+class FakeEmbeddings(Embeddings):
+    model = 'fake-embeddings'
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+
+    def _embed(self, text):
+        return [float(len(text) % 97), float(text.count(' ')), 1.0]
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def sentence(rng, n=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def make_site(root, num_pages=60, seed=7):
+    rng = random.Random(seed)
+    for i in range(num_pages):
+        links = "".join(f"<a href='/page{rng.randrange(num_pages)}.html'>more</a>" for _ in range(5))
+        paragraphs = "".join(f"<p>{' '.join(sentence(rng) for _ in range(rng.randint(5, 40)))}</p>" for _ in range(rng.randint(2, 8)))
+        name = 'index.html' if i == 0 else f'page{i}.html'
+        with open(os.path.join(root, name), 'w', encoding='utf-8') as file:
+            file.write(f"<html><head><title>Page {i}</title></head><body><h1>Page {i}</h1>{paragraphs}"
+                       f"<a href='/page{i + 1}.html'>next</a>{links}</body></html>")
+
+def make_scraper(base_url, tmp, name):
+    return WebScraper(base_url, max_depth=100, use_sitemaps=False,
+                      writer=PageWriter(os.path.join(tmp, f'{name}.jsonl')))
+
+def make_vector_db(tmp, name):
+    return VectorDB(persist_directory=os.path.join(tmp, f'{name}_db'), embedding_function=FakeEmbeddings())
+
+def sequential(base_url, tmp):
+    scraper = make_scraper(base_url, tmp, 'sequential')
+    scraper.crawl_website(politeness_delay=0.01)
+    vector_db = make_vector_db(tmp, 'sequential')
+    db = vector_db.make_vector_db(Splitter(scraper.writer.path).iter_documents(), chroma_upsert_batch_size=100)
+    return db._collection.count()
+
+def pipelined(base_url, tmp):
+    pipeline = IngestPipeline(make_scraper(base_url, tmp, 'pipelined'), make_vector_db(tmp, 'pipelined'))
+    db = pipeline.run(politeness_delay=0.01)
+    return db._collection.count(), pipeline.get_stats()
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        site = os.path.join(tmp, 'site')
+        os.makedirs(site)
+        make_site(site)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=site))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+        try:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                sequential_count = sequential(base_url, tmp)
+            print(f"sequential: {time.perf_counter() - start:6.2f} s, {sequential_count} chunks indexed")
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                pipelined_count, stats = pipelined(base_url, tmp)
+            print(f"pipelined:  {time.perf_counter() - start:6.2f} s, {pipelined_count} chunks indexed")
+            for name, stage in stats.items():
+                print(f"  {name}: {stage['items_per_second']:7.1f} items/s, busy {stage['busy_seconds']:.2f} s, "
+                      f"blocked {stage['blocked_seconds']:.2f} s")
+        finally:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import random
+import contextlib
+import io
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils.EmbeddingBackends import make_embeddings
+
+# Query-embedding latency (p50/p95 of embed_query) and batch throughput (embed_documents) of the local
+# embedding backends. Nothing here touches the network; a backend whose model is not on disk is skipped.
+# Pass a model directory as the first argument to benchmark an ONNX model stored elsewhere.
+
+WORDS = "admission course faculty hostel fee semester library research campus student deadline exam".split()
+NUM_QUERIES = 200
+NUM_DOCUMENTS = 256
+
+def make_texts(rng, count, low, high):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))) for _ in range(count)]
+
+def bench(name, embeddings, queries, documents):
+    embeddings.embed_query(queries[0])
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        embeddings.embed_query(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(documents)
+    elapsed = time.perf_counter() - start
+    print(f"{name:8s} query p50 {np.percentile(latencies, 50):7.2f} ms, p95 {np.percentile(latencies, 95):7.2f} ms; "
+          f"{len(documents) / elapsed:7.0f} docs/second, {len(vectors[0])} dimensions")
+
+def main():
+    rng = random.Random(7)
+    queries = make_texts(rng, NUM_QUERIES, 4, 16)
+    documents = make_texts(rng, NUM_DOCUMENTS, 50, 300)
+    print(f"{NUM_QUERIES} queries, {NUM_DOCUMENTS} documents, {os.cpu_count()} CPU(s)")
+    bench('hashing', make_embeddings('hashing'), queries, documents)
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            onnx = make_embeddings('onnx', model_dir)
+    except Exception as e:
+        print(f"onnx     unavailable: {e}")
+        return
+    bench('onnx', onnx, queries, documents)
+
+if __name__ == "__main__":
+    main()
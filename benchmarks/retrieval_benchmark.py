@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+import io
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.VectorDB import VectorDB, RETRIEVAL_MODES
+
+# Retrieval latency (p50/p95) of VectorDB.search in each mode, and how often the chunk naming a course code is
+# returned in the top k for a question about that code. Query embeddings come from the hashing backend plus a fixed
+# delay standing in for the embedding API round trip that the lexical mode avoids.
+
+QUERY_EMBEDDING_LATENCY = 0.05
+NUM_DOCUMENTS = 5000
+NUM_QUERIES = 100
+K = 4
+
+WORDS = ("admission course faculty hostel fee semester library research campus student deadline exam "
+         "scholarship department laboratory lecture seminar thesis credit timetable").split()
+
+class RemoteHashingEmbeddings(HashingEmbeddings):
+    def embed_query(self, text):
+        time.sleep(QUERY_EMBEDDING_LATENCY)
+        return super().embed_query(text)
+
+def make_documents(rng):
+    documents = []
+    for i in range(NUM_DOCUMENTS):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(80, 300)))
+        text += f" The course CS{1000 + i} is taught in room R{rng.randint(100, 999)} by the {rng.choice(WORDS)} department."
+        documents.append(Document(id=f"chunk-{i}", page_content=text,
+                                  metadata={'source': f"https://example.edu/page/{i // 5}", 'title': f"Page {i // 5}"}))
+    return documents
+
+def main():
+    rng = random.Random(7)
+    documents = make_documents(rng)
+    targets = rng.sample(range(NUM_DOCUMENTS), NUM_QUERIES)
+    queries = [(f"Which room is CS{1000 + i} taught in?", f"chunk-{i}") for i in targets]
+    print(f"{NUM_DOCUMENTS} chunks, {NUM_QUERIES} queries, top {K}, "
+          f"{QUERY_EMBEDDING_LATENCY * 1000:.0f} ms simulated query embedding latency")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        persist_directory = os.path.join(tmp, 'chroma_db')
+        vector_db = VectorDB(persist_directory=persist_directory, embedding_function=RemoteHashingEmbeddings(),
+                             use_embedding_cache=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            vector_db.make_vector_db(documents)
+        print(f"BM25 index: {os.path.getsize(vector_db.bm25_path) / 1024 / 1024:.1f} MiB on disk")
+
+        # Reopen from disk, as the chat app does.
+        vector_db = VectorDB(persist_directory=persist_directory, embedding_function=RemoteHashingEmbeddings(),
+                             use_embedding_cache=False)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            vector_db.load_vector_db()
+        print(f"Loaded collection and BM25 index in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        for mode in RETRIEVAL_MODES:
+            latencies = []
+            hits = 0
+            for query, expected_id in queries:
+                start = time.perf_counter()
+                results = vector_db.search(query, k=K, mode=mode)
+                latencies.append((time.perf_counter() - start) * 1000)
+                hits += any(doc.id == expected_id for doc in results)
+            print(f"{mode:8s} p50 {np.percentile(latencies, 50):7.2f} ms, p95 {np.percentile(latencies, 95):7.2f} ms, "
+                  f"course chunk in top {K}: {hits / len(queries):.0%}")
+
+if __name__ == "__main__":
+    main()
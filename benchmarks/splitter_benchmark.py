@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils.Splitter import Splitter
+
+# Chunking throughput of Splitter.iter_batches_parallel with 1 worker against N workers,
+# over a generated scraped_data.jsonl, checked against the serial iter_documents() output.
+
+WORDS = "admission course faculty hostel fee semester library research campus student deadline exam".split()
+
+def sentence(rng, n=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def make_jsonl(path, num_pages=3000, seed=7):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(num_pages):
+            sections = [{'section_title': sentence(rng, 4), 'text': " ".join(sentence(rng) for _ in range(rng.randint(5, 60)))}
+                        for _ in range(rng.randint(1, 8))]
+            file.write(json.dumps({'url': f"https://example.edu/page/{i}", 'depth': 1, 'title': f"Page {i}",
+                                   'sections': sections}) + "\n")
+
+def run(splitter, workers):
+    start = time.perf_counter()
+    docs = [doc for batch in splitter.iter_batches_parallel(workers=workers, range_bytes=512 * 1024) for doc in batch]
+    return docs, time.perf_counter() - start
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'scraped_data.jsonl')
+        make_jsonl(path)
+        splitter = Splitter(path)
+        print(f"Corpus: {os.path.getsize(path) / 1024 / 1024:.1f} MiB of JSONL")
+
+        reference = [(doc.id, doc.page_content, doc.metadata) for doc in splitter.iter_documents()]
+
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            docs, elapsed = run(splitter, workers)
+            matches = [(doc.id, doc.page_content, doc.metadata) for doc in docs] == reference
+            print(f"{workers} worker(s): {len(docs) / elapsed:9.0f} docs/second ({len(docs)} docs in {elapsed:.2f} s), "
+                  f"{'same' if matches else 'DIFFERENT'} output as iter_documents()")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import tempfile
+import contextlib
+import io
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_chroma import Chroma
+from Utils.NumpyVectorStore import NumpyVectorStore
+
+# Recall@K and latency of NumpyVectorStore (float16 and int8, decoded into RAM or streamed from the memory map)
+# against Chroma's HNSW index, on synthetic embeddings with a low intrinsic dimension like real text embeddings.
+# Ground truth is an exact float32 search. Pass the number of vectors as the first argument.
+
+DIM = 768
+LATENT_DIM = 48
+NUM_QUERIES = 200
+K = 10
+BATCH = 4000
+
+def make_vectors(rng, count, projection):
+    latent = rng.standard_normal((count, LATENT_DIM)).astype(np.float32)
+    vectors = latent @ projection + 0.05 * rng.standard_normal((count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def recall(found, truth):
+    return np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def report(name, build, open_time, latencies, batch_seconds, found, truth, size):
+    print(f"{name:16s} build {build:6.1f} s, open {open_time * 1000:6.1f} ms, query p50 {np.percentile(latencies, 50):6.2f} ms "
+          f"p95 {np.percentile(latencies, 95):6.2f} ms, batched {NUM_QUERIES / batch_seconds:7.0f} queries/s, "
+          f"recall@{K} {recall(found, truth):.3f}, {size / 1024 / 1024:6.1f} MiB")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = np.random.default_rng(7)
+    projection = rng.standard_normal((LATENT_DIM, DIM)).astype(np.float32) / np.sqrt(LATENT_DIM)
+    vectors = make_vectors(rng, count, projection)
+    queries = make_vectors(rng, NUM_QUERIES, projection)
+    ids = [f"chunk-{i}" for i in range(count)]
+    documents = [f"text of chunk {i}" for i in range(count)]
+    metadatas = [{'source': f"https://example.edu/page/{i // 5}"} for i in range(count)]
+    normalized = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = [[ids[i] for i in np.argsort(-scores)[:K]] for scores in normalized @ vectors.T]
+    print(f"{count} vectors of {DIM} dimensions, {NUM_QUERIES} queries, top {K}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        builds = {}
+        for dtype, max_cache_bytes in [('float16', 256 * 1024 * 1024), ('int8', 256 * 1024 * 1024), ('float16', 0), ('int8', 0)]:
+            # The streamed runs reopen the store built for the in-RAM run of the same dtype.
+            path = os.path.join(tmp, dtype)
+            if dtype not in builds:
+                start = time.perf_counter()
+                store = NumpyVectorStore(path, dtype=dtype)
+                for i in range(0, count, BATCH):
+                    store.upsert(ids[i:i + BATCH], vectors[i:i + BATCH], documents[i:i + BATCH], metadatas[i:i + BATCH])
+                builds[dtype] = time.perf_counter() - start
+            build = builds[dtype]
+            start = time.perf_counter()
+            store = NumpyVectorStore(path, max_cache_bytes=max_cache_bytes)
+            store.search_vectors(queries[:1], K)
+            open_time = time.perf_counter() - start
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                store.query([query], n_results=K)
+                latencies.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            found = store.query(queries, n_results=K)['ids']
+            batch_seconds = time.perf_counter() - start
+            report(f"{dtype} {'streamed' if not max_cache_bytes else 'in RAM'}", build, open_time, latencies, batch_seconds, found, truth, directory_size(path))
+
+        path = os.path.join(tmp, 'chroma')
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            collection = Chroma(collection_name='benchmark', persist_directory=path)._collection
+            for i in range(0, count, BATCH):
+                collection.upsert(ids=ids[i:i + BATCH], embeddings=vectors[i:i + BATCH].tolist(),
+                                  documents=documents[i:i + BATCH], metadatas=metadatas[i:i + BATCH])
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            collection = Chroma(collection_name='benchmark', persist_directory=path)._collection
+            collection.query(query_embeddings=queries[:1].tolist(), n_results=K, include=[])
+            open_time = time.perf_counter() - start
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                collection.query(query_embeddings=[query.tolist()], n_results=K, include=[])
+                latencies.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            found = collection.query(query_embeddings=queries.tolist(), n_results=K, include=[])['ids']
+            batch_seconds = time.perf_counter() - start
+        report("chroma (hnsw)", build, open_time, latencies, batch_seconds, found, truth, directory_size(path))
+
+if __name__ == "__main__":
+    main()
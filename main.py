@@ -1,6 +1,7 @@
 from Utils.Splitter import Splitter
 from Utils.WebScraper import WebScraper
 from Utils.VectorDB import VectorDB
+from Utils.ChunkDeduplicator import ChunkDeduplicator
 import os
 
 
@@ -9,6 +10,8 @@ import os
 # Define file paths
 scraped_data_file = os.path.join(os.path.dirname(__file__), 'Data', 'scraped_data.jsonl')
 persist_directory = os.path.join(os.path.dirname(__file__), 'Data', 'chroma_db')
+# SPLIT_WORKERS > 1 chunks the scraped pages in that many processes.
+split_workers = int(os.getenv("SPLIT_WORKERS", "1"))
 
 def main():
     # Initialize our classes
@@ -16,18 +19,15 @@ def main():
     splitter = Splitter(scraped_data_file)
     vector_db = VectorDB(persist_directory = persist_directory)
    
-    # Step 1: Split JSONL into documents
-    print("\nSplitting JSONL into documents...")
-    documents = splitter.split_jsonl_to_doc()
-    print(f"Created {len(documents)} documents total")
+    # Split JSONL into documents and stream them into the vectordb
+    print("\nSplitting JSONL into documents and creating vectordb...")
+    documents = splitter.iter_documents_parallel(workers=split_workers) if split_workers > 1 else splitter.iter_documents()
+    db = vector_db.make_vector_db(documents, deduplicator=ChunkDeduplicator())
+    print(f"Created {splitter.doc_count} documents total")
    
-    if not documents:
+    if db is None:
         print("No documents to process. Exiting.")
         return
-   
-    # Step 2: Create vectordb
-    print("\nCreating vectordb...")
-    db = vector_db.make_vector_db(documents)
 
     
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FixtureSite:
+    # A local HTTP server for crawler tests. routes maps a path to (status, headers, body); every request is logged
+    # with its headers, and the highest number of requests served at once is tracked.
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with site._lock:
+                    site.requests.append((self.path, dict(self.headers)))
+                    site.in_flight += 1
+                    site.max_in_flight = max(site.max_in_flight, site.in_flight)
+                try:
+                    if site.delay:
+                        time.sleep(site.delay)
+                    status, headers, body = site.routes.get(self.path, (404, {'Content-Type': 'text/plain'}, b'not found'))
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with site._lock:
+                        site.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def url(self, path='/'):
+        return self.base_url + path
+
+    def add_html(self, path, html, headers=None):
+        self.routes[path] = (200, {'Content-Type': 'text/html; charset=utf-8', **(headers or {})}, html.encode('utf-8'))
+
+    def add(self, path, body, content_type='text/plain', status=200, headers=None):
+        body = body.encode('utf-8') if isinstance(body, str) else body
+        self.routes[path] = (status, {'Content-Type': content_type, **(headers or {})}, body)
+
+    def fetched_paths(self):
+        return [path for path, _ in self.requests]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def page_html(title, paragraphs, links=()):
+    body = "".join(f"<p>{text}</p>" for text in paragraphs)
+    anchors = "".join(f'<li><a href="{href}">Go to {href}</a></li>' for href in links)
+    return (f"<html><head><title>{title}</title></head><body><h1>{title}</h1>{body}"
+            f"<ul>{anchors}</ul></body></html>")
+
+
+def add_tree_site(site, pages=20, fanout=3, sentences=3):
+    # Page i links to pages fanout*i+1 .. fanout*i+fanout, so the site is a tree rooted at "/" (page 0).
+    def path(i):
+        return "/" if i == 0 else f"/page/{i}"
+    for i in range(pages):
+        children = [path(child) for child in range(fanout * i + 1, min(fanout * i + fanout, pages - 1) + 1)]
+        paragraphs = [f"Page {i} sentence {s} about course CS{1000 + i} and its room R{i}{s}." for s in range(sentences)]
+        site.add_html(path(i), page_html(f"Page {i}", paragraphs, children))
+    return [path(i) for i in range(pages)]
+
+
+def read_pages(path):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+@pytest.fixture
+def site():
+    fixture_site = FixtureSite()
+    yield fixture_site
+    fixture_site.close()
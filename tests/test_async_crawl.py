@@ -0,0 +1,57 @@
+from urllib.parse import urlparse
+
+from conftest import add_tree_site, read_pages
+from Utils.PageWriter import PageWriter
+from Utils.WebScraper import WebScraper
+
+
+def make_scraper(site, tmp_path, **options):
+    writer = PageWriter(str(tmp_path / 'scraped_data.jsonl'))
+    return WebScraper(site.url('/'), writer=writer, use_sitemaps=False, strip_boilerplate=False, **options)
+
+
+def scraped_paths(scraper):
+    return {urlparse(page['url']).path or '/' for page in read_pages(scraper.writer.path)}
+
+
+def test_async_crawl_scrapes_the_same_pages_as_the_sequential_crawl(site, tmp_path):
+    paths = add_tree_site(site, pages=30)
+    sequential = make_scraper(site, tmp_path / 'sequential', max_depth=5)
+    sequential.crawl_website(politeness_delay=0)
+
+    concurrent = make_scraper(site, tmp_path / 'concurrent', max_depth=5)
+    stats = concurrent.crawl_website_async(politeness_delay=0, concurrency=4)
+
+    assert scraped_paths(concurrent) == scraped_paths(sequential) == set(paths)
+    assert stats['pages_scraped'] == len(paths)
+    assert stats['pages_per_second'] > 0
+
+
+def test_async_crawl_respects_page_limit_and_depth(site, tmp_path):
+    add_tree_site(site, pages=40)
+    limited = make_scraper(site, tmp_path / 'limited', max_depth=5, max_pages_to_scrape=7)
+    limited.crawl_website_async(politeness_delay=0, concurrency=4)
+    assert len(read_pages(limited.writer.path)) == 7
+
+    shallow = make_scraper(site, tmp_path / 'shallow', max_depth=1)
+    shallow.crawl_website_async(politeness_delay=0, concurrency=4)
+    assert scraped_paths(shallow) == {'/', '/page/1', '/page/2', '/page/3'}
+    assert all(page['depth'] <= 1 for page in read_pages(shallow.writer.path))
+
+
+def test_async_crawl_limits_concurrent_requests_per_host(site, tmp_path):
+    add_tree_site(site, pages=20)
+    site.delay = 0.05
+    scraper = make_scraper(site, tmp_path, max_depth=5)
+    scraper.crawl_website_async(politeness_delay=0, concurrency=8, per_host_concurrency=2)
+    assert len(read_pages(scraper.writer.path)) == 20
+    assert site.max_in_flight <= 2
+
+
+def test_async_crawl_stops_at_the_time_limit(site, tmp_path):
+    add_tree_site(site, pages=40)
+    site.delay = 0.2
+    scraper = make_scraper(site, tmp_path, max_depth=5, max_crawl_duration=0.5)
+    stats = scraper.crawl_website_async(politeness_delay=0, concurrency=2, per_host_concurrency=2)
+    assert stats['elapsed_seconds'] < 2.0
+    assert stats['pages_scraped'] < 40
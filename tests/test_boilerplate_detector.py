@@ -0,0 +1,89 @@
+from conftest import page_html, read_pages
+from Utils.BoilerplateDetector import BoilerplateDetector
+from Utils.PageWriter import PageWriter
+from Utils.WebScraper import WebScraper
+
+NAV = "Admissions Academics Research Campus life Contact us"
+
+
+def page(blocks):
+    return {'title': "Page", 'sections': [{'section_title': "Body", 'text': " ".join(blocks)}]}, [blocks]
+
+
+def texts(result):
+    return [section['text'] for section in result['sections']]
+
+
+def test_blocks_on_min_pages_are_stripped_from_then_on():
+    detector = BoilerplateDetector(min_pages=3)
+    results = [detector.strip(f"https://example.edu/{i}", *page([NAV, f"Page {i} is about course CS{i}."]))
+               for i in range(5)]
+
+    # The first two pages keep the menu; from the third page on it is a site-wide block.
+    assert [NAV in texts(result)[0] for result in results] == [True, True, False, False, False]
+    assert all(f"course CS{i}." in texts(result)[0] for i, result in enumerate(results))
+    stats = detector.get_stats()
+    assert stats['pages'] == 5 and stats['blocks'] == 10 and stats['blocks_removed'] == 3
+    assert stats['chars_removed'] == 3 * len(NAV) and stats['template_blocks'] == 1
+
+
+def test_blocks_are_counted_per_domain_and_once_per_page():
+    detector = BoilerplateDetector(min_pages=2, min_block_chars=4)
+    detector.strip("https://a.example.edu/", *page([NAV, NAV]))
+    other_domain = detector.strip("https://b.example.edu/", *page([NAV, "Other"]))
+    same_domain = detector.strip("https://a.example.edu/x", *page([NAV.upper(), "Yes", "Body text"]))
+
+    assert texts(other_domain) == [f"{NAV} Other"]
+    # Matching ignores case and spacing; blocks shorter than min_block_chars are never stripped.
+    assert texts(same_domain) == ["Yes Body text"]
+
+
+def test_sections_made_only_of_boilerplate_are_dropped():
+    detector = BoilerplateDetector(min_pages=2)
+    detector.strip("https://example.edu/first", *page([NAV]))
+    structured_text = {'title': "Page", 'sections': [{'section_title': "Menu", 'text': NAV},
+                                                     {'section_title': "Body", 'text': "Body text"}]}
+    result = detector.strip("https://example.edu/", structured_text, [[NAV], ["Body text"]])
+
+    assert [section['section_title'] for section in result['sections']] == ["Body"]
+    assert detector.get_stats()['sections_removed'] == 1
+
+
+def add_templated_site(site, pages=12):
+    paths = ["/"] + [f"/page/{i}" for i in range(1, pages)]
+    for i, path in enumerate(paths):
+        links = paths[1:] if i == 0 else []
+        site.add_html(path, page_html(f"Page {i}", [NAV, "Library hours and campus map", f"Page {i} covers course CS{i}."],
+                                      links))
+    return paths
+
+
+def crawl_texts(site, tmp_path, concurrency, **options):
+    writer = PageWriter(str(tmp_path / f'scraped_{concurrency}.jsonl'))
+    scraper = WebScraper(site.url('/'), writer=writer, use_sitemaps=False, max_depth=2, **options)
+    if concurrency > 1:
+        scraper.crawl_website_async(politeness_delay=0, concurrency=concurrency)
+    else:
+        scraper.crawl_website(politeness_delay=0)
+    return {page['url']: [section['text'] for section in page['sections']] for page in read_pages(writer.path)}
+
+
+def test_default_crawls_give_the_same_text_in_any_order(site, tmp_path):
+    paths = add_templated_site(site)
+    sequential = crawl_texts(site, tmp_path, 1)
+    assert len(sequential) == len(paths)
+    assert all(any(NAV in text for text in page_texts) for page_texts in sequential.values())
+
+    # Concurrent crawls finish pages in a different order from the sequential one, and from each other.
+    site.delay = 0.005
+    for concurrency in (2, 4, 8):
+        assert crawl_texts(site, tmp_path, concurrency) == sequential
+
+
+def test_opt_in_stripping_keeps_every_page_s_own_text(site, tmp_path):
+    add_templated_site(site)
+    stripped = crawl_texts(site, tmp_path, 4, strip_boilerplate=True)
+
+    assert sum(any(NAV in text for text in page_texts) for page_texts in stripped.values()) == 2
+    page_texts = [" ".join(texts) for texts in stripped.values()]
+    assert all(any(f"course CS{i}." in text for text in page_texts) for i in range(12))
@@ -0,0 +1,93 @@
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from Utils.ChatCache import ChatCache, TTLCache
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.RAG import RAG
+from Utils.VectorDB import VectorDB, read_index_version
+
+
+def build(path, fee):
+    vector_db = VectorDB(persist_directory=str(path), embedding_function=HashingEmbeddings(), use_embedding_cache=False)
+    vector_db.make_vector_db([Document(id=f"fees-{i}", page_content=f"The hostel fee is {fee} rupees per semester, part {i}.",
+                                       metadata={'source': f"https://example.edu/fees/{i}", 'title': "Fees"})
+                              for i in range(3)])
+    return vector_db
+
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt_value):
+        prompt = prompt_value.to_string()
+        self.prompts.append(prompt)
+        return "The fee is listed in the context." if "Context:" in prompt else prompt_value.to_messages()[-1].content
+
+
+def test_index_version_lives_in_the_persist_directory(tmp_path):
+    first = build(tmp_path / 'first_db', 1000)
+    second = build(tmp_path / 'second_db', 2000)
+    version = first.index_version()
+
+    second.bump_index_version()
+
+    assert version is not None and read_index_version(first.persist_directory) == version
+    assert first.index_version_path == str(tmp_path / 'first_db' / 'index_version')
+    assert second.index_version() not in (None, version)
+    assert read_index_version(str(tmp_path / 'missing_db')) is None
+
+
+def test_rebuild_invalidates_cached_retrieval_and_answers(tmp_path):
+    persist_directory = str(tmp_path / 'chroma_db')
+    original = build(persist_directory, 1000)
+    cache = ChatCache(index_version=lambda: read_index_version(persist_directory))
+    llm = FakeLLM()
+
+    def ask(vector_db):
+        RAG(cache=cache).chat("What is the hostel fee?", retriever=vector_db.get_retriever(search_kwargs={"k": 2}),
+                              llm=RunnableLambda(llm.invoke))
+
+    ask(original)
+    ask(VectorDB(persist_directory=persist_directory, embedding_function=HashingEmbeddings()))
+    assert len(llm.prompts) == 1 and cache.get_stats()['answer']['hits'] == 1
+
+    # Rebuilt by another process, as the preparation page does; the next question must see the new fee.
+    rebuilt = build(persist_directory, 2000)
+    ask(rebuilt)
+    assert cache.invalidations == 1
+    assert len(llm.prompts) == 2 and "2000 rupees" in llm.prompts[-1] and "1000" not in llm.prompts[-1]
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('time.monotonic', lambda: now[0])
+    cache = TTLCache(max_entries=2, ttl_seconds=10)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)  # 'b' is the least recently used entry.
+    assert cache.get('b') is None and cache.get('c') == 3
+    now[0] += 11
+    assert cache.get('a') is None
+    assert cache.get_stats()['evictions'] == 1 and cache.get_stats()['expired'] == 1
+
+
+def test_queries_differing_only_in_case_and_spacing_share_a_key():
+    normalize = ChatCache.normalize_query
+    assert normalize("  What is the  Hostel\tfee?\n") == normalize("what is the hostel fee?") == "what is the hostel fee?"
+    # Symbols are part of the question.
+    assert len({normalize(query) for query in ["Who teaches C++?", "Who teaches C?", "Who teaches C#?"]}) == 3
+    assert normalize("Fee in $?") != normalize("Fee in €?")
+    assert normalize("STRASSE") == normalize("straße")
+
+
+def test_symbol_questions_are_answered_separately(tmp_path):
+    vector_db = build(tmp_path / 'chroma_db', 1000)
+    cache = ChatCache()
+    llm = FakeLLM()
+    retriever = vector_db.get_retriever(search_kwargs={"k": 2})
+    for question in ["Is C++ taught?", "Is C taught?", "is  c++ TAUGHT?"]:
+        RAG(cache=cache).chat(question, retriever=retriever, llm=RunnableLambda(llm.invoke))
+
+    assert len(llm.prompts) == 2 and cache.get_stats()['answer']['hits'] == 1
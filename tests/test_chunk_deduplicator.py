@@ -0,0 +1,43 @@
+from langchain_core.documents import Document
+
+from Utils.ChunkDeduplicator import ChunkDeduplicator, split_sources
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.VectorDB import VectorDB
+
+NOTICE = ("The admissions office is open from nine to five on weekdays and answers questions about fees, "
+          "scholarships, hostel places and the documents needed for enrolment. Applicants can also book a campus "
+          "tour, meet current students and ask the faculty about course choices, timetables, exams and the library.")
+SOURCES = ["https://example.edu/admissions", "https://example.edu/fees?year=2025&term=autumn",
+           "https://example.edu/files/Notice Board.html"]
+
+
+def make_documents():
+    docs = [Document(id=f"notice-{i}", page_content=text, metadata={'source': source, 'title': f"Page {i}"})
+            for i, (source, text) in enumerate(zip(SOURCES, [NOTICE, NOTICE.upper(), NOTICE.replace("weekdays", "week days")]))]
+    docs.append(Document(id="other", page_content="The library lends books for three weeks.",
+                         metadata={'source': SOURCES[0], 'title': "Page 0"}))
+    return docs
+
+
+def test_duplicates_are_dropped_and_their_sources_recorded():
+    deduplicator = ChunkDeduplicator()
+    kept = [doc.id for doc in deduplicator.filter(make_documents())]
+
+    assert kept == ["notice-0", "other"]
+    assert deduplicator.get_stats()['exact_duplicates'] == 1 and deduplicator.get_stats()['near_duplicates'] == 1
+    merged = deduplicator.merged_metadata()
+    assert list(merged) == ["notice-0"]
+    assert split_sources(merged["notice-0"]) == SOURCES
+    assert merged["notice-0"]['duplicate_sources'] == 2
+
+
+def test_sources_survive_the_vector_store(tmp_path):
+    vector_db = VectorDB(persist_directory=str(tmp_path / 'chroma_db'), embedding_function=HashingEmbeddings(),
+                         use_embedding_cache=False)
+    vector_db.make_vector_db(make_documents(), deduplicator=ChunkDeduplicator())
+
+    stored = vector_db.db.get(include=['metadatas'])
+    metadatas = dict(zip(stored['ids'], stored['metadatas']))
+    assert sorted(metadatas) == ["notice-0", "other"]
+    assert split_sources(metadatas["notice-0"]) == SOURCES
+    assert split_sources(metadatas["other"]) == [SOURCES[0]]
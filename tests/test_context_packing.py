@@ -0,0 +1,71 @@
+import re
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from Utils.ContextPacker import ContextPacker, estimate_tokens
+from Utils.RAG import RAG
+
+BUDGET = 800
+RANK_MARKER = re.compile(r"Chunk of rank (\d+) begins\.")
+
+
+def ranked_documents(count=8, sentences=12):
+    # Best first, each about 170 tokens from its own page so no two chunks are merged.
+    return [Document(page_content=f"Chunk of rank {rank} begins. " + " ".join(
+                f"Sentence {s} of this chunk explains rule {rank}.{s} of the student handbook in some detail."
+                for s in range(sentences)),
+                     metadata={'source': f"https://example.edu/handbook/{rank}", 'title': f"Rule {rank}"})
+            for rank in range(count)]
+
+
+class FakeLLM:
+    # Records the text of every prompt it is sent and answers with a fixed reply.
+    def __init__(self, answer_words=60):
+        self.prompts = []
+        self.answer = " ".join(["The handbook covers this."] * (answer_words // 4))
+
+    def invoke(self, prompt_value):
+        self.prompts.append("".join(message.content for message in prompt_value.to_messages()))
+        return self.answer
+
+
+def test_chat_keeps_prompts_within_budget_and_drops_lowest_ranked_chunks():
+    docs = ranked_documents()
+    assert sum(estimate_tokens(doc.page_content) for doc in docs) > BUDGET
+    retriever = RunnableLambda(lambda query: docs)
+    llm = FakeLLM()
+    rag = RAG(context_packer=ContextPacker(max_tokens=BUDGET, max_history_tokens=200))
+
+    for turn in range(6):
+        rag.chat(f"What does rule {turn} of the handbook say about exams?", retriever=retriever,
+                 llm=RunnableLambda(llm.invoke), use_question_reformulation=False)
+
+    for usage, prompt in zip(rag.get_token_usage(), llm.prompts):
+        assert usage['prompt_tokens'] <= BUDGET
+        assert estimate_tokens(prompt) <= BUDGET
+        ranks = [int(rank) for rank in RANK_MARKER.findall(prompt)]
+        # The chunks that made it are the best-ranked ones, in rank order; everything after them was dropped.
+        assert ranks == list(range(len(ranks)))
+        assert 0 < len(ranks) < len(docs)
+        assert usage['chunks_used'] == len(ranks)
+        assert usage['chunks_dropped'] == len(docs) - len(ranks)
+    # History grows over the turns and takes budget from the context, but never more than max_history_tokens.
+    usages = rag.get_token_usage()
+    assert usages[-1]['history_tokens'] <= 200 < sum(estimate_tokens(llm.answer) for _ in usages)
+    assert usages[-1]['chunks_used'] <= usages[0]['chunks_used']
+
+
+@pytest.mark.parametrize('max_tokens', [300, 600, 1200])
+def test_pack_orders_by_score_and_drops_the_lowest(max_tokens):
+    docs = ranked_documents()
+    scores = [0.1 * rank for rank in range(len(docs))]  # Reverse order: the last document scores highest.
+    packer = ContextPacker(max_tokens=max_tokens)
+
+    packed = packer.pack(docs, scores=scores)
+
+    ranks = [int(rank) for rank in RANK_MARKER.findall(packed['context'])]
+    assert ranks == list(range(len(docs) - 1, len(docs) - 1 - len(ranks), -1))
+    assert packed['usage']['prompt_tokens'] <= max_tokens
+    assert packed['usage']['chunks_used'] == len(ranks) < len(docs)
@@ -0,0 +1,41 @@
+from urllib.parse import urlparse
+
+from conftest import add_tree_site, read_pages
+from Utils.CrawlState import CrawlState
+from Utils.Frontier import Frontier
+from Utils.PageWriter import PageWriter
+from Utils.WebScraper import WebScraper
+
+
+def test_resume_without_a_checkpoint_clears_stale_output(site, tmp_path):
+    paths = add_tree_site(site, pages=5)
+    writer = PageWriter(str(tmp_path / 'scraped_data.jsonl'))
+    writer.write({'url': 'https://old.example.edu/stale', 'depth': 0, 'title': 'Stale', 'sections': []})
+    writer.close()
+    state = CrawlState(str(tmp_path / 'crawl_state.sqlite'))
+    state.checkpoint('https://old.example.edu/', Frontier(), 1, writer.tell())
+    state.close()
+
+    scraper = WebScraper(site.url('/'), writer=writer, state_file=str(tmp_path / 'crawl_state.sqlite'), resume=True,
+                         use_sitemaps=False, strip_boilerplate=False)
+    scraper.crawl_website(politeness_delay=0)
+
+    assert {urlparse(page['url']).path or '/' for page in read_pages(writer.path)} == set(paths)
+
+
+def test_checkpoint_keeps_the_priority_of_in_progress_urls(tmp_path):
+    frontier = Frontier()
+    frontier.add('https://example.edu/admissions', 1, priority=-5.0)
+    frontier.add('https://example.edu/news', 1, priority=0.0)
+    frontier.add('https://example.edu/archive', 1, priority=3.0)
+    url, depth, priority = frontier.pop_with_priority()
+
+    state = CrawlState(str(tmp_path / 'crawl_state.sqlite'))
+    state.checkpoint('https://example.edu/', frontier, 0, 0, in_progress={url: (depth, priority)})
+    restored = Frontier()
+    state.load(restored)
+    state.close()
+
+    assert list(restored.queued_entries()) == [('https://example.edu/admissions', 1, -5.0),
+                                               ('https://example.edu/news', 1, 0.0),
+                                               ('https://example.edu/archive', 1, 3.0)]
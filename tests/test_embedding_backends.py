@@ -0,0 +1,51 @@
+import os
+
+import pytest
+from langchain_core.documents import Document
+
+from Utils.EmbeddingBackends import DEFAULT_ONNX_MODEL_DIR, HashingEmbeddings, make_embeddings
+from Utils.VectorDB import VectorDB
+
+TOPICS = {
+    'admissions': "Undergraduate admissions open in March and applications need two reference letters.",
+    'hostel': "Hostel rooms are allotted by lottery and the hostel fee covers meals and laundry.",
+    'library': "The central library lends books for three weeks and the reading room is open all night.",
+    'exams': "Semester exams start in December and the exam timetable is published a month earlier.",
+}
+
+
+def make_documents():
+    return [Document(id=f"{topic}-{i}", page_content=f"{text} Part {i}.",
+                     metadata={'source': f"https://example.edu/{topic}", 'title': topic.title()})
+            for topic, text in TOPICS.items() for i in range(3)]
+
+
+def test_hashing_embeddings_are_deterministic_and_normalized():
+    embeddings = make_embeddings('hashing', dimensions=64)
+    first, second = embeddings.embed_documents(["hostel fee", "hostel fee"])
+    assert first == second and len(first) == 64
+    assert sum(value * value for value in first) == pytest.approx(1.0)
+    assert embeddings.embed_query("") == [0.0] * 64
+
+
+def test_hashing_embeddings_build_a_searchable_index(tmp_path):
+    vector_db = VectorDB(persist_directory=str(tmp_path / 'chroma_db'), embedding_function=HashingEmbeddings(),
+                         use_embedding_cache=False)
+    db = vector_db.make_vector_db(make_documents(), chroma_upsert_batch_size=5)
+
+    assert db is not None and db._collection.count() == 12
+    assert vector_db.embedding_name == 'hashing-384'
+    for topic, question in [('hostel', "how is the hostel fee paid"), ('exams', "when is the exam timetable published")]:
+        results = vector_db.search(question, k=3, mode='vector')
+        assert {doc.metadata['source'] for doc in results} == {f"https://example.edu/{topic}"}
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(DEFAULT_ONNX_MODEL_DIR, 'model.onnx')),
+                    reason="the ONNX model is not downloaded")
+def test_onnx_embeddings_match_chroma_default_embedding_function():
+    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+    texts = [text for text in TOPICS.values()] + ["short query"]
+    ours = make_embeddings('onnx').embed_documents(texts)
+    reference = ONNXMiniLM_L6_V2()(texts)
+    for vector, expected in zip(ours, reference):
+        assert vector == pytest.approx(list(expected), abs=1e-4)
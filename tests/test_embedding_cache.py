@@ -0,0 +1,69 @@
+from langchain_core.documents import Document
+
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.EmbeddingCache import CachedEmbeddings, EmbeddingCache, text_hash
+from Utils.VectorDB import VectorDB
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+
+def test_cached_embeddings_only_embed_new_texts(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'embedding_cache.sqlite'))
+    model = CountingEmbeddings(dimensions=16)
+    embeddings = CachedEmbeddings(model, cache)
+
+    first = embeddings.embed_documents(["fees", "hostel", "fees"])
+    second = embeddings.embed_documents(["hostel", "library"])
+
+    assert model.embedded == ["fees", "hostel", "library"]
+    assert first[0] == first[2] == model.embed_query("fees") and second[0] == first[1]
+    assert cache.get_stats()['hits'] == 1 and cache.get_stats()['misses'] == 4
+    # Cached vectors are bit-identical to what the model returned.
+    assert embeddings.embed_documents(["library"]) == [HashingEmbeddings(dimensions=16).embed_query("library")]
+
+
+def test_vectors_are_kept_per_model_and_survive_a_reopen(tmp_path):
+    path = str(tmp_path / 'embedding_cache.sqlite')
+    cache = EmbeddingCache(path)
+    cache.put_many('model-a', {text_hash("fees"): [1.0, 2.0]})
+    cache.close()
+
+    reopened = EmbeddingCache(path)
+    assert reopened.get_many('model-a', [text_hash("fees")]) == {text_hash("fees"): [1.0, 2.0]}
+    assert reopened.get_many('model-b', [text_hash("fees")]) == {}
+    assert reopened.get_stats()['bytes'] == 16
+
+
+def test_least_recently_used_vectors_are_evicted_over_the_size_limit(tmp_path):
+    # Each vector is 8 float64s, 64 bytes; the limit holds three of them, and eviction goes down to 90% of it.
+    cache = EmbeddingCache(str(tmp_path / 'embedding_cache.sqlite'), max_bytes=220)
+    for name in ["a", "b", "c"]:
+        cache.put_many('model', {name: [0.0] * 8})
+    cache.get_many('model', ["a"])
+    cache.put_many('model', {"d": [0.0] * 8})
+
+    assert sorted(cache.get_many('model', ["a", "b", "c", "d"])) == ["a", "c", "d"]
+    assert cache.get_stats()['evictions'] == 1 and cache.get_stats()['bytes'] <= 220
+
+
+def test_rebuilding_the_index_is_served_from_the_cache(tmp_path):
+    model = CountingEmbeddings()
+    docs = [Document(id=f"fees-{i}", page_content=f"The hostel fee for block {i} is due in July.",
+                     metadata={'source': f"https://example.edu/fees/{i}", 'title': "Fees"}) for i in range(6)]
+    vector_db = VectorDB(persist_directory=str(tmp_path / 'chroma_db'), embedding_function=model)
+
+    vector_db.make_vector_db(docs)
+    assert len(model.embedded) == 6 and vector_db.embedding_cache.get_stats()['misses'] == 6
+
+    vector_db.make_vector_db(docs + [Document(id="new", page_content="The library opens at eight.",
+                                              metadata={'source': "https://example.edu/library", 'title': "Library"})])
+    assert model.embedded[6:] == ["The library opens at eight."]
+    assert vector_db.embedding_cache.get_stats()['hits'] == 6 and vector_db.db._collection.count() == 7
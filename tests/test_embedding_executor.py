@@ -0,0 +1,117 @@
+import time
+import threading
+
+import pytest
+import requests
+from langchain_core.embeddings import Embeddings
+
+from Utils.EmbeddingExecutor import EmbeddingExecutor
+
+
+def http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(f"{status} error", response=response)
+
+
+class ScriptedEmbeddings(Embeddings):
+    # Returns [float(text)] per text; fail(texts, call_number) may return an exception to raise instead.
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+            call_number = len(self.calls)
+        error = self.fail(texts, call_number) if self.fail else None
+        if error is not None:
+            raise error
+        return [[float(text)] for text in texts]
+
+    def embed_query(self, text):
+        return [float(text)]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(time, 'sleep', delays.append)
+    return delays
+
+
+def texts(count):
+    return [str(i) for i in range(count)]
+
+
+def test_transient_errors_are_retried(sleeps):
+    embeddings = ScriptedEmbeddings(lambda batch, call: http_error(503) if call == 1 else None)
+    executor = EmbeddingExecutor(embeddings, max_workers=1)
+
+    assert executor.embed_documents(texts(5)) == [[float(i)] for i in range(5)]
+    assert executor.get_stats()['retries'] == 1
+    assert len(sleeps) == 1 and embeddings.calls == [texts(5), texts(5)]
+
+
+def test_wrapped_transient_errors_are_retried(sleeps):
+    def fail(batch, call):
+        if call == 1:
+            try:
+                raise requests.exceptions.ConnectionError("connection reset")
+            except requests.exceptions.ConnectionError as e:
+                wrapped = RuntimeError(f"Error embedding content: {e}")
+                wrapped.__cause__ = e
+                return wrapped
+    executor = EmbeddingExecutor(ScriptedEmbeddings(fail), max_workers=1)
+
+    assert executor.embed_documents(texts(3)) == [[0.0], [1.0], [2.0]]
+    assert executor.get_stats()['retries'] == 1
+
+
+@pytest.mark.parametrize('error', [http_error(400), http_error(401), ValueError("bad input")])
+def test_non_transient_errors_are_raised_without_retrying(sleeps, error):
+    embeddings = ScriptedEmbeddings(lambda batch, call: error)
+    executor = EmbeddingExecutor(embeddings, max_workers=1)
+
+    with pytest.raises(type(error)):
+        executor.embed_documents(texts(4))
+    assert len(embeddings.calls) == 1 and sleeps == []
+
+
+def test_rate_limits_wait_for_retry_after_without_splitting(sleeps):
+    embeddings = ScriptedEmbeddings(lambda batch, call: http_error(429, {'Retry-After': '7'}) if call <= 3 else None)
+    executor = EmbeddingExecutor(embeddings, max_workers=1)
+
+    assert executor.embed_documents(texts(8)) == [[float(i)] for i in range(8)]
+    assert sleeps == [7.0, 7.0, 7.0]
+    assert embeddings.calls == [texts(8)] * 4
+    assert executor.get_stats()['splits'] == 0 and executor.get_stats()['rate_limited'] == 3
+
+
+def test_repeated_server_errors_halve_the_batch_and_keep_order(sleeps):
+    # Requests with more than two texts keep failing, so sub-batches of 16 are halved down to pairs.
+    embeddings = ScriptedEmbeddings(lambda batch, call: http_error(500) if len(batch) > 2 else None)
+    executor = EmbeddingExecutor(embeddings, max_workers=4, sub_batch_size=16, max_retries=10)
+
+    assert executor.embed_documents(texts(50)) == [[float(i)] for i in range(50)]
+    assert executor.get_stats()['splits'] > 0 and executor.get_stats()['failures'] == 0
+    assert sorted(text for batch in embeddings.calls if len(batch) <= 2 for text in batch) == sorted(texts(50))
+
+
+def test_oversized_payloads_are_halved_at_once(sleeps):
+    embeddings = ScriptedEmbeddings(lambda batch, call: http_error(413) if len(batch) > 3 else None)
+    executor = EmbeddingExecutor(embeddings, max_workers=1)
+
+    assert executor.embed_documents(texts(12)) == [[float(i)] for i in range(12)]
+    assert sleeps == [] and executor.get_stats()['retries'] == 0
+
+
+def test_retries_give_up_after_max_retries(sleeps):
+    embeddings = ScriptedEmbeddings(lambda batch, call: http_error(503))
+    executor = EmbeddingExecutor(embeddings, max_workers=1, max_retries=2)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        executor.embed_documents(texts(1))
+    assert len(embeddings.calls) == 3 and executor.get_stats()['failures'] == 1
@@ -0,0 +1,70 @@
+from conftest import page_html, read_pages
+from Utils.Frontier import Frontier, url_pattern_priority
+from Utils.PageWriter import PageWriter
+from Utils.WebScraper import WebScraper
+
+
+def drain(frontier):
+    urls = []
+    while frontier:
+        url, _ = frontier.pop()
+        frontier.mark_visited(url)
+        urls.append(url)
+    return urls
+
+
+def test_queued_and_visited_urls_are_only_added_once():
+    frontier = Frontier()
+    assert frontier.add('https://example.edu/a', 0)
+    assert not frontier.add('https://example.edu/a', 1)
+    assert frontier.pop() == ('https://example.edu/a', 0)
+    frontier.mark_visited('https://example.edu/a')
+
+    assert not frontier.add('https://example.edu/a', 2)
+    assert 'https://example.edu/a' in frontier and frontier.is_visited('https://example.edu/a')
+    assert not frontier and len(frontier) == 0 and frontier.visited_count == 1
+
+
+def test_pops_by_priority_then_depth_then_insertion_order():
+    frontier = Frontier()
+    frontier.add('https://example.edu/deep', 2)
+    frontier.add('https://example.edu/first', 1)
+    frontier.add('https://example.edu/second', 1)
+    frontier.add('https://example.edu/urgent', 3, priority=-1.0)
+
+    assert drain(frontier) == ['https://example.edu/urgent', 'https://example.edu/first',
+                               'https://example.edu/second', 'https://example.edu/deep']
+
+
+def test_url_pattern_priority_crawls_higher_scores_first():
+    frontier = Frontier(priority_fn=url_pattern_priority({r'/admissions': 2.0, r'/courses': 1.0}))
+    for path in ['/news/1', '/courses/cs', '/admissions/fees', '/news/2']:
+        frontier.add(f"https://example.edu{path}", 1)
+
+    assert drain(frontier) == ['https://example.edu/admissions/fees', 'https://example.edu/courses/cs',
+                               'https://example.edu/news/1', 'https://example.edu/news/2']
+
+
+def test_full_frontier_drops_new_links_and_counts_them():
+    frontier = Frontier(max_size=2)
+    assert frontier.add('https://example.edu/1', 0) and frontier.add('https://example.edu/2', 0)
+    assert not frontier.add('https://example.edu/3', 0)
+    assert frontier.dropped_count == 1 and len(frontier) == 2
+
+    frontier.pop()
+    assert frontier.add('https://example.edu/3', 0)
+
+
+def test_crawl_fetches_each_page_of_a_cyclic_site_once(site, tmp_path):
+    # Every page links to every other page and back to the start page.
+    paths = ['/'] + [f"/page/{i}" for i in range(1, 8)]
+    for path in paths:
+        site.add_html(path, page_html(f"Title {path}", [f"Text of {path}."], paths))
+    scraper = WebScraper(site.url('/'), max_depth=5, writer=PageWriter(str(tmp_path / 'scraped_data.jsonl')),
+                         use_sitemaps=False, strip_boilerplate=False)
+    scraper.crawl_website(politeness_delay=0)
+
+    fetched = [path for path in site.fetched_paths() if path != '/robots.txt']
+    assert sorted(fetched) == sorted(paths)
+    assert len(read_pages(scraper.writer.path)) == len(paths)
+    assert scraper.crawl_stats['frontier_remaining'] == 0 and scraper.crawl_stats['frontier_dropped'] == 0
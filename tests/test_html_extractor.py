@@ -0,0 +1,111 @@
+import pytest
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+from Utils.HtmlExtractor import HtmlExtractor
+from Utils.UrlCanonicalizer import UrlCanonicalizer
+from Utils.WebScraper import WebScraper
+
+# The two-parse extraction WebScraper used before HtmlExtractor, kept as the reference the single-pass output
+# must match. benchmarks/extraction_benchmark.py times it against HtmlExtractor.extract.
+
+
+def reference_extract_links(extractor, html_content, current_page_url):
+    soup = BeautifulSoup(html_content, 'html.parser')
+    links = set()
+    for a_tag in soup.find_all('a', href=True):
+        href = a_tag['href']
+        if href:
+            full_url = urljoin(current_page_url, href)
+            normalized_url = extractor.normalize_url(full_url)
+
+            if extractor.is_valid_link(normalized_url) and not extractor.should_ignore_link(normalized_url):
+                links.add(normalized_url)
+    return links
+
+
+def reference_extract_text(html_content):
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    for tag_name in ['nav', 'footer', 'aside', 'script', 'style', 'header', 'form', 'button', 'iframe']:
+        for tag in soup.find_all(tag_name):
+            tag.decompose()
+
+    data = {'title': soup.title.string.strip() if soup.title and soup.title.string else '', 'sections': []}
+
+    current_section_title = None
+    current_section_text = []
+
+    for element in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li', 'span', 'div']):
+        if element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+            if current_section_title is not None and current_section_text:
+                data['sections'].append({'section_title': current_section_title, 'text': ' '.join(current_section_text).strip()})
+                current_section_text = []
+            current_section_title = element.get_text(separator=' ', strip=True)
+        elif element.name in ['p', 'li'] or \
+             (element.name == 'div' and not element.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li', 'div'])) or \
+             (element.name == 'span' and element.get_text(strip=True)):
+
+            text = element.get_text(separator=' ', strip=True)
+            if text:
+                current_section_text.append(text)
+            if current_section_title is None and not data['sections'] and text:
+                current_section_title = "Introduction"
+
+    if current_section_title is not None and current_section_text:
+        data['sections'].append({'section_title': current_section_title, 'text': ' '.join(current_section_text).strip()})
+    elif not data['sections'] and current_section_text:
+        data['sections'].append({'section_title': "Content", 'text': ' '.join(current_section_text).strip()})
+
+    if not data['sections']:
+        body_text = soup.body.get_text(separator=' ', strip=True) if soup.body else ''
+        if body_text:
+            data['sections'].append({'section_title': "Full Page Content", 'text': body_text})
+
+    data['sections'] = [sec for sec in data['sections'] if sec['text']]
+    return data
+
+
+FIXTURE_PAGES = {
+    'sections': """<html><head><title> Admissions </title><script>var x = 1;</script></head><body>
+        <header><nav><a href="/apply?utm_source=nav">Apply</a><a href="/login">Log in</a></nav></header>
+        <p>Welcome to the admissions office.</p>
+        <h1>Undergraduate</h1><p>Applications open in <span>March</span>.</p>
+        <ul><li>Transcripts</li><li>Two <a href="/letters#top">letters</a></li></ul>
+        <h2>Fees</h2><div class="outer"><div>Tuition is listed <span>per semester</span>.</div></div>
+        <table><tr><td><span>Hostel</span></td><td><span>1200</span></td></tr></table>
+        <aside><p>Related news</p></aside>
+        <footer><p>Contact us</p><form><button>Go</button></form><a href="https://twitter.com/uni">Twitter</a></footer>
+    </body></html>""",
+    'no_headings': """<html><head><title>Notices</title></head><body>
+        <div>First notice.</div><div><p>Second notice.</p></div><span></span>
+        <a href="https://other.example.org/page">Partner</a><a href="brochure.pdf">Brochure</a><a href="/notices/">All</a>
+    </body></html>""",
+    'body_text_only': """<html><head></head><body>Plain text <b>without</b> blocks <a href="./next">next</a></body></html>""",
+    'empty': """<html><head><title></title></head><body><nav><p>Menu only</p></nav></body></html>""",
+}
+
+
+@pytest.fixture
+def extractor():
+    scraper = WebScraper('https://example.edu/', html_parser='html.parser', canonicalizer=UrlCanonicalizer())
+    return HtmlExtractor(scraper.base_domain, scraper.ignored_links, scraper.ignored_extensions, parser='html.parser',
+                         canonicalizer=scraper.canonicalizer)
+
+
+@pytest.mark.parametrize('name', sorted(FIXTURE_PAGES))
+def test_single_pass_extraction_matches_the_two_parse_reference(extractor, name):
+    url = 'https://example.edu/admissions/index.html'
+    html = FIXTURE_PAGES[name]
+    data, links, _ = extractor.extract(html, url)
+    assert data == reference_extract_text(html)
+    assert links == reference_extract_links(extractor, html, url)
+
+
+def test_reference_fixtures_cover_sections_and_links(extractor):
+    data = reference_extract_text(FIXTURE_PAGES['sections'])
+    assert [section['section_title'] for section in data['sections']] == ['Introduction', 'Undergraduate', 'Fees']
+    assert 'Related news' not in str(data) and 'Contact us' not in str(data)
+    links = reference_extract_links(extractor, FIXTURE_PAGES['sections'], 'https://example.edu/admissions/index.html')
+    assert 'https://example.edu/apply' in links and 'https://example.edu/letters' in links
+    assert not any('login' in link or 'twitter' in link for link in links)
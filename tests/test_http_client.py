@@ -0,0 +1,61 @@
+import gzip
+
+import pytest
+import requests
+
+from Utils.HttpClient import HttpClient
+
+HTML = "<html><body><p>" + "Timetable for the autumn semester. " * 200 + "</p></body></html>"
+
+
+def make_client(**options):
+    return HttpClient('test-agent', **options)
+
+
+def test_fetch_negotiates_compression_and_decodes_the_body(site):
+    site.add('/', gzip.compress(HTML.encode()), 'text/html; charset=utf-8', headers={'Content-Encoding': 'gzip'})
+    client = make_client()
+
+    response = client.fetch(site.url('/'))
+
+    assert response.text == HTML
+    headers = {name.lower(): value for name, value in site.requests[-1][1].items()}
+    assert 'gzip' in headers['accept-encoding'] and headers['user-agent'] == 'test-agent'
+    stats = client.get_host_stats()[site.url('/').split('/')[2]]
+    # Bytes transferred are counted on the wire, before decompression.
+    assert stats['requests'] == 1 and stats['errors'] == 0 and 0 < stats['bytes'] < len(HTML)
+
+
+def test_non_html_responses_are_skipped_unless_any_content_type_is_allowed(site):
+    site.add('/timetable.csv', "course,room\nCS101,R1\n", 'text/csv')
+    client = make_client()
+
+    assert client.fetch(site.url('/timetable.csv')) is None
+    assert client.fetch(site.url('/timetable.csv'), any_content_type=True).text.startswith("course,room")
+
+
+def test_bodies_over_the_size_cap_are_abandoned(site):
+    site.add_html('/large', HTML)
+    # Small on the wire but over the cap once decompressed, so only the streamed check can catch it.
+    site.add('/bomb', gzip.compress(HTML.encode()), 'text/html', headers={'Content-Encoding': 'gzip'})
+    client = make_client(max_body_bytes=1024)
+
+    assert client.fetch(site.url('/large')) is None
+    assert client.fetch(site.url('/bomb')) is None
+    assert client.fetch(site.url('/large'), max_body_bytes=len(HTML)).text == HTML
+
+
+def test_http_errors_are_raised_and_counted(site):
+    client = make_client()
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.fetch(site.url('/missing'))
+    assert client.get_host_stats()[site.url('/').split('/')[2]]['errors'] == 1
+
+
+def test_pool_grows_to_the_number_of_concurrent_fetchers():
+    client = make_client(pool_maxsize=4)
+    client.ensure_pool_size(2)
+    assert client.pool_maxsize == 4
+    client.ensure_pool_size(16)
+    assert client.pool_maxsize == 16
+    assert client.session.get_adapter('https://example.edu/')._pool_maxsize == 16
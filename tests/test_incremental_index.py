@@ -0,0 +1,99 @@
+import pytest
+from langchain_core.documents import Document
+
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.VectorDB import VectorDB, document_id
+
+
+def make_vector_db(path, backend='chroma'):
+    return VectorDB(persist_directory=str(path), embedding_function=HashingEmbeddings(), use_embedding_cache=False,
+                    backend=backend)
+
+
+def chunk(page, i, version=0):
+    return Document(id=f"page{page}-chunk{i}-v{version}", page_content=f"Page {page} chunk {i} version {version}.",
+                    metadata={'source': f"https://example.edu/{page}", 'title': f"Page {page}"})
+
+
+def indexed(vector_db):
+    result = vector_db.db._collection.get(include=['metadatas'])
+    return {chunk_id: (metadata or {}).get('source') for chunk_id, metadata in zip(result['ids'], result['metadatas'])}
+
+
+@pytest.mark.parametrize('backend', ['chroma', 'numpy'])
+def test_documents_without_ids_or_metadata_are_indexed_once(tmp_path, backend):
+    docs = [Document(page_content="The library opens at eight."),
+            Document(page_content="The hostel fee is due in July.", metadata={}),
+            Document(page_content="The hostel fee is due in July.", metadata={'source': "https://example.edu/fees"})]
+    vector_db = make_vector_db(tmp_path / 'db', backend)
+
+    vector_db.make_vector_db(docs)
+    vector_db.make_vector_db(docs)
+
+    assert len({document_id(doc) for doc in docs}) == 3
+    assert sorted(indexed(vector_db)) == sorted(document_id(doc) for doc in docs)
+    assert document_id(Document(page_content="The library opens at eight.")) == document_id(docs[0])
+
+
+@pytest.mark.parametrize('backend', ['chroma', 'numpy'])
+def test_an_incremental_sync_keeps_pages_whose_chunks_are_not_contiguous(tmp_path, backend):
+    vector_db = make_vector_db(tmp_path / 'db', backend)
+    first = [chunk(page, i) for page in range(3) for i in range(3)]
+    vector_db.make_vector_db(first)
+
+    # Chunks of the three pages interleaved, over batches of two.
+    interleaved = [chunk(page, i) for i in range(3) for page in range(3)]
+    vector_db.make_vector_db(interleaved, chroma_upsert_batch_size=2, incremental=True)
+
+    assert sorted(indexed(vector_db)) == sorted(doc.id for doc in first)
+    assert vector_db.index_stats == {'added': 0, 'updated': 0, 'unchanged': 9, 'deleted': 0}
+
+
+@pytest.mark.parametrize('backend', ['chroma', 'numpy'])
+def test_an_incremental_update_matches_a_full_rebuild(tmp_path, backend):
+    vector_db = make_vector_db(tmp_path / 'incremental', backend)
+    vector_db.make_vector_db([chunk(page, i) for page in range(4) for i in range(2)])
+
+    # Page 0 changed one chunk, page 1 is unchanged, page 2 was deleted, page 3 was not crawled and page 4 is new.
+    updated = [chunk(0, 0), chunk(0, 1, version=1), chunk(1, 0), chunk(1, 1), chunk(4, 0)]
+    vector_db.make_vector_db(updated[::-1], chroma_upsert_batch_size=2, incremental=True,
+                             removed_sources=["https://example.edu/2"], prune_missing=False)
+
+    kept = [chunk(3, 0), chunk(3, 1)]
+    assert indexed(vector_db) == {doc.id: doc.metadata['source'] for doc in updated + kept}
+    assert vector_db.index_stats == {'added': 2, 'updated': 0, 'unchanged': 3, 'deleted': 3}
+
+    rebuilt = make_vector_db(tmp_path / 'rebuilt', backend)
+    rebuilt.make_vector_db(updated + kept)
+    assert indexed(rebuilt) == indexed(vector_db)
+
+    # With prune_missing, pages not in the stream go too.
+    vector_db.make_vector_db(updated, incremental=True)
+    assert indexed(vector_db) == {doc.id: doc.metadata['source'] for doc in updated}
+    assert {doc.id for doc in vector_db.search("Page 3 chunk", k=10, mode='lexical')}.isdisjoint(doc.id for doc in kept)
+
+
+@pytest.mark.parametrize('backend', ['chroma', 'numpy'])
+def test_a_failed_rebuild_keeps_the_previous_index(tmp_path, backend):
+    vector_db = make_vector_db(tmp_path / 'db', backend)
+    old = [chunk(page, 0) for page in range(3)]
+    vector_db.make_vector_db(old)
+    version = vector_db.index_version()
+
+    def failing_stream():
+        yield chunk(9, 0)
+        raise RuntimeError("split failed")
+
+    with pytest.raises(RuntimeError):
+        vector_db.make_vector_db(failing_stream(), chroma_upsert_batch_size=1)
+
+    assert sorted(indexed(vector_db)) == sorted(doc.id for doc in old)
+    assert vector_db.index_version() == version
+    assert {doc.id for doc in vector_db.search("Page 1 chunk", k=3, mode='lexical')} == {doc.id for doc in old}
+
+    # The next build succeeds and replaces the index; a reopened store sees only the new documents.
+    vector_db.make_vector_db([chunk(9, 0)])
+    reopened = make_vector_db(tmp_path / 'db', backend)
+    reopened.load_vector_db()
+    assert list(indexed(reopened)) == [chunk(9, 0).id]
+    assert [doc.id for doc in reopened.search("Page 9 chunk", k=3, mode='lexical')] == [chunk(9, 0).id]
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+import pytest
+
+from conftest import page_html, read_pages
+from Utils.ChunkDeduplicator import ChunkDeduplicator
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.IngestPipeline import IngestPipeline
+from Utils.PageWriter import PageWriter
+from Utils.Splitter import Splitter
+from Utils.VectorDB import VectorDB
+from Utils.WebScraper import WebScraper
+
+PAGES = 12
+SHARED_NOTICE = "Applications for the autumn intake close on the thirtieth of June, and late fees apply after that date."
+
+
+def add_site(site):
+    # Long pages so each one splits into several chunks; every page also carries the same notice.
+    for i in range(PAGES):
+        path = "/" if i == 0 else f"/page/{i}"
+        links = [f"/page/{child}" for child in range(2 * i + 1, min(2 * i + 2, PAGES - 1) + 1)]
+        paragraphs = [" ".join(f"Page {i} paragraph {p} word{n} about the programme." for n in range(40))
+                      for p in range(4)] + [SHARED_NOTICE]
+        site.add_html(path, page_html(f"Page {i}", paragraphs, links))
+
+
+def make_scraper(site, directory):
+    return WebScraper(site.url('/'), max_depth=5, writer=PageWriter(str(directory / 'scraped_data.jsonl')),
+                      use_sitemaps=False, strip_boilerplate=False)
+
+
+def make_vector_db(directory):
+    return VectorDB(persist_directory=str(directory / 'chroma_db'), embedding_function=HashingEmbeddings(),
+                    use_embedding_cache=False)
+
+
+def indexed(vector_db):
+    stored = vector_db.db.get(include=['metadatas', 'documents'])
+    return {chunk_id: (text, metadata['source']) for chunk_id, text, metadata
+            in zip(stored['ids'], stored['documents'], stored['metadatas'])}
+
+
+@pytest.mark.parametrize('deduplicate', [False, True])
+def test_pipelined_ingest_matches_the_sequential_build(site, tmp_path, deduplicate):
+    add_site(site)
+
+    sequential_scraper = make_scraper(site, tmp_path / 'sequential')
+    sequential_scraper.crawl_website(politeness_delay=0)
+    sequential_db = make_vector_db(tmp_path / 'sequential')
+    sequential_db.make_vector_db(Splitter(sequential_scraper.writer.path).iter_documents(),
+                                 deduplicator=ChunkDeduplicator() if deduplicate else None)
+
+    pipelined_db = make_vector_db(tmp_path / 'pipelined')
+    pipeline = IngestPipeline(make_scraper(site, tmp_path / 'pipelined'), pipelined_db, batch_size=7,
+                              deduplicator=ChunkDeduplicator() if deduplicate else None)
+    assert pipeline.run(politeness_delay=0) is not None
+
+    sequential, pipelined = indexed(sequential_db), indexed(pipelined_db)
+    assert len(pipelined) == len(sequential) > PAGES
+    assert pipelined == sequential
+    assert pipeline.get_stats()['index']['items_out'] == len(sequential)
+
+
+
+def test_async_crawl_hands_pages_over_off_the_event_loop(site, tmp_path):
+    add_site(site)
+    scraper = make_scraper(site, tmp_path)
+    received = []
+
+    def page_sink(page_data):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop = True
+        except RuntimeError:
+            on_event_loop = False
+        received.append((page_data['url'], on_event_loop))
+
+    scraper.page_sink = page_sink
+    scraper.crawl_website_async(politeness_delay=0, concurrency=4)
+
+    assert [url for url, _ in received] == [page['url'] for page in read_pages(scraper.writer.path)]
+    assert len(received) == PAGES and not any(on_event_loop for _, on_event_loop in received)
+
+
+def test_async_pipeline_under_backpressure_indexes_every_page(site, tmp_path):
+    add_site(site)
+    sequential_scraper = make_scraper(site, tmp_path / 'sequential')
+    sequential_scraper.crawl_website(politeness_delay=0)
+    sequential_db = make_vector_db(tmp_path / 'sequential')
+    sequential_db.make_vector_db(Splitter(sequential_scraper.writer.path).iter_documents())
+
+    vector_db = make_vector_db(tmp_path / 'pipelined')
+    release = threading.Event()
+    add_batch = vector_db.add_batch
+
+    def slow_add_batch(documents):
+        release.wait(10)
+        add_batch(documents)
+
+    vector_db.add_batch = slow_add_batch
+    # Queues of one fill up at once, so fetchers wait on the page hand-off until indexing catches up.
+    pipeline = IngestPipeline(make_scraper(site, tmp_path / 'pipelined'), vector_db, page_queue_size=1,
+                              doc_queue_size=1, batch_size=1)
+    threading.Timer(0.5, release.set).start()
+    assert pipeline.run(concurrency=4, politeness_delay=0) is not None
+
+    assert pipeline.get_stats()['crawl']['blocked_seconds'] > 0
+    assert indexed(vector_db) == indexed(sequential_db)
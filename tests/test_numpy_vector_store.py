@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from Utils.NumpyVectorStore import NumpyVectorStore
+
+
+def random_vectors(rows, dim=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((rows, dim)).astype(np.float32)
+
+
+def unit(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_store(path, vectors, dtype='float16', **options):
+    store = NumpyVectorStore(str(path), dtype=dtype, **options)
+    store.upsert(ids=[f"doc-{i}" for i in range(len(vectors))], embeddings=vectors,
+                 documents=[f"Document {i}" for i in range(len(vectors))],
+                 metadatas=[{'source': f"https://example.edu/{i % 5}"} for i in range(len(vectors))])
+    return store
+
+
+def test_upsert_replaces_existing_ids_in_place(tmp_path):
+    vectors = random_vectors(6)
+    store = make_store(tmp_path, vectors)
+
+    replacement = random_vectors(1, seed=1)
+    store.upsert(ids=["doc-2", "doc-new", "doc-new"], embeddings=np.vstack([replacement, vectors[:2]]),
+                 documents=["Replaced", "First copy", "Second copy"], metadatas=[{'source': "x"}, None, {}])
+
+    assert store.count() == 7 and store._rows() == 7
+    got = store.get(ids=["doc-2", "doc-new"], include=['documents', 'metadatas', 'embeddings'])
+    assert got['ids'] == ["doc-2", "doc-new"]
+    assert got['documents'] == ["Replaced", "Second copy"] and got['metadatas'] == [{'source': "x"}, {}]
+    # The last occurrence of a repeated ID wins, and vectors are stored normalized.
+    np.testing.assert_allclose(got['embeddings'], unit(np.vstack([replacement, vectors[1:2]])), atol=1e-3)
+    # The replaced chunk moved to its new source.
+    assert store.get(where={'source': "https://example.edu/2"}, include=[])['ids'] == []
+
+    with pytest.raises(ValueError):
+        store.upsert(ids=["wrong"], embeddings=random_vectors(1, dim=8))
+
+
+def test_deleted_rows_are_skipped_and_compacted_away(tmp_path):
+    vectors = random_vectors(10)
+    store = make_store(tmp_path, vectors)
+
+    store.delete(ids=["doc-0", "doc-3", "doc-missing"])
+    ids, _ = store.search_vectors(vectors[3], k=10)
+    assert store.count() == 8 and store._rows() == 10
+    assert len(ids[0]) == 8 and 3 not in ids[0] and 0 not in ids[0]
+
+    store.delete(ids=["doc-4", "doc-5"])
+    store.compact(max_dead_ratio=0.2)
+    assert store._rows() == store.count() == 6
+    assert store.get(include=[])['ids'] == [f"doc-{i}" for i in (1, 2, 6, 7, 8, 9)]
+    np.testing.assert_allclose(store.get(ids=["doc-9"], include=['embeddings'])['embeddings'], unit(vectors[9:10]), atol=1e-3)
+    assert store.query(vectors[7:8], n_results=1)['ids'] == [["doc-7"]]
+
+
+def test_int8_vectors_keep_their_ranking(tmp_path):
+    vectors = random_vectors(200)
+    store = make_store(tmp_path, vectors, dtype='int8')
+
+    stored = store.get(include=['embeddings'])['embeddings']
+    assert store.dtype == 'int8' and (tmp_path / 'vectors.int8').stat().st_size == vectors.size
+    # Per-row scales keep the quantization error well under a percent of the unit vector.
+    assert np.abs(stored - unit(vectors)).max() < 0.01
+    queries = random_vectors(5, seed=2)
+    rows, _ = store.search_vectors(queries, k=10)
+    exact = np.argsort(-(unit(queries) @ unit(vectors).T), axis=1)[:, :10]
+    assert np.mean([len(set(found) & set(expected)) / 10 for found, expected in zip(rows, exact)]) >= 0.9
+
+
+def test_a_reopened_store_keeps_its_dtype_vectors_and_deletions(tmp_path):
+    vectors = random_vectors(12)
+    store = make_store(tmp_path, vectors, dtype='int8')
+    store.delete(ids=["doc-1"])
+    store.close()
+
+    reopened = NumpyVectorStore(str(tmp_path), dtype='float16')
+    assert reopened.dtype == 'int8' and reopened.dim == 32 and reopened.count() == 11
+    assert reopened.query(vectors[1:3], n_results=1)['ids'][1] == ["doc-2"]
+    assert "doc-1" not in reopened.query(vectors[1:2], n_results=12)['ids'][0]
+    documents = reopened.similarity_search_by_vector(list(vectors[5]), k=1)
+    assert documents[0].id == "doc-5" and documents[0].metadata == {'source': "https://example.edu/0"}
+
+
+@pytest.mark.parametrize('dtype', ['float16', 'int8'])
+@pytest.mark.parametrize('max_cache_bytes', [0, 256 * 1024 * 1024])
+def test_top_k_matches_brute_force(tmp_path, dtype, max_cache_bytes):
+    # Blocks of 64 rows exercise the running top-k across blocks, with and without the decoded float32 cache.
+    vectors = random_vectors(500)
+    store = make_store(tmp_path, vectors, dtype=dtype, block_rows=64, max_cache_bytes=max_cache_bytes)
+    store.delete(ids=[f"doc-{i}" for i in range(0, 500, 7)])
+    stored = store.get(include=['embeddings'])
+    live_rows = np.array([int(chunk_id.split('-')[1]) for chunk_id in stored['ids']])
+
+    queries = random_vectors(8, seed=3)
+    rows, scores = store.search_vectors(queries, k=15)
+
+    brute = unit(queries) @ stored['embeddings'].T
+    for query_rows, query_scores, expected in zip(rows, scores, brute):
+        top = np.argsort(-expected, kind='stable')[:15]
+        np.testing.assert_allclose(query_scores, expected[top], rtol=1e-4, atol=1e-5)
+        assert set(query_rows) == set(live_rows[top])
+        assert list(query_scores) == sorted(query_scores, reverse=True)
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from Utils.PageWriter import MANIFEST_FILE, PageWriter, list_shards, read_jsonl_lines
+from Utils.Splitter import Splitter
+
+
+def page(i):
+    return {'url': f"https://example.edu/page/{i}", 'title': f"Page {i}",
+            'sections': [{'section_title': 'Body', 'text': f"Page {i} lists the timetable of course CS{1000 + i}. " * 20}]}
+
+
+def read_records(path):
+    return [json.loads(line) for line in read_jsonl_lines(path)]
+
+
+def test_pages_are_buffered_and_written_in_blocks(tmp_path):
+    writer = PageWriter(str(tmp_path / 'scraped_data.jsonl'), buffer_bytes=4096, flush_interval=3600)
+    for i in range(20):
+        writer.write(page(i))
+        if i == 0:
+            assert not os.path.exists(writer.path) and writer.tell() > 0
+    writer.close()
+
+    assert read_records(writer.path) == [page(i) for i in range(20)]
+    assert writer.records_written == 20 and 1 < writer.flush_count < 20
+
+
+def test_a_slow_crawl_is_flushed_after_the_interval(tmp_path, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('time.monotonic', lambda: now[0])
+    writer = PageWriter(str(tmp_path / 'scraped_data.jsonl'), flush_interval=5.0)
+    writer.write(page(0))
+    assert writer.flush_count == 0
+    now[0] += 6
+    writer.write(page(1))
+
+    assert writer.flush_count == 1 and len(read_records(writer.path)) == 2
+    writer.close()
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'zstd'])
+def test_compressed_shards_rotate_and_are_listed_in_a_manifest(tmp_path, compression):
+    if compression == 'zstd':
+        pytest.importorskip('zstandard')
+    writer = PageWriter(str(tmp_path / 'scraped_data'), compression=compression, max_shard_bytes=300, buffer_bytes=1)
+    for i in range(6):
+        writer.write(page(i))
+    writer.close()
+
+    shards = list_shards(writer.path)
+    assert len(shards) > 1 and all(shard.endswith('.gz' if compression == 'gzip' else '.zst') for shard in shards)
+    with open(os.path.join(writer.path, MANIFEST_FILE)) as file:
+        manifest = json.load(file)
+    assert manifest['compression'] == compression and manifest['records'] == 6
+    assert [shard['file'] for shard in manifest['shards']] == [os.path.basename(shard) for shard in shards]
+    assert writer.size() < len(json.dumps([page(i) for i in range(6)]))
+    assert read_records(writer.path) == [page(i) for i in range(6)]
+
+
+def test_truncate_drops_records_after_a_position(tmp_path):
+    for path, options in [('scraped_data.jsonl', {}), ('scraped_data', {'compression': 'gzip', 'max_shard_bytes': 300})]:
+        writer = PageWriter(str(tmp_path / path), buffer_bytes=1, **options)
+        for i in range(3):
+            writer.write(page(i))
+        position = writer.tell()
+        for i in range(3, 6):
+            writer.write(page(i))
+        writer.truncate(position)
+        writer.close()
+
+        # A new writer on the same output carries on after the kept records.
+        reopened = PageWriter(str(tmp_path / path), **options)
+        assert reopened.tell() == position
+        reopened.write(page(9))
+        reopened.close()
+        assert read_records(writer.path) == [page(0), page(1), page(2), page(9)]
+
+
+def test_splitter_reads_shards_like_a_plain_file(tmp_path):
+    plain = PageWriter(str(tmp_path / 'scraped_data.jsonl'))
+    sharded = PageWriter(str(tmp_path / 'scraped_data'), compression='gzip', max_shard_bytes=300, buffer_bytes=1)
+    for i in range(6):
+        plain.write(page(i))
+        sharded.write(page(i))
+    plain.close()
+    sharded.close()
+
+    expected = [(doc.id, doc.page_content) for doc in Splitter(plain.path).iter_documents()]
+    assert [(doc.id, doc.page_content) for doc in Splitter(sharded.path).iter_documents()] == expected
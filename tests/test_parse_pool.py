@@ -0,0 +1,34 @@
+from conftest import add_tree_site, read_pages
+from Utils.PageWriter import PageWriter
+from Utils.WebScraper import WebScraper
+
+
+def crawl(site, directory, parse_workers=None, **options):
+    scraper = WebScraper(site.url('/'), max_depth=5, writer=PageWriter(str(directory / 'scraped_data.jsonl')),
+                         use_sitemaps=False, strip_boilerplate=False)
+    if parse_workers is None:
+        scraper.crawl_website(politeness_delay=0)
+    else:
+        scraper.crawl_website_async(politeness_delay=0, concurrency=4, parse_workers=parse_workers, **options)
+    return {page['url']: page for page in read_pages(scraper.writer.path)}, scraper.crawl_stats
+
+
+def test_parse_pool_extracts_the_same_pages_and_links_as_inline_parsing(site, tmp_path):
+    paths = add_tree_site(site, pages=25)
+    inline, _ = crawl(site, tmp_path / 'inline')
+
+    # A queue of one forces fetchers to wait for the parse stage, and links found by the workers must still be followed.
+    pooled, stats = crawl(site, tmp_path / 'pooled', parse_workers=2, parse_queue_size=1)
+
+    assert len(inline) == len(paths)
+    assert pooled == inline
+    assert stats['pages_scraped'] == len(paths)
+
+
+def test_parse_pool_stops_at_the_page_limit(site, tmp_path):
+    add_tree_site(site, pages=25)
+    scraper = WebScraper(site.url('/'), max_depth=5, max_pages_to_scrape=6, use_sitemaps=False, strip_boilerplate=False,
+                         writer=PageWriter(str(tmp_path / 'scraped_data.jsonl')))
+    stats = scraper.crawl_website_async(politeness_delay=0, concurrency=4, parse_workers=2)
+
+    assert len(read_pages(scraper.writer.path)) == stats['pages_scraped'] == 6
@@ -0,0 +1,102 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conftest import page_html
+from Utils.PageWriter import PageWriter
+from Utils.RateLimiter import HostRateLimiter, parse_retry_after
+from Utils.WebScraper import WebScraper
+
+HOST = 'example.edu'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('time.monotonic', lambda: now[0])
+    return now
+
+
+def delay(limiter):
+    return limiter.get_rates()[HOST]['delay']
+
+
+def test_reserve_spaces_requests_to_a_host_by_its_delay(clock):
+    limiter = HostRateLimiter(initial_delay=1.0)
+    assert [limiter.reserve(HOST) for _ in range(3)] == [0.0, 1.0, 2.0]
+    assert limiter.reserve('other.example.edu') == 0.0
+
+
+def test_healthy_responses_speed_up_and_slow_ones_back_off(clock):
+    limiter = HostRateLimiter(initial_delay=1.0, target_latency=1.0)
+    limiter.record(HOST, 200, 0.1)
+    assert delay(limiter) == pytest.approx(1 / 1.25)
+
+    limiter.record(HOST, 200, 2.0)
+    assert delay(limiter) == pytest.approx(1 / 1.25 / 0.8)
+    limiter.record(HOST, 500, 0.1)
+    assert delay(limiter) == pytest.approx(1 / 1.25 / 0.8 / 0.8)
+
+    for _ in range(200):
+        limiter.record(HOST, 200, 0.1)
+    assert delay(limiter) == limiter.min_delay
+
+
+def test_429_halves_the_rate_and_honors_retry_after(clock):
+    limiter = HostRateLimiter(initial_delay=1.0)
+    limiter.record(HOST, 429, 0.1, retry_after='5')
+
+    assert delay(limiter) == pytest.approx(2.0)
+    assert limiter.get_rates()[HOST]['backoffs'] == 1
+    assert limiter.reserve(HOST) == pytest.approx(5.0)
+
+
+def test_crawl_delay_is_a_floor_and_fixed_mode_only_backs_off(clock):
+    limiter = HostRateLimiter(initial_delay=0.5)
+    limiter.set_crawl_delay(HOST, 2.0)
+    for _ in range(10):
+        limiter.record(HOST, 200, 0.1)
+    assert delay(limiter) == 2.0
+
+    fixed = HostRateLimiter(initial_delay=0.5, adaptive=False)
+    fixed.record(HOST, 200, 0.1)
+    assert delay(fixed) == 0.5
+    fixed.record(HOST, 503, 0.1)
+    assert delay(fixed) == 1.0
+
+
+def test_parse_retry_after_reads_seconds_and_http_dates():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after(None) is None and parse_retry_after('soon') is None
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 < parse_retry_after(in_a_minute) <= 60
+    assert parse_retry_after(format_datetime(datetime(2000, 1, 1, tzinfo=timezone.utc), usegmt=True)) == 0.0
+
+
+def make_scraper(site, tmp_path, **options):
+    return WebScraper(site.url('/'), writer=PageWriter(str(tmp_path / 'scraped_data.jsonl')), use_sitemaps=False,
+                      strip_boilerplate=False, **options)
+
+
+def test_crawl_uses_the_robots_crawl_delay(site, tmp_path):
+    site.add('/robots.txt', "User-agent: *\nCrawl-delay: 1\n")
+    paths = ['/', '/a']
+    for path in paths:
+        site.add_html(path, page_html(f"Title {path}", [f"Text of {path}."], paths))
+    scraper = make_scraper(site, tmp_path)
+    scraper.crawl_website(politeness_delay=0)
+
+    rates = next(iter(scraper.crawl_stats['host_rates'].values()))
+    assert rates['crawl_delay'] == 1 and rates['requests_per_second'] <= 1.0
+    assert scraper.crawl_stats['elapsed_seconds'] >= 1.0
+
+
+def test_crawl_retries_a_rate_limited_page_with_backoff(site, tmp_path):
+    site.add('/', "slow down", status=429, headers={'Retry-After': '0'})
+    scraper = make_scraper(site, tmp_path, max_retries=2)
+    scraper.crawl_website(politeness_delay=0)
+
+    assert site.fetched_paths().count('/') == 3
+    rates = next(iter(scraper.crawl_stats['host_rates'].values()))
+    assert rates['backoffs'] == 3 and scraper.crawl_stats['pages_scraped'] == 0
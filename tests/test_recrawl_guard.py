@@ -0,0 +1,21 @@
+import pytest
+
+from Utils.IngestPipeline import IngestPipeline
+from Utils.PageWriter import PageWriter
+from Utils.WebScraper import WebScraper
+
+
+def test_pipeline_rejects_a_recrawl_that_would_rebuild_the_index(tmp_path):
+    scraper = WebScraper('https://example.edu/', state_file=str(tmp_path / 'crawl_state.sqlite'), recrawl=True,
+                         writer=PageWriter(str(tmp_path / 'scraped_data.jsonl')))
+    with pytest.raises(ValueError):
+        IngestPipeline(scraper, vector_db=None, incremental=False)
+    assert IngestPipeline(scraper, vector_db=None, incremental=True).incremental
+
+
+def test_prepare_database_rejects_a_recrawl_without_incremental_index():
+    pytest.importorskip('streamlit')
+    from app.PrepareDatabase import prepare_database
+    with pytest.raises(ValueError):
+        prepare_database('https://example.edu/', max_depth=1, max_crawl_duration=None, max_pages_to_scrape=1,
+                         recrawl=True, incremental_index=False)
@@ -0,0 +1,50 @@
+import pytest
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.RAG import RAG
+from Utils.VectorDB import VectorDB
+
+# What app/chatbot.py passes with the default RETRIEVAL_MODE and RETRIEVAL_MMR.
+CHATBOT_SEARCH_KWARGS = {"k": 4, "fetch_k": 20, "mmr": False}
+
+
+def build(path, backend='chroma'):
+    vector_db = VectorDB(persist_directory=str(path), embedding_function=HashingEmbeddings(), use_embedding_cache=False,
+                         backend=backend)
+    topics = ["hostel fee", "library hours", "exam schedule", "bus routes", "canteen menu", "sports clubs"]
+    vector_db.make_vector_db([Document(id=f"{topic}-{i}", page_content=f"The {topic} notice, part {i}, for this semester.",
+                                       metadata={'source': f"https://example.edu/{topic.replace(' ', '-')}/{i}", 'title': topic})
+                              for topic in topics for i in range(3)])
+    return vector_db
+
+
+def test_the_chatbot_default_retriever_answers_questions(tmp_path):
+    vector_db = build(tmp_path / 'chroma_db')
+    prompts = []
+
+    def llm(prompt_value):
+        prompts.append(prompt_value.to_string())
+        return "The fee is listed in the context."
+
+    retriever = vector_db.get_retriever(search_kwargs=dict(CHATBOT_SEARCH_KWARGS), mode='vector')
+    answer = RAG().chat("When is the hostel fee due?", retriever=retriever, llm=RunnableLambda(llm))
+
+    assert answer == "The fee is listed in the context."
+    assert "The hostel fee notice" in prompts[-1]
+
+
+@pytest.mark.parametrize('backend', ['chroma', 'numpy'])
+@pytest.mark.parametrize('mode', ['vector', 'lexical', 'hybrid'])
+@pytest.mark.parametrize('mmr', [False, True])
+def test_every_mode_accepts_the_chatbot_search_kwargs(tmp_path, backend, mode, mmr):
+    vector_db = build(tmp_path / 'db', backend)
+    retriever = vector_db.get_retriever(search_kwargs={**CHATBOT_SEARCH_KWARGS, 'mmr': mmr, 'lambda_mult': 0.5,
+                                                       'rrf_k': 60}, mode=mode)
+
+    docs = retriever.invoke("hostel fee")
+
+    # Lexical search only returns chunks sharing a term with the question, here the three hostel fee chunks.
+    assert len(docs) == (3 if mode == 'lexical' else 4)
+    assert docs[0].metadata['title'] == "hostel fee"
@@ -0,0 +1,77 @@
+import gzip
+from urllib.parse import urlparse
+
+from conftest import page_html, read_pages
+from Utils.HttpClient import HttpClient
+from Utils.PageWriter import PageWriter
+from Utils.Sitemap import SitemapReader
+from Utils.WebScraper import WebScraper
+
+
+def urlset(site, entries):
+    urls = "".join(f"<url><loc>{site.url(path)}</loc><priority>{priority}</priority>"
+                   + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "") + "</url>"
+                   for path, priority, lastmod in entries)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+
+def sitemap_index(site, paths):
+    sitemaps = "".join(f"<sitemap><loc>{site.url(path)}</loc></sitemap>" for path in paths)
+    return f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{sitemaps}</sitemapindex>'
+
+
+def add_pages(site, paths, links=()):
+    for path in paths:
+        site.add_html(path, page_html(f"Title {path}", [f"Text of the page at {path} for the sitemap tests."],
+                                      links if path == '/' else ()))
+
+
+def crawl(site, tmp_path, **options):
+    scraper = WebScraper(site.url('/'), writer=PageWriter(str(tmp_path / 'scraped_data.jsonl')), strip_boilerplate=False,
+                         **options)
+    scraper.crawl_website(politeness_delay=0)
+    return [urlparse(page['url']).path or '/' for page in read_pages(scraper.writer.path)]
+
+
+def test_robots_disallow_is_respected(site, tmp_path):
+    site.add('/robots.txt', "User-agent: *\nDisallow: /private\n")
+    add_pages(site, ['/', '/public', '/private/grades'], links=['/public', '/private/grades'])
+
+    scraped = crawl(site, tmp_path, use_sitemaps=False)
+
+    assert sorted(scraped) == ['/', '/public']
+    assert '/private/grades' not in site.fetched_paths()
+
+
+def test_sitemap_index_with_a_gzipped_sitemap_seeds_the_crawl(site, tmp_path):
+    site.add('/robots.txt', f"User-agent: *\nSitemap: {site.url('/sitemap_index.xml')}\n")
+    site.add('/sitemap_index.xml', sitemap_index(site, ['/sitemap-pages.xml', '/sitemap-news.xml.gz']), 'application/xml')
+    site.add('/sitemap-pages.xml', urlset(site, [('/courses', 0.5, None)]), 'application/xml')
+    site.add('/sitemap-news.xml.gz', gzip.compress(urlset(site, [('/news/open-day', 0.5, None)]).encode()),
+             'application/gzip')
+    add_pages(site, ['/', '/courses', '/news/open-day'])
+
+    # Neither page is linked from the start page, and depth 0 follows no links, so only the sitemaps can find them.
+    scraped = crawl(site, tmp_path, max_depth=0)
+
+    assert sorted(scraped) == ['/', '/courses', '/news/open-day']
+
+
+def test_sitemap_seeds_follow_priority_and_lastmod_after_the_start_page(site, tmp_path):
+    site.add('/sitemap.xml', urlset(site, [('/low', 0.1, None), ('/high-old', 0.9, '2024-01-01'),
+                                           ('/high-new', 0.9, '2025-06-01'), ('/middle', 0.5, None)]), 'application/xml')
+    add_pages(site, ['/', '/low', '/high-old', '/high-new', '/middle'])
+
+    scraped = crawl(site, tmp_path, max_depth=0)
+
+    assert scraped == ['/', '/high-new', '/high-old', '/middle', '/low']
+
+
+def test_gzipped_sitemap_larger_than_the_cap_is_skipped(site):
+    bomb = gzip.compress(urlset(site, [('/page', 0.5, None)]).encode() + b' ' * (2 * 1024 * 1024))
+    site.add('/sitemap.xml.gz', bomb, 'application/gzip')
+    reader = SitemapReader(HttpClient('test-agent'), max_sitemap_bytes=64 * 1024)
+
+    assert len(bomb) < reader.max_sitemap_bytes
+    assert reader.read([site.url('/sitemap.xml.gz')]) == []
+    assert len(SitemapReader(HttpClient('test-agent')).read([site.url('/sitemap.xml.gz')])) == 1
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from Utils.PageWriter import PageWriter
+from Utils.Splitter import Splitter
+
+
+def page(i, words=600):
+    return {'url': f"https://example.edu/page/{i}", 'title': f"Page {i}",
+            'sections': [{'section_title': 'Body', 'text': " ".join(f"word{i}_{n}" for n in range(words))}]}
+
+
+def write_lines(path, lines):
+    with open(path, 'wb') as file:
+        for line in lines:
+            file.write(line if isinstance(line, bytes) else (json.dumps(line) + "\n").encode('utf-8'))
+
+
+def doc_tuples(docs):
+    return [(doc.id, doc.page_content, doc.metadata) for doc in docs]
+
+
+def test_parallel_split_matches_iter_documents_and_skips_unreadable_lines(tmp_path, capsys):
+    path = str(tmp_path / 'scraped_data.jsonl')
+    write_lines(path, [page(0), b'{"url": "broken\n', page(1), b'{"url": "\xff\xfe"}\n', page(2),
+                       {'url': 'https://example.edu/deleted', 'change': 'deleted'}])
+    splitter = Splitter(path)
+
+    serial = list(splitter.iter_documents())
+    serial_output = capsys.readouterr().out
+    parallel = [doc for batch in splitter.iter_batches_parallel(workers=1, range_bytes=256) for doc in batch]
+
+    assert doc_tuples(parallel) == doc_tuples(serial)
+    assert {doc.metadata['source'] for doc in serial} == {f"https://example.edu/page/{i}" for i in range(3)}
+    assert splitter.removed_sources == {'https://example.edu/deleted'}
+    assert "Skipped 2 invalid JSON lines." in capsys.readouterr().out
+    # One summary instead of a line per page.
+    assert serial_output.splitlines() == ["Skipped 2 invalid JSON lines.", f"Created {len(serial)} documents."]
+
+
+def test_split_reads_compressed_shards(tmp_path):
+    writer = PageWriter(str(tmp_path / 'scraped_data'), compression='gzip', max_shard_bytes=2048)
+    for i in range(5):
+        writer.write(page(i))
+    writer.close()
+    splitter = Splitter(writer.path)
+
+    parallel = [doc for batch in splitter.iter_batches_parallel(workers=1) for doc in batch]
+
+    assert doc_tuples(parallel) == doc_tuples(splitter.iter_documents())
+
+
+def test_unexpected_errors_are_not_swallowed(tmp_path):
+    path = str(tmp_path / 'scraped_data.jsonl')
+    write_lines(path, [page(0), ["not", "a", "page"]])
+
+    with pytest.raises(AttributeError):
+        list(Splitter(path).iter_batches_parallel(workers=1))
+    with pytest.raises(AttributeError):
+        list(Splitter(path).iter_documents())
+
+
+def test_process_pool_split_matches_iter_documents(tmp_path):
+    path = str(tmp_path / 'scraped_data.jsonl')
+    write_lines(path, [page(i) for i in range(12)] + [{'url': 'https://example.edu/deleted', 'change': 'deleted'}])
+    splitter = Splitter(path)
+    serial = list(splitter.iter_documents())
+
+    # Small ranges so the pool gets many of them, and lines straddle range boundaries.
+    parallel = list(splitter.iter_documents_parallel(workers=2, range_bytes=1000))
+
+    assert len(parallel) > 12
+    assert doc_tuples(parallel) == doc_tuples(serial)
+    assert splitter.doc_count == len(serial)
+    assert splitter.removed_sources == {'https://example.edu/deleted'}
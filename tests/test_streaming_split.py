@@ -0,0 +1,66 @@
+import json
+
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.Splitter import Splitter
+from Utils.VectorDB import VectorDB
+
+PAGES = 30
+
+
+def write_pages(path, pages=PAGES):
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(pages):
+            text = " ".join(f"Page {i} sentence {n} about the library opening hours." for n in range(120))
+            file.write(json.dumps({'url': f"https://example.edu/page/{i}", 'title': f"Page {i}",
+                                   'sections': [{'section_title': 'Body', 'text': text}]}) + "\n")
+    return path
+
+
+def test_iter_documents_splits_pages_lazily(tmp_path):
+    splitter = Splitter(write_pages(str(tmp_path / 'scraped_data.jsonl')))
+    documents = splitter.iter_documents()
+
+    first = next(documents)
+    assert first.metadata == {'source': "https://example.edu/page/0", 'title': "Page 0"}
+    # Only the first page has been split so far.
+    assert 0 < splitter.doc_count < 10
+    rest = list(documents)
+    assert splitter.doc_count == len(rest) + 1 > 2 * PAGES
+
+    assert [doc.id for doc in splitter.split_jsonl_to_doc()] == [first.id] + [doc.id for doc in rest]
+
+
+def test_iter_batches_yields_fixed_size_batches(tmp_path):
+    splitter = Splitter(write_pages(str(tmp_path / 'scraped_data.jsonl')))
+    batches = list(splitter.iter_batches(batch_size=7))
+
+    assert all(len(batch) == 7 for batch in batches[:-1]) and 0 < len(batches[-1]) <= 7
+    assert [doc.id for batch in batches for doc in batch] == [doc.id for doc in splitter.iter_documents()]
+
+
+def test_make_vector_db_reads_the_stream_one_batch_ahead(tmp_path):
+    splitter = Splitter(write_pages(str(tmp_path / 'scraped_data.jsonl')))
+    vector_db = VectorDB(persist_directory=str(tmp_path / 'chroma_db'), embedding_function=HashingEmbeddings(),
+                         use_embedding_cache=False)
+    pulled = [0]
+    written = [0]
+    lead = []
+
+    def counted(documents):
+        for doc in documents:
+            pulled[0] += 1
+            yield doc
+
+    write_batch = vector_db.write_batch
+
+    def recording_write_batch(documents, embeddings):
+        written[0] += len(documents)
+        lead.append(pulled[0] - written[0])
+        write_batch(documents, embeddings)
+
+    vector_db.write_batch = recording_write_batch
+    vector_db.make_vector_db(counted(splitter.iter_documents()), chroma_upsert_batch_size=10)
+
+    assert written[0] == pulled[0] == splitter.doc_count == vector_db.db._collection.count()
+    # While one batch is written the next is being embedded; nothing further has been read from the stream.
+    assert len(lead) > 3 and max(lead) <= 10
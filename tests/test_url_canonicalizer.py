@@ -0,0 +1,52 @@
+from urllib.parse import urlparse
+
+from conftest import page_html, read_pages
+from Utils.PageWriter import PageWriter
+from Utils.UrlCanonicalizer import UrlCanonicalizer
+from Utils.WebScraper import WebScraper
+
+
+def test_tracking_params_are_dropped_and_the_rest_sorted():
+    canonicalize = UrlCanonicalizer().canonicalize
+    assert canonicalize('https://example.edu/courses?utm_source=mail&year=2025&fbclid=x&dept=cs#fees') == \
+        'https://example.edu/courses?dept=cs&year=2025'
+    assert canonicalize('https://example.edu/courses?year=2025&dept=cs') == canonicalize('https://example.edu/courses?dept=cs&year=2025')
+
+
+def test_default_documents_ports_case_and_trailing_slashes_collapse():
+    canonicalize = UrlCanonicalizer().canonicalize
+    for variant in ['https://example.edu/courses/index.html', 'HTTPS://Example.EDU:443/courses/',
+                    'https://example.edu/courses/Default.aspx', 'https://example.edu/courses']:
+        assert canonicalize(variant) == 'https://example.edu/courses'
+    assert canonicalize('https://example.edu/index.php') == 'https://example.edu/'
+    assert canonicalize('http://example.edu:8080/a') == 'http://example.edu:8080/a'
+
+
+def test_keep_params_and_unsorted_options():
+    assert UrlCanonicalizer(keep_params=['id']).canonicalize('https://example.edu/news?session=1&id=7') == \
+        'https://example.edu/news?id=7'
+    assert UrlCanonicalizer(sort_params=False, strip_params=[]).canonicalize('https://example.edu/?b=2&fbclid=1&a=1') == \
+        'https://example.edu/?b=2&fbclid=1&a=1'
+
+
+def test_crawl_fetches_each_canonical_page_once(site, tmp_path):
+    site.add_html('/', page_html("Home", ["Welcome to the university."],
+                                 ['/courses?utm_source=newsletter', '/courses/index.html', '/old-courses', '/print/courses']))
+    site.add_html('/courses', page_html("Courses", ["The course catalogue for this year."]))
+    site.add('/old-courses', '', status=301, headers={'Location': site.url('/courses')})
+    site.add_html('/print/courses', '<html><head><title>Courses</title>'
+                                    f'<link rel="canonical" href="{site.url("/courses")}"></head>'
+                                    '<body><p>The course catalogue for this year.</p></body></html>')
+    scraper = WebScraper(site.url('/'), writer=PageWriter(str(tmp_path / 'scraped_data.jsonl')), use_sitemaps=False,
+                         strip_boilerplate=False)
+    scraper.crawl_website(politeness_delay=0)
+
+    pages = read_pages(scraper.writer.path)
+    assert sorted(urlparse(page['url']).path for page in pages) == ['/', '/courses']
+    fetched = site.fetched_paths()
+    # The redirect can only be seen by following it; /courses is never fetched again on its own after that.
+    assert fetched.count('/courses') <= 1 + fetched.count('/old-courses')
+    assert '/courses/index.html' not in fetched and not any('utm_source' in path for path in fetched)
+    dedup = scraper.crawl_stats['dedup']
+    # The tracking and index.html variants, plus the redirect or canonical page that turned out to be /courses.
+    assert dedup['fetches_saved'] + dedup['duplicate_pages'] >= 3
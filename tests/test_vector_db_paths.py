@@ -0,0 +1,48 @@
+import os
+
+from langchain_core.documents import Document
+
+from Utils.EmbeddingBackends import HashingEmbeddings
+from Utils.EmbeddingCache import EmbeddingCache
+from Utils.VectorDB import VectorDB
+
+
+def make_vector_db(path, **options):
+    return VectorDB(persist_directory=str(path), embedding_function=HashingEmbeddings(), **options)
+
+
+def documents(name, count=4):
+    return [Document(id=f"{name}-{i}", page_content=f"{name} handbook section {i} about {name} courses and fees.",
+                     metadata={'source': f"https://{name}.example.edu/{i}", 'title': name})
+            for i in range(count)]
+
+
+def test_stores_sharing_a_parent_directory_keep_separate_files(tmp_path):
+    first = make_vector_db(tmp_path / 'first_db')
+    second = make_vector_db(tmp_path / 'second_db')
+    first.make_vector_db(documents('physics'))
+    second.make_vector_db(documents('history', count=3))
+
+    for vector_db in (first, second):
+        assert os.path.dirname(vector_db.bm25_path) == vector_db.persist_directory
+        assert os.path.dirname(vector_db.embedding_cache.db_path) == vector_db.persist_directory
+        assert os.path.exists(vector_db.bm25_path)
+    assert not os.path.exists(tmp_path / 'bm25_index.npz')
+    assert not os.path.exists(tmp_path / 'embedding_cache.sqlite')
+
+    # Reopened stores load their own BM25 index, not the one built last.
+    reopened = make_vector_db(tmp_path / 'first_db')
+    reopened.load_vector_db()
+    assert {doc.id for doc in reopened.search("physics courses", k=4, mode='lexical')} == {f"physics-{i}" for i in range(4)}
+    assert reopened.search("history", k=4, mode='lexical') == []
+
+
+def test_a_cache_beside_the_store_is_copied_into_it(tmp_path):
+    legacy = EmbeddingCache(str(tmp_path / 'embedding_cache.sqlite'))
+    legacy.put_many('hashing-384', {'text-hash': [0.5] * 384})
+    legacy.close()
+
+    vector_db = make_vector_db(tmp_path / 'chroma_db')
+
+    assert vector_db.embedding_cache.db_path == str(tmp_path / 'chroma_db' / 'embedding_cache.sqlite')
+    assert vector_db.embedding_cache.get_many('hashing-384', ['text-hash']) == {'text-hash': [0.5] * 384}